@@ -0,0 +1,127 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Benchmark comparing path cache insert and lookup throughput between the default
+database settings, typically used on a network file system, and the write-ahead
+logging and pragmas used for path caches kept on the local disk.
+
+Usage: python path_cache_modes.py [default mode folder] [number of entries]
+
+The default mode database is created in the given folder, e.g. an NFS mount, and
+the local one in the temporary folder. Both are created in the temporary folder
+if no folder is given.
+"""
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import tempfile
+
+# add sgtk API
+this_folder = os.path.abspath(os.path.dirname(__file__))
+python_folder = os.path.abspath(os.path.join(this_folder, "..", "..", "python"))
+sys.path.append(python_folder)
+
+from tank.path_cache import PathCache
+
+
+def _open(path, local_replica):
+    """
+    Opens a path cache database the same way the path cache does.
+    """
+    connection = sqlite3.connect(path)
+    if local_replica:
+        PathCache._configure_local_replica(connection)
+    # the schema creation doesn't depend on any path cache state.
+    PathCache._init_schema(PathCache.__new__(PathCache), connection)
+    connection.text_factory = str
+    return connection
+
+
+def _run(path, local_replica, num_entries, batch_size):
+    """
+    Inserts entries in batches, committing each of them like folder creation
+    does, then looks each of them up by path and by entity.
+
+    :returns: Tuple with the insert and lookup times in seconds.
+    """
+    connection = _open(path, local_replica)
+    try:
+        start = time.time()
+        for first in range(0, num_entries, batch_size):
+            cursor = connection.cursor()
+            for index in range(first, min(first + batch_size, num_entries)):
+                cursor.execute(
+                    "INSERT INTO path_cache(entity_type, entity_id, entity_name, root, path, primary_entity) "
+                    "VALUES(?, ?, ?, ?, ?, ?)",
+                    ("Shot", index, "shot_%d" % index, "primary", "/seq/shot_%d" % index, 1)
+                )
+            connection.commit()
+            cursor.close()
+        insert_time = time.time() - start
+    finally:
+        connection.close()
+
+    # lookups are made with fresh connections, as read only path caches do.
+    connection = _open(path, local_replica)
+    try:
+        start = time.time()
+        cursor = connection.cursor()
+        for index in range(num_entries):
+            cursor.execute(
+                "SELECT entity_type, entity_id, entity_name FROM path_cache "
+                "WHERE root = ? AND path = ? AND primary_entity = 1",
+                ("primary", "/seq/shot_%d" % index)
+            ).fetchall()
+            cursor.execute(
+                "SELECT root, path FROM path_cache WHERE entity_type = ? AND entity_id = ?",
+                ("Shot", index)
+            ).fetchall()
+        cursor.close()
+        lookup_time = time.time() - start
+    finally:
+        connection.close()
+
+    return insert_time, lookup_time
+
+
+def main():
+    default_folder = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] else None
+    num_entries = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    batch_size = 50
+
+    local_folder = tempfile.mkdtemp(prefix="path_cache_local_")
+    default_tmp_folder = tempfile.mkdtemp(prefix="path_cache_default_", dir=default_folder)
+    try:
+        results = [
+            ("Default", _run(os.path.join(default_tmp_folder, "path_cache.db"), False, num_entries, batch_size)),
+            ("Local WAL", _run(os.path.join(local_folder, "path_cache.db"), True, num_entries, batch_size)),
+        ]
+    finally:
+        shutil.rmtree(local_folder)
+        shutil.rmtree(default_tmp_folder)
+
+    print("%d entries, committed in batches of %d" % (num_entries, batch_size))
+    print("Default mode folder: %s" % (default_folder or tempfile.gettempdir()))
+    for name, (insert_time, lookup_time) in results:
+        print(
+            "%-10s inserts: %.3fs (%d/s), lookups: %.3fs (%d/s)" % (
+                name,
+                insert_time, num_entries / max(insert_time, 1e-6),
+                lookup_time, 2 * num_entries / max(lookup_time, 1e-6),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
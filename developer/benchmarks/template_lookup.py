@@ -0,0 +1,90 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Benchmark comparing template lookups from a path using the precompiled
+template index against validating every single template.
+
+Usage: python template_lookup.py [number of templates] [number of lookups]
+"""
+
+import os
+import sys
+import time
+
+# add sgtk API
+this_folder = os.path.abspath(os.path.dirname(__file__))
+python_folder = os.path.abspath(os.path.join(this_folder, "..", "..", "python"))
+sys.path.append(python_folder)
+
+from tank.template import TemplatePath
+from tank.template_index import TemplateIndex
+from tank.templatekey import StringKey, IntegerKey
+
+
+def _make_templates(num_templates, root):
+    """
+    Creates a set of templates looking like a typical large configuration.
+    """
+    keys = {
+        "Sequence": StringKey("Sequence"),
+        "Shot": StringKey("Shot"),
+        "Step": StringKey("Step"),
+        "Asset": StringKey("Asset"),
+        "name": StringKey("name"),
+        "version": IntegerKey("version", format_spec="03"),
+    }
+    definitions = [
+        "sequences/{Sequence}/{Shot}/{Step}/dcc_%d/work/{name}.v{version}.ext%d",
+        "sequences/{Sequence}/{Shot}/{Step}/dcc_%d/publish/{name}.v{version}.ext%d",
+        "assets/{Asset}/{Step}/dcc_%d/work/{name}.v{version}.ext%d",
+        "assets/{Asset}/{Step}/dcc_%d/publish/{name}.v{version}.ext%d",
+    ]
+    templates = {}
+    for index in range(num_templates):
+        definition = definitions[index % len(definitions)] % (index, index)
+        name = "template_%d" % index
+        templates[name] = TemplatePath(definition, keys, root, name)
+    return templates
+
+
+def main():
+    num_templates = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    num_lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    root = os.path.join(os.path.sep, "studio", "project")
+    templates = _make_templates(num_templates, root)
+    paths = [
+        os.path.join(root, "sequences", "seq_1", "shot_%d" % i, "comp", "dcc_%d" % i, "work", "scene.v001.ext%d" % i)
+        for i in range(0, num_templates, 4)
+    ][:num_lookups]
+
+    start = time.time()
+    linear_results = [[t for t in templates.values() if t.validate(p)] for p in paths]
+    linear_time = time.time() - start
+
+    start = time.time()
+    index = TemplateIndex(templates)
+    build_time = time.time() - start
+
+    start = time.time()
+    index_results = [[t for t in index.get_candidates(p) if t.validate(p)] for p in paths]
+    index_time = time.time() - start
+
+    assert linear_results == index_results
+
+    print("%d templates, %d lookups" % (num_templates, len(paths)))
+    print("Linear scan:  %.3fs" % linear_time)
+    print("Index build:  %.3fs" % build_time)
+    print("Index lookup: %.3fs (x%.1f)" % (index_time, linear_time / max(index_time, 1e-6)))
+
+
+if __name__ == "__main__":
+    main()
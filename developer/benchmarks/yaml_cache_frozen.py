@@ -0,0 +1,128 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Benchmark comparing environment loads using frozen yaml cache data against
+loads deep copying the cached data, as done before frozen data was introduced.
+
+Usage: python yaml_cache_frozen.py [number of included files] [number of loads]
+"""
+
+import os
+import sys
+import copy
+import time
+import shutil
+import pstats
+import cProfile
+import tempfile
+
+# add sgtk API
+this_folder = os.path.abspath(os.path.dirname(__file__))
+python_folder = os.path.abspath(os.path.join(this_folder, "..", "..", "python"))
+sys.path.append(python_folder)
+
+from tank_vendor import yaml
+from tank.util import yaml_cache
+from tank.platform.environment import Environment
+
+
+def _write_config(root, num_includes):
+    """
+    Writes an environment including files defining many app instances,
+    looking like a typical large configuration.
+
+    :returns: Path to the environment file.
+    """
+    includes = []
+    apps = {}
+    for index in range(num_includes):
+        settings = {}
+        for app_index in range(20):
+            name = "tk-multi-app%d_%d" % (index, app_index)
+            settings[name] = {
+                "location": {"type": "app_store", "name": "tk-multi-app", "version": "v1.0.%d" % app_index},
+                "hook_scan_scene": "default",
+                "template_work": "maya_shot_work",
+                "items": [{"name": "item_%d" % i, "filters": ["a", "b"], "enabled": True} for i in range(10)],
+            }
+            apps[name] = "@%s" % name
+        include_path = os.path.join(root, "include_%d.yml" % index)
+        with open(include_path, "w") as fh:
+            fh.write(yaml.dump(settings))
+        includes.append(include_path)
+
+    env_path = os.path.join(root, "env.yml")
+    with open(env_path, "w") as fh:
+        fh.write(yaml.dump({
+            "includes": includes,
+            "engines": {
+                "tk-maya": {
+                    "location": {"type": "app_store", "name": "tk-maya", "version": "v1.0.0"},
+                    "apps": apps,
+                }
+            },
+        }))
+    return env_path
+
+
+def _run(env_path, num_loads):
+    """
+    Loads the environment a number of times.
+
+    :returns: Tuple with the time in seconds and the number of function calls.
+    """
+    profile = cProfile.Profile()
+    start = time.time()
+    profile.enable()
+    for _ in range(num_loads):
+        Environment(env_path)
+    profile.disable()
+    elapsed = time.time() - start
+    return elapsed, pstats.Stats(profile).total_calls
+
+
+def main():
+    num_includes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    num_loads = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    root = tempfile.mkdtemp(prefix="yaml_cache_frozen_")
+    try:
+        env_path = _write_config(root, num_includes)
+        # parse all the files once so only cache hits are measured
+        Environment(env_path)
+
+        frozen_time, frozen_calls = _run(env_path, num_loads)
+
+        # deep copy the cached data like the cache used to do
+        original_get = yaml_cache.YamlCache.get
+
+        def deepcopy_get(self, path, deepcopy_data=True, frozen=False):
+            return copy.deepcopy(original_get(self, path, deepcopy_data=False))
+
+        yaml_cache.YamlCache.get = deepcopy_get
+        try:
+            copy_time, copy_calls = _run(env_path, num_loads)
+        finally:
+            yaml_cache.YamlCache.get = original_get
+    finally:
+        shutil.rmtree(root)
+
+    print("%d included files, %d environment loads" % (num_includes, num_loads))
+    print("Deep copies: %.3fs, %d function calls" % (copy_time, copy_calls))
+    print(
+        "Frozen:      %.3fs, %d function calls (x%.1f)" % (
+            frozen_time, frozen_calls, copy_time / max(frozen_time, 1e-6)
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
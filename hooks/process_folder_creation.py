@@ -14,6 +14,7 @@ called.
 """
 
 from tank import Hook
+from tank.folder import process_folder_creation_items
 import os
 import sys
 import shutil
@@ -21,12 +22,33 @@ import shutil
 
 class ProcessFolderCreation(Hook):
 
+    # Maximum number of threads used to create the files and folders. Derived
+    # hooks can set this to 1 to create them one at a time, using the
+    # implementation below.
+    MAX_WORKERS = 8
+
     def execute(self, items, preview_mode, **kwargs):
         """
         Creates a list of files and folders.
 
         The default implementation creates files and folders recursively using
-        open permissions.
+        open permissions. When :attr:`MAX_WORKERS` is greater than 1, the items
+        are processed concurrently by :func:`tank.folder.process_folder_creation_items`,
+        which returns the same locations as processing them one at a time.
+
+        Processing the items concurrently differs from processing them one at a
+        time when something goes wrong:
+
+        - The items are not processed in order, so an item failing doesn't stop
+          the items after it from being created. All the folders are created
+          first, then the files and symbolic links, and the first error is
+          raised once every item of the current step has been processed.
+        - A path which is a broken symbolic link counts as existing, and is left
+          as it is. One at a time, creating a folder there fails, and files are
+          copied or written to the target of the link.
+
+        Set :attr:`MAX_WORKERS` to 1 in a derived hook to keep the behavior of
+        processing the items one at a time.
 
         :param list(dict): List of actions that needs to take place.
 
@@ -102,6 +124,9 @@ class ProcessFolderCreation(Hook):
         :rtype: list(str)
         """
 
+        if self.MAX_WORKERS > 1:
+            return process_folder_creation_items(items, preview_mode, self.MAX_WORKERS)
+
         # set the umask so that we get true permissions
         old_umask = os.umask(0)
         locations = []
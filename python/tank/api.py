@@ -13,7 +13,6 @@ Classes for the main Sgtk API.
 """
 
 import os
-import glob
 
 from . import folder
 from . import context
@@ -21,6 +20,9 @@ from .util import shotgun, yaml_cache
 from .errors import TankError, TankMultipleMatchingTemplatesError
 from .path_cache import PathCache
 from .template import read_templates
+from .template_index import TemplateIndex
+from .template_walker import TemplatePathWalker, TemplateSequenceScanner
+from .templatekey import SequenceKey
 from . import constants
 from . import pipelineconfig
 from . import pipelineconfig_utils
@@ -62,6 +64,9 @@ class Sgtk(object):
         except TankError as e:
             raise TankError("Could not read templates configuration: %s" % e)
 
+        # precompiled index used to speed up template lookups from paths
+        self.__template_index = TemplateIndex(self.templates)
+
         # execute a tank_init hook for developers to use.
         self.execute_core_hook(constants.TANK_INIT_HOOK_NAME)
 
@@ -156,6 +161,21 @@ class Sgtk(object):
         """
         self.__cache[cache_key] = value
 
+    def get_template_cache_stats(self):
+        """
+        Returns statistics about the caching of fields extracted from paths
+        by each template, for diagnostics purposes.
+
+        Internal Use Only - We provide no guarantees that this method
+        will be backwards compatible.
+
+        :returns: Dictionary keyed by template name, with values being dictionaries
+                  with keys ``hits``, ``misses``, ``size`` and ``max_size``.
+        """
+        return dict(
+            (name, template._fields_cache.get_stats()) for name, template in self.templates.items()
+        )
+
     ################################################################################################
     # properties
 
@@ -344,10 +364,18 @@ class Sgtk(object):
         :raises: :class:`TankError`
         """
         try:
-            self.templates = read_templates(self.__pipeline_config)
+            templates = read_templates(self.__pipeline_config)
         except TankError as e:
             raise TankError("Templates could not be reloaded: %s" % e)
 
+        # the previous templates may still be referenced by client code, but
+        # their cached fields shouldn't linger once they've been replaced.
+        for template in self.templates.values():
+            template._fields_cache.clear()
+
+        self.templates = templates
+        self.__template_index = TemplateIndex(self.templates)
+
     def list_commands(self):
         """
         Lists the system commands registered with the system.
@@ -401,8 +429,13 @@ class Sgtk(object):
         :param path: Path to match against a template
         :returns: list of :class:`TemplatePath` or [] if no match could be found.
         """
+        # the templates dictionary is public and can be modified by client code,
+        # so make sure the index reflects its current content.
+        if self.__template_index is None or not self.__template_index.is_current(self.templates):
+            self.__template_index = TemplateIndex(self.templates)
+
         matched_templates = []
-        for key, template in self.templates.items():
+        for template in self.__template_index.get_candidates(path):
             if template.validate(path):
                 matched_templates.append(template)
         return matched_templates
@@ -488,9 +521,56 @@ class Sgtk(object):
         :returns: Matching file paths
         :rtype: List of strings.
         """
+        return list(
+            self.iter_paths_from_template(
+                template,
+                fields,
+                skip_keys=skip_keys,
+                skip_missing_optional_keys=skip_missing_optional_keys
+            )
+        )
+
+    def iter_paths_from_template(self, template, fields, skip_keys=None, skip_missing_optional_keys=False):
+        """
+        Finds paths that match a template using field values passed, yielding them
+        as they are found on disk.
+
+        This works exactly like :meth:`paths_from_template` but returns a generator,
+        which is useful when searching large directories as results can be processed
+        before the whole search is complete. Each directory is listed at most once
+        for the whole search, even when the template has optional keys.
+
+        .. note:: The result is not ordered in any particular way.
+
+        :param template: Template against whom to match.
+        :type  template: :class:`TemplatePath`
+        :param fields: Fields and values to use.
+        :type  fields: Dictionary
+        :param skip_keys: Keys whose values should be ignored from the fields parameter.
+        :type  skip_keys: List of key names
+        :param skip_missing_optional_keys: Specify if optional keys should be skipped if they
+                                        aren't found in the fields collection
+        :returns: Generator yielding matching file paths.
+        """
+        for found_file in self._iter_template_candidates(template, fields, skip_keys, skip_missing_optional_keys):
+            if template.validate(found_file):
+                yield found_file
+
+    def _iter_template_candidates(self, template, fields, skip_keys, skip_missing_optional_keys):
+        """
+        Finds paths on disk matching the glob strings built from a template and
+        field values, without validating them against the template.
+
+        See :meth:`iter_paths_from_template` for a description of the parameters.
+
+        :returns: Generator yielding unique file paths.
+        """
         skip_keys = skip_keys or []
         if isinstance(skip_keys, basestring):
             skip_keys = [skip_keys]
+        else:
+            # we might add keys to the list, don't modify the caller's one.
+            skip_keys = list(skip_keys)
         
         # construct local fields dictionary that doesn't include any skip keys:
         local_fields = dict((field, value) for field, value in fields.iteritems() if field not in skip_keys)
@@ -501,11 +581,14 @@ class Sgtk(object):
             if key not in skip_keys:
                 skip_keys.append(key)
             local_fields[key] = "*"
-            
+
+        # directory listings are shared by all key sets
+        walker = TemplatePathWalker()
+
         # iterate for each set of keys in the template:
         found_files = set()
         globs_searched = set()
-        for keys in template._keys:
+        for index, keys in enumerate(template._keys):
             # create fields and skip keys with those that 
             # are relevant for this key set:
             current_local_fields = local_fields.copy()
@@ -535,14 +618,19 @@ class Sgtk(object):
                 # string depending on the fields and skip-keys passed in
                 continue
             globs_searched.add(glob_str)
-            
-            # Find all files which are valid for this key set
-            found_files.update([found_file for found_file in glob.iglob(glob_str) if template.validate(found_file)])
-                    
-        return list(found_files) 
 
+            # key values can be validated while walking down the directories, as
+            # long as the values don't add directory levels to the glob string.
+            definition = None
+            if not [v for v in current_local_fields.values() if isinstance(v, basestring) and os.path.sep in v]:
+                definition = template._definitions[index]
 
-    def abstract_paths_from_template(self, template, fields):
+            for found_file in walker.iter_paths(glob_str, definition, keys):
+                if found_file not in found_files:
+                    found_files.add(found_file)
+                    yield found_file
+
+    def abstract_paths_from_template(self, template, fields, return_frame_ranges=False):
         """
         Returns an abstract path based on a template.
 
@@ -590,13 +678,27 @@ class Sgtk(object):
 
             /studio/my_proj/sequences/AAA/001/images/001.%04d.exr
 
+        Files which only differ by their abstract key values are grouped together as they
+        are found, and only one file of each group is parsed with the template. The frames
+        found for each abstract path can be returned as well::
+
+            >>> tk.abstract_paths_from_template(render, {"Sequence": "AAA", "Shot": "001"}, return_frame_ranges=True)
+            {'/studio/my_proj/sequences/AAA/001/images/%V/render_1.%04d.exr': {'SEQ': [(1, 50), (52, 100)]},
+             '/studio/my_proj/sequences/AAA/001/images/%V/render_2.%04d.exr': {'SEQ': [(1, 100)]}}
+
         :param template: Template with which to search
         :type  template: :class:`TemplatePath`
         :param fields: Mapping of keys to values with which to assemble the abstract path.
         :type fields: dictionary
+        :param bool return_frame_ranges: If True, a dictionary keyed by abstract path is returned,
+                                         with the contiguous ranges of frames found on disk for
+                                         each abstract sequence key, as a list of (first, last)
+                                         tuples keyed by key name. Keys whose files were not
+                                         listed because the leaf level was skipped are omitted.
 
         :returns: A list of paths whose abstract keys use their abstract(default) value unless
-                  a value is specified for them in the fields parameter.
+                  a value is specified for them in the fields parameter, or a dictionary if
+                  ``return_frame_ranges`` is True.
         """
         search_template = template
 
@@ -626,17 +728,17 @@ class Sgtk(object):
         if skip_leaf_level:
             search_template = template.parent
 
-        # now carry out a regular search based on the template
-        found_files = self.paths_from_template(search_template, fields)
+        # now carry out a regular search based on the template, the found
+        # files are validated as they are grouped into sequences.
+        found_files = self._iter_template_candidates(search_template, fields, None, False)
 
         st_abstract_key_names = [k.name for k in search_template.keys.values() if k.is_abstract]
 
         # now collapse down the search matches for any abstract fields,
         # and add the leaf level if necessary
-        abstract_paths = set()
-        for found_file in found_files:
-
-            cur_fields = search_template.get_fields(found_file)
+        scanner = TemplateSequenceScanner(search_template)
+        abstract_paths = {}
+        for cur_fields, abstract_values in scanner.iter_sequences(found_files):
 
             # pass 1 - go through the fields for this file and
             # zero out the abstract fields - this way, apply
@@ -660,9 +762,24 @@ class Sgtk(object):
 
             # now we have all the fields we need to compose the full template
             abstract_path = template.apply_fields(cur_fields)
-            abstract_paths.add(abstract_path)
 
-        return list(abstract_paths)
+            # several sequences can collapse to the same abstract path, e.g.
+            # one for each eye directory, so merge their frames.
+            path_frames = abstract_paths.setdefault(abstract_path, {})
+            for key_name, values in abstract_values.iteritems():
+                if isinstance(search_template.keys[key_name], SequenceKey):
+                    path_frames.setdefault(key_name, []).extend(values)
+
+        if not return_frame_ranges:
+            return list(abstract_paths)
+
+        return dict(
+            (abstract_path, dict(
+                (key_name, TemplateSequenceScanner.get_frame_ranges(frames))
+                for key_name, frames in path_frames.iteritems()
+            ))
+            for abstract_path, path_frames in abstract_paths.iteritems()
+        )
 
 
     def paths_from_entity(self, entity_type, entity_id):
@@ -679,7 +796,7 @@ class Sgtk(object):
         """
 
         # Use the path cache to look up all paths associated with this entity
-        path_cache = PathCache(self)
+        path_cache = PathCache(self, read_only=True)
         paths = path_cache.get_paths(entity_type, entity_id, primary_only=True)
         path_cache.close()
 
@@ -697,7 +814,7 @@ class Sgtk(object):
                   if no path was associated.
         """
         # Use the path cache to look up all paths associated with this entity
-        path_cache = PathCache(self)
+        path_cache = PathCache(self, read_only=True)
         entity = path_cache.get_entity(path)
         path_cache.close()
 
@@ -731,6 +848,22 @@ class Sgtk(object):
         """
         return context.from_path(self, path, previous_context)
 
+    def contexts_from_paths(self, paths, previous_context=None):
+        """
+        Factory method that constructs context objects from a list of paths on disk.
+
+        This is equivalent to calling :meth:`context_from_path` for each path, but much
+        faster for large numbers of paths: directories shared by the paths are only
+        looked up once and the path cache is queried in bulk.
+
+        :param paths: List of file system paths
+        :param previous_context: A context object to use to try to automatically extend the generated
+                                 contexts if they are incomplete, see :meth:`context_from_path`.
+        :type previous_context: :class:`Context`
+        :returns: Dictionary of :class:`Context` keyed by path.
+        """
+        return context.from_paths(self, paths, previous_context)
+
     def context_from_entity(self, entity_type, entity_id):
         """
         Factory method that constructs a context object from a Shotgun entity.
@@ -11,6 +11,8 @@
 import os
 import traceback
 import pprint
+import threading
+import Queue
 
 from . import constants
 
@@ -34,6 +36,10 @@ class CachedConfiguration(Configuration):
     automatic updates.
     """
 
+    # number of seconds between checks for completed downloads, so that the
+    # calling thread can be interrupted while bundles are being downloaded.
+    _DOWNLOAD_POLL_INTERVAL = 0.1
+
     def __init__(
         self,
         path,
@@ -457,7 +463,7 @@ class CachedConfiguration(Configuration):
                 core_information, self._descriptor, ex
             )
 
-    def cache_bundles(self, pipeline_configuration, engine_constraint, progress_cb):
+    def cache_bundles(self, pipeline_configuration, engine_constraint, progress_cb, concurrency=1):
         """
         Caches bundles from the configuration.
 
@@ -467,6 +473,7 @@ class CachedConfiguration(Configuration):
         :param engine_constraint: Name of the engine to constrain the caching to.
         :param progress_cb: Callback to invoke to report progress on bundle caching. The expected
             signature is: ``def progress_cb(message, current_bundle_idx, nb_total_bundles)``
+        :param int concurrency: Maximum number of bundles to download at the same time.
 
         """
         log.debug("Checking that all bundles are cached locally...")
@@ -498,6 +505,10 @@ class CachedConfiguration(Configuration):
                 descriptors[descriptor.get_uri()] = descriptor
 
         # pass 2 - download all apps
+        if concurrency > 1:
+            self._download_bundles_concurrently(descriptors.values(), concurrency, progress_cb)
+            return
+
         for idx, descriptor in enumerate(descriptors.values()):
             if not descriptor.exists_local():
                 message = "Downloading %s (%s of %s)..." % (descriptor, idx + 1, len(descriptors))
@@ -512,6 +523,87 @@ class CachedConfiguration(Configuration):
                 log.debug("%s exists locally at '%s'.", descriptor, descriptor.get_path())
                 progress_cb(message, idx, len(descriptors))
 
+    def _download_bundles_concurrently(self, descriptors, concurrency, progress_cb):
+        """
+        Downloads the missing bundles from a pool of worker threads.
+
+        Each bundle is still downloaded through :meth:`_download_bundle`, so it is
+        written to a temporary location and moved into the bundle cache once complete.
+        Progress is only reported from the calling thread, once for each bundle found
+        locally and once for each bundle as its download completes.
+
+        :param descriptors: List of descriptors to cache.
+        :param int concurrency: Maximum number of worker threads.
+        :param progress_cb: Callback to invoke to report progress on bundle caching.
+        """
+        nb_descriptors = len(descriptors)
+        nb_processed = 0
+
+        missing = Queue.Queue()
+        nb_missing = 0
+        for descriptor in descriptors:
+            if descriptor.exists_local():
+                message = "Checking %s (%s of %s)." % (descriptor, nb_processed + 1, nb_descriptors)
+                log.debug("%s exists locally at '%s'.", descriptor, descriptor.get_path())
+                progress_cb(message, nb_processed, nb_descriptors)
+                nb_processed += 1
+            else:
+                missing.put(descriptor)
+                nb_missing += 1
+
+        if nb_missing == 0:
+            return
+
+        log.debug("Downloading %s bundles using up to %s threads.", nb_missing, concurrency)
+        results = Queue.Queue()
+
+        def download_worker():
+            while True:
+                try:
+                    descriptor = missing.get_nowait()
+                except Queue.Empty:
+                    return
+                # the bundle is reported as failed unless its download completes,
+                # so the calling thread doesn't wait for it forever if this thread
+                # is stopped, e.g. by a SystemExit.
+                result = (descriptor, TankBootstrapError("The download was interrupted."), None)
+                try:
+                    self._download_bundle(descriptor)
+                    result = (descriptor, None, None)
+                except Exception as e:
+                    result = (descriptor, e, traceback.format_exc())
+                finally:
+                    results.put(result)
+
+        workers = []
+        for _ in range(min(concurrency, nb_missing)):
+            worker = threading.Thread(target=download_worker)
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+
+        nb_downloaded = 0
+        while nb_downloaded < nb_missing:
+            # waiting without a timeout can't be interrupted with Ctrl-C.
+            try:
+                descriptor, error, error_traceback = results.get(timeout=self._DOWNLOAD_POLL_INTERVAL)
+            except Queue.Empty:
+                continue
+            nb_downloaded += 1
+            if error:
+                log.error(
+                    "Downloading %r failed to complete successfully. This bundle will be skipped.", error
+                )
+                log.debug(error_traceback)
+                message = "Failed to download %s (%s of %s)." % (descriptor, nb_processed + 1, nb_descriptors)
+            else:
+                message = "Downloaded %s (%s of %s)." % (descriptor, nb_processed + 1, nb_descriptors)
+            progress_cb(message, nb_processed, nb_descriptors)
+            nb_processed += 1
+
+        for worker in workers:
+            worker.join()
+
     def _cleanup_backup_folders(self, config_backup_folder_path, core_backup_folder_path):
         """
         Cleans up backup folders generated by a call to the update_configuration method
@@ -156,12 +156,18 @@ class Configuration(object):
 
         return self._tank_from_path(path), sg_user
 
-    def cache_bundles(self, pipeline_configuration, engine_constraint, progress_cb):
+    def cache_bundles(self, pipeline_configuration, engine_constraint, progress_cb, concurrency=1):
         """
         Caches bundles for the configuration.
 
         Default implementation is valid for a configuration which has an already pre-populated
         local bundle cache.
+
+        :param pipeline_configuration: PipelineConfiguration we're bootstrapping into.
+        :param engine_constraint: Name of the engine to constrain the caching to.
+        :param progress_cb: Callback to invoke to report progress on bundle caching. The expected
+            signature is: ``def progress_cb(message, current_bundle_idx, nb_total_bundles)``
+        :param int concurrency: Maximum number of bundles to download at the same time.
         """
         log.debug("Configuration has local bundle cache, skipping bundle caching.")
 
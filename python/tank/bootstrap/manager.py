@@ -83,6 +83,7 @@ class ToolkitManager(object):
         self._do_shotgun_config_lookup = True
         self._plugin_id = None
         self._allow_config_overrides = True
+        self._bundle_download_concurrency = 1
 
         # look for the standard env var SHOTGUN_PIPELINE_CONFIGURATION_ID
         # and in case this is set, use it as a default
@@ -154,7 +155,8 @@ class ToolkitManager(object):
             "base_configuration": self.base_configuration,
             "do_shotgun_config_lookup": self.do_shotgun_config_lookup,
             "plugin_id": self.plugin_id,
-            "allow_config_overrides": self.allow_config_overrides
+            "allow_config_overrides": self.allow_config_overrides,
+            "bundle_download_concurrency": self.bundle_download_concurrency
         }
 
     def restore_settings(self, data):
@@ -176,6 +178,8 @@ class ToolkitManager(object):
         self.do_shotgun_config_lookup = data["do_shotgun_config_lookup"]
         self.plugin_id = data["plugin_id"]
         self.allow_config_overrides = data["allow_config_overrides"]
+        # Settings extracted by older versions of this class don't have this key.
+        self.bundle_download_concurrency = data.get("bundle_download_concurrency", 1)
 
     def _get_bundle_cache_fallback_paths(self):
         """
@@ -259,6 +263,36 @@ class ToolkitManager(object):
 
     allow_config_overrides = property(_get_allow_config_overrides, _set_allow_config_overrides)
 
+    def _set_bundle_download_concurrency(self, concurrency):
+        try:
+            concurrency = int(concurrency)
+        except (TypeError, ValueError):
+            raise TankBootstrapError(
+                "Invalid bundle download concurrency '%s'. Expected an integer." % (concurrency,)
+            )
+        if concurrency < 1:
+            raise TankBootstrapError(
+                "Invalid bundle download concurrency %d. Expected a value of at least 1." % concurrency
+            )
+        self._bundle_download_concurrency = concurrency
+
+    def _get_bundle_download_concurrency(self):
+        """
+        Maximum number of bundles downloaded at the same time when caching the bundles
+        of a configuration. Defaults to 1, which downloads bundles one after the other.
+
+        Higher values download bundles from several threads. Each download still goes
+        through the bootstrap hook and a temporary location before being moved into the
+        bundle cache, but the descriptors and bootstrap hook used by the configuration
+        must be able to download bundles from several threads at once.
+        """
+        return self._bundle_download_concurrency
+
+    bundle_download_concurrency = property(
+        _get_bundle_download_concurrency,
+        _set_bundle_download_concurrency
+    )
+
     def _set_pipeline_configuration(self, identifier):
         self._pipeline_configuration_identifier = identifier
 
@@ -671,7 +705,8 @@ class ToolkitManager(object):
             # If we're going to do a sparse cache, only cache for the engine
             # we're bootstrapping into.
             engine_name if self._caching_policy == self.CACHE_SPARSE else None,
-            report_bundle_progress
+            report_bundle_progress,
+            concurrency=self._bundle_download_concurrency
         )
 
     def get_pipeline_configurations(self, project):
@@ -10,16 +10,17 @@
 
 import os
 import fnmatch
-import cPickle
 
 from .action_base import Action
 from ..errors import TankError
 from ..util import yaml_cache
+from ..util.config_snapshot import ConfigSnapshot
+from .. import constants
 
 class CacheYamlAction(Action):
     """
     Action that ensures that crawls a config, caching all YAML data found
-    to disk as pickled data.
+    to disk as a configuration snapshot.
     """
     def __init__(self):
         Action.__init__(
@@ -72,23 +73,28 @@ class CacheYamlAction(Action):
         for root, dir_names, file_names in os.walk(root_dir):
             for file_name in fnmatch.filter(file_names, "*.yml"):
                 matches.append(os.path.join(root, file_name))
-        for path in matches:
-            log.debug("Caching %s..." % path)
-            yaml_cache.g_yaml_cache.get(path)
+        log.debug("Caching %d files..." % len(matches))
+        yaml_cache.g_yaml_cache.preload(matches)
 
         items = yaml_cache.g_yaml_cache.get_cached_items()
-        pickle_path = os.path.join(root_dir, "yaml_cache.pickle")
-        log.debug("Writing cache to %s" % pickle_path)
-
-        try:
-            fh = open(pickle_path, "wb")
-        except Exception as e:
-            raise TankError("Unable to open '%s' for writing: %s" % (pickle_path, e))
+        snapshot_path = os.path.join(root_dir, constants.CONFIG_SNAPSHOT_FILE)
+        log.debug("Writing configuration snapshot to %s" % snapshot_path)
+        num_items = ConfigSnapshot.write(
+            snapshot_path,
+            root_dir,
+            items,
+            self.tk.pipeline_configuration.get_core_hooks_location()
+        )
+        log.info("Wrote %d files to %s." % (num_items, snapshot_path))
 
-        try:
-            cPickle.dump(items, fh)
-        except Exception as e:
-            raise TankError("Unable to dump pickled cache data: %s" % e)
+        # the snapshot supersedes the cache written by older versions of this command.
+        pickle_path = os.path.join(root_dir, "yaml_cache.pickle")
+        if os.path.exists(pickle_path):
+            log.debug("Removing legacy cache %s" % pickle_path)
+            try:
+                os.remove(pickle_path)
+            except Exception as e:
+                log.warning("Unable to remove legacy cache %s: %s" % (pickle_path, e))
 
         log.info("")
         log.info("Cache yaml completed!")
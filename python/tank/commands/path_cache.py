@@ -90,7 +90,13 @@ class SynchronizePathCache(Action):
                          "run this command with a --full flag.")
                 
                 
-            folder.synchronize_folders(self.tk, full_sync)
+            def progress_callback(progress_value, message):
+                if progress_value is None:
+                    log.info(message)
+                else:
+                    log.info("[%3d%%] %s" % (int(progress_value * 100), message))
+
+            folder.synchronize_folders(self.tk, full_sync, progress_callback)
                 
             log.info("Local folder information has been synchronized.")
         
@@ -79,8 +79,40 @@ PROFILING_LOG_CHANNEL = "sgtk.stopwatch"
 # environment variable that if set, enables debug logging in the engine
 DEBUG_LOGGING_ENV_VAR = "TK_DEBUG"
 
-# cache data for toolkit init
-TOOLKIT_INIT_CACHE_FILE = "toolkit_init.cache"
+# maximum number of paths for which each template caches the extracted fields
+DEFAULT_TEMPLATE_FIELDS_CACHE_SIZE = 100
+
+# environment variable that can be used to override the number of paths cached
+# by each template. Setting it to 0 disables the cache.
+TEMPLATE_FIELDS_CACHE_SIZE_ENV_VAR = "TK_TEMPLATE_FIELDS_CACHE_SIZE"
+
+# environment variable holding the number of seconds during which the yaml cache
+# trusts a file it has checked on disk, instead of checking it on every request.
+# Not set or 0 means files are checked on every request.
+YAML_CACHE_STAT_TTL_ENV_VAR = "TK_YAML_CACHE_STAT_TTL"
+
+# environment variable that can be set to 1 to serve read only path cache lookups
+# from an in memory copy of the path cache database.
+PATH_CACHE_IN_MEMORY_ENV_VAR = "TK_PATH_CACHE_IN_MEMORY"
+
+# environment variable that can be set to 1 to keep the path cache database on the
+# local disk, using write-ahead logging, when it is synchronized with Shotgun.
+PATH_CACHE_LOCAL_REPLICA_ENV_VAR = "TK_PATH_CACHE_LOCAL_REPLICA"
+
+# environment variable that can be set to 1 to record, in the path cache database, the
+# entities whose deferred folders have been created for an engine, so that these
+# folders are not processed again until the schema changes.
+DEFERRED_FOLDERS_LEDGER_ENV_VAR = "TK_DEFERRED_FOLDERS_LEDGER"
+
+# file name of the path cache database kept on the local disk
+PATH_CACHE_LOCAL_REPLICA_FILE = "path_cache_local.db"
+
+# snapshot of the parsed yaml files of a configuration, written by tank cache_yaml
+CONFIG_SNAPSHOT_FILE = "yaml_cache.snapshot"
+
+# cache data for toolkit init, an sqlite database. Older cores use a pickle
+# file named toolkit_init.cache instead.
+TOOLKIT_INIT_CACHE_FILE = "toolkit_init.db"
 
 # Email address of Shotgun support
 SUPPORT_EMAIL = "support@shotgunsoftware.com"
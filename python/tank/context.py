@@ -1028,7 +1028,7 @@ class Context(object):
         found_fields = {}
 
         # get a path cache handle
-        path_cache = PathCache(self.__tk)
+        path_cache = PathCache(self.__tk, read_only=True)
         try:
             for template in templates:
                 # iterate over all keys in the {key_name:key} dictionary for the template
@@ -1447,56 +1447,106 @@ def from_path(tk, path, previous_context=None):
     :type previous_context: :class:`Context`
     :returns: :class:`Context`
     """
+    return from_paths(tk, [path], previous_context)[path]
 
-    # prep our return data structure
-    context = {
-        "tk": tk,
-        "project": None,
-        "entity": None,
-        "step": None,
-        "user": None,
-        "task": None,
-        "additional_entities": []
-    }
 
+def from_paths(tk, paths, previous_context=None):
+    """
+    Factory method that constructs context objects from a list of paths on disk.
+
+    This works like :meth:`from_path` for each path, but the directories shared by
+    the paths are only looked up once, with a few bulk queries on the path cache,
+    and the ``context_additional_entities`` core hook is only executed once.
+
+    :param paths: List of file system paths
+    :param previous_context: A context object to use to try to automatically extend the generated
+                             contexts if they are incomplete, see :meth:`from_path`.
+    :type previous_context: :class:`Context`
+    :returns: Dictionary of :class:`Context` keyed by path.
+    """
     # ask hook for extra entity types we should recognize and insert into the additional_entities list.
     additional_types = tk.execute_core_hook("context_additional_entities").get("entity_types_in_path", [])
 
-    # get a cache handle
-    path_cache = PathCache(tk)
-
     # gather all roots as lower case
     project_roots = [x.lower() for x in tk.pipeline_configuration.get_data_roots().values()]
 
-    # first gather entities
-    entities = []
-    secondary_entities = []
-    curr_path = path
-    while True:
-        curr_entity = path_cache.get_entity(curr_path)
-        if curr_entity:
-            # Don't worry about entity types we've already got in the context. In the future
-            # we should look for entity ids that conflict in order to flag a degenerate schema.
-            entities.append(curr_entity)
-        
-        # add secondary entities
-        secondary_entities.extend( path_cache.get_secondary_entities(curr_path) )
+    # first gather the directories to look up for each path, from the
+    # path itself upwards. Paths often share most of their directories.
+    path_levels = {}
+    all_levels = set()
+    for path in paths:
+        if path in path_levels:
+            continue
+        levels = []
+        curr_path = path
+        while True:
+            levels.append(curr_path)
 
-        if curr_path.lower() in project_roots:
-            #TODO this could fail with windows path variations
-            # we have reached a root!
-            break
+            if curr_path.lower() in project_roots:
+                #TODO this could fail with windows path variations
+                # we have reached a root!
+                break
 
-        # and continue with parent path
-        parent_path = os.path.abspath(os.path.join(curr_path, ".."))
+            # and continue with parent path
+            parent_path = os.path.abspath(os.path.join(curr_path, ".."))
 
-        if curr_path == parent_path:
-            # We're at the disk root, probably a degenerate path
-            break
-        else:
-            curr_path = parent_path
+            if curr_path == parent_path:
+                # We're at the disk root, probably a degenerate path
+                break
+            else:
+                curr_path = parent_path
+        path_levels[path] = levels
+        all_levels.update(levels)
+
+    # look up all the directories at once
+    path_cache = PathCache(tk, read_only=True)
+    try:
+        level_entities = path_cache.get_entities_for_paths(list(all_levels))
+    finally:
+        path_cache.close()
+
+    contexts = {}
+    for path, levels in path_levels.iteritems():
+        entities = []
+        secondary_entities = []
+        for level in levels:
+            # levels are shared by paths, give each context its own entity dictionaries.
+            curr_entity, curr_secondary_entities = level_entities[level]
+            if curr_entity:
+                # Don't worry about entity types we've already got in the context. In the future
+                # we should look for entity ids that conflict in order to flag a degenerate schema.
+                entities.append(dict(curr_entity))
+            # add secondary entities
+            secondary_entities.extend(dict(entity) for entity in curr_secondary_entities)
+
+        contexts[path] = _from_path_entities(
+            tk, entities, secondary_entities, additional_types, previous_context
+        )
 
-    path_cache.close()
+    return contexts
+
+
+def _from_path_entities(tk, entities, secondary_entities, additional_types, previous_context):
+    """
+    Constructs a context from the entities found in the path cache for a path.
+
+    :param entities: Primary entities found for the path, from the leaf level upwards.
+    :param secondary_entities: Secondary entities found for the path, from the leaf level upwards.
+    :param additional_types: Entity types to add to the additional entities of the context.
+    :param previous_context: A context object to use to try to automatically extend the generated
+                             context if it is incomplete, see :meth:`from_path`.
+    :returns: :class:`Context`
+    """
+    # prep our return data structure
+    context = {
+        "tk": tk,
+        "project": None,
+        "entity": None,
+        "step": None,
+        "user": None,
+        "task": None,
+        "additional_entities": []
+    }
 
     # now populate the context
     # go from the root down, so that in the case there are a path with
@@ -1786,7 +1836,7 @@ def _context_data_from_cache(tk, entity_type, entity_id):
 
     # Use the path cache to look up all paths linked to the entity and use that to extract
     # extra entities we should include in the context
-    path_cache = PathCache(tk)
+    path_cache = PathCache(tk, read_only=True)
 
     # Grab all project roots
     project_roots = tk.pipeline_configuration.get_data_roots().values()
@@ -14,12 +14,23 @@ Handles the creation of a configuration object structure based on the folder con
 """
 
 import os
+import stat
+import time
 import fnmatch
+import hashlib
+import threading
+import contextlib
 
 from .folder_types import Static, ListField, Entity, Project, UserWorkspace, ShotgunStep, ShotgunTask
 
 from ..errors import TankError, TankUnreadableFileError
 from ..util import yaml_cache
+from .. import LogManager
+
+log = LogManager.get_logger(__name__)
+
+# key of the folder configuration in the tk instance cache
+_FOLDER_CONFIGURATION_CACHE_KEY = "folder_configuration"
 
 
 def read_ignore_files(schema_config_path):
@@ -43,6 +54,97 @@ def read_ignore_files(schema_config_path):
             open_file.close()
     return ignore_files
 
+def _get_schema_signature(schema_config_path):
+    """
+    Returns the path, modification time and size of all the files and
+    folders in a schema, which changes when the schema is modified.
+
+    :param schema_config_path: Path to the schema.
+    :returns: List of tuples.
+    """
+    signature = []
+    parent_paths = [schema_config_path]
+    while parent_paths:
+        parent_path = parent_paths.pop()
+        for file_name in sorted(os.listdir(parent_path)):
+            full_path = os.path.join(parent_path, file_name)
+            file_stat = os.lstat(full_path)
+            if stat.S_ISLNK(file_stat.st_mode):
+                try:
+                    file_stat = os.stat(full_path)
+                except OSError:
+                    # broken symbolic link, only the link itself can be checked.
+                    pass
+            signature.append((full_path, file_stat.st_mtime, file_stat.st_size))
+            if stat.S_ISDIR(file_stat.st_mode):
+                parent_paths.append(full_path)
+    return signature
+
+
+def get_folder_configuration(tk):
+    """
+    Returns the folder configuration for the schema of a tk instance.
+
+    The folder configuration is kept in the tk instance's cache, and is only loaded
+    again when files or folders of the schema have been added, removed or modified.
+    The schema is not checked again within the yaml cache's ``stat_ttl`` after it
+    was last checked, or at all when the yaml cache is static. Since the instance
+    is shared, folder creation must go through :meth:`FolderConfiguration.use`.
+
+    :param tk: Tk API instance
+    :returns: :class:`FolderConfiguration` instance.
+    """
+    schema_config_path = tk.pipeline_configuration.get_schema_config_location()
+    cached = tk.get_cache_item(_FOLDER_CONFIGURATION_CACHE_KEY)
+
+    signature = None
+    if cached and cached["path"] == schema_config_path:
+        if yaml_cache.g_yaml_cache.is_static or \
+           time.time() - cached["checked_at"] < yaml_cache.g_yaml_cache.stat_ttl:
+            return cached["config"]
+
+        signature = _get_schema_signature(schema_config_path)
+        if signature == cached["signature"]:
+            cached["checked_at"] = time.time()
+            return cached["config"]
+
+        log.debug("Folder schema '%s' has changed since it was loaded.", schema_config_path)
+
+    if signature is None:
+        signature = _get_schema_signature(schema_config_path)
+
+    start_time = time.time()
+    config = FolderConfiguration(tk, schema_config_path)
+    log.debug("Loaded folder schema '%s' in %.3f seconds.", schema_config_path, time.time() - start_time)
+
+    tk.set_cache_item(
+        _FOLDER_CONFIGURATION_CACHE_KEY,
+        {
+            "path": schema_config_path,
+            "signature": signature,
+            "checksum": hashlib.md5(repr(signature)).hexdigest(),
+            "checked_at": time.time(),
+            "config": config
+        }
+    )
+    return config
+
+
+def get_schema_checksum(tk):
+    """
+    Returns a checksum of the schema of a tk instance, which changes when files or
+    folders of the schema are added, removed or modified.
+
+    The schema is checked following the same rules as :meth:`get_folder_configuration`,
+    which loads the folder configuration if it isn't loaded yet.
+
+    :param tk: Tk API instance
+    :returns: Checksum string.
+    """
+    get_folder_configuration(tk)
+    return tk.get_cache_item(_FOLDER_CONFIGURATION_CACHE_KEY)["checksum"]
+
+
 class FolderConfiguration(object):
     """
     Class that loads the schema from disk and constructs folder objects.
@@ -53,6 +155,9 @@ class FolderConfiguration(object):
         Constructor
         """
         self._tk = tk
+
+        # folder objects hold data for the folder creation using them
+        self._lock = threading.Lock()
         
         # access shotgun nodes by their entity_type
         self._entity_nodes_by_type = {}
@@ -82,6 +187,27 @@ class FolderConfiguration(object):
         """
         return self._step_fields
 
+    def clear_cached_data(self):
+        """
+        Clears the Shotgun data cached by the folder objects, see
+        :meth:`Folder.clear_cached_data`.
+        """
+        for project_obj in self._entity_nodes_by_type["Project"]:
+            project_obj.clear_cached_data()
+
+    @contextlib.contextmanager
+    def use(self):
+        """
+        Context manager reserving the folder objects for a folder creation.
+
+        The folder objects cache Shotgun data while folders are created, so other
+        threads using the same configuration wait until the folder creation is done.
+        The cached data is cleared before the folder objects are used.
+        """
+        with self._lock:
+            self.clear_cached_data()
+            yield self
+
     ####################################################################################
     # utility methods
 
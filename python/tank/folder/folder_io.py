@@ -26,7 +26,7 @@ class FolderIOReceiver(object):
     Class that encapsulates all the IO operations from the various folder classes.
     """
     
-    def __init__(self, tk, preview, entity_type, entity_ids):
+    def __init__(self, tk, preview, entity_type, entity_ids, shotgun=None):
         """
         Constructor.
         
@@ -34,9 +34,12 @@ class FolderIOReceiver(object):
         :param preview: boolean set to true if run in preview mode
         :param entity_type: string with the sg entity type from the main folder creation request
         :param entity_ids: list of ids of the sg object for which folder creation was requested.
+        :param shotgun: Shotgun API instance the folder classes should query. Defaults to
+                        the tk api instance's connection.
         
         """
         self._tk = tk
+        self._shotgun = shotgun
         self._preview_mode = preview
         self._items = list()
         self._secondary_cache_entries = list() 
@@ -48,7 +51,7 @@ class FolderIOReceiver(object):
     # methods to call to actually execute the folder creation logic
         
     @classmethod
-    def sync_path_cache(cls, tk, full_sync):
+    def sync_path_cache(cls, tk, full_sync, progress_callback=None):
         """
         Synchronizes the path cache folders.
         This happens as part of execute_folder_creation(), but sometimes it is 
@@ -56,6 +59,8 @@ class FolderIOReceiver(object):
 
         :param tk: A tk API instance
         :param full_sync: Do a full sync
+        :param progress_callback: Optional callable reporting the progress of a full sync,
+                                  see :meth:`PathCache.synchronize`.
         :returns: A list of paths which were calculated to be created
         """        
         path_cache = PathCache(tk)
@@ -68,7 +73,7 @@ class FolderIOReceiver(object):
     
             # new items that were not locally available are returned
             # as a list of dicts with keys id, type, name, configuration and path
-            rd = path_cache.synchronize(full_sync)
+            rd = path_cache.synchronize(full_sync, progress_callback)
                 
             # for each item we get back from the path cache synchronization,
             # issue a remote entity folder request and pass that down to 
@@ -200,6 +205,15 @@ class FolderIOReceiver(object):
         
     ####################################################################################
     # methods called by the folder classes
+
+    @property
+    def shotgun(self):
+        """
+        The Shotgun API instance the folder classes should use for their queries.
+        """
+        if self._shotgun is None:
+            return self._tk.shotgun
+        return self._shotgun
             
     def register_secondary_entity(self, path, entity, config_metadata):
         """
@@ -94,6 +94,15 @@ class Folder(object):
         else:
             return [self._parent] + self._parent.get_parents()
             
+    def clear_cached_data(self):
+        """
+        Clears any Shotgun data cached by this node and its children during
+        folder creation, so that a reused folder configuration doesn't return
+        stale data.
+        """
+        for child in self._children:
+            child.clear_cached_data()
+
     def add_file(self, path):
         """
         Adds a file name that should be added to this folder as part of processing.
@@ -130,7 +130,7 @@ class Entity(Folder):
         """
         items_created = []
         
-        for entity in self.__get_entities(sg_data):
+        for entity in self.__get_entities(io_receiver.shotgun, sg_data):
 
             # generate the field name            
             folder_name = self._entity_expression.generate_name(entity)
@@ -178,9 +178,12 @@ class Entity(Folder):
             entity_link = entity[lf]
             io_receiver.register_secondary_entity(path, entity_link, self._config_metadata)
 
-    def __get_entities(self, sg_data):
+    def __get_entities(self, sg, sg_data):
         """
         Returns shotgun data for folder creation
+
+        :param sg: Shotgun API instance
+        :param sg_data: Shotgun data dictionary
         """
         # first check the constraints: if tokens contains a type/id pair our our type,
         # we should only process this single entity. If not, then use the query filter
@@ -199,6 +202,18 @@ class Entity(Folder):
             )
             # get data - can be None depending on external filters
 
+        # convert to a list - sets wont work with the SG API
+        fields_list = list(self._get_shotgun_fields())
+        
+        # now find all the items (e.g. shots) matching this query
+        entities = sg.find(self._entity_type, resolved_filters, fields_list)
+        
+        return entities
+
+    def _get_shotgun_fields(self):
+        """
+        Returns the set of shotgun fields needed to create folders for this node.
+        """
         # figure out which fields to retrieve
         fields = self._entity_expression.get_shotgun_fields()
         
@@ -212,13 +227,94 @@ class Entity(Folder):
         for custom_field in self._get_additional_sg_fields():
             fields.add(custom_field)
 
-        # convert to a list - sets wont work with the SG API
-        fields_list = list(fields)
+        return fields
+
+    def _get_upwards_query(self):
+        """
+        Returns the query used to extract the shotgun data of this node,
+        see :meth:`extract_shotgun_data_upwards`.
+
+        :returns: Tuple with the list of filter conditions, not including the
+                  id condition, the list of fields to retrieve and a dictionary
+                  of :class:`FilterExpressionToken` keyed by the link field they
+                  get their value from.
+        """
+        link_map = {}
+        fields_to_retrieve = []
+        additional_filters = []
         
-        # now find all the items (e.g. shots) matching this query
-        entities = self._tk.shotgun.find(self._entity_type, resolved_filters, fields_list)
+        # TODO: Support nested conditions
+        for condition in self._filters["conditions"]:
+            vals = condition["values"]
+            
+            # note the $FROM$ condition below - this is a bit of a hack to make sure we exclude
+            # the special $FROM$ step based culling filter that is commonly used. Because steps are 
+            # sort of free floating and not associated with an entity, removing them from the 
+            # resolve should be fine in most cases.
+            
+            # so - if at the shot level, we have defined the following filter:
+            # filters: [ { "path": "sg_sequence", "relation": "is", "values": [ "$sequence" ] } ]
+            # the $sequence will be represented by a Token object and we need to get a value for 
+            # this token. We fetch the id for this token and then, as we recurse upwards, and process
+            # the parent folder level (the sequence), this id will be the "seed" when we populate that
+            # level. 
+            
+            if vals[0] and isinstance(vals[0], FilterExpressionToken) and not condition["path"].startswith('$FROM$'):
+                expr_token = vals[0]
+                # we should get this field (eg. 'sg_sequence')
+                fields_to_retrieve.append(condition["path"])
+                # add to our map for later processing map['sg_sequence'] = 'Sequence'
+                # note that for List fields, the key is EntityType.field
+                link_map[ condition["path"] ] = expr_token 
+            
+            elif not condition["path"].startswith('$FROM$'):
+                # this is a normal filter (we exclude the $FROM$ stuff since it is weird
+                # and specific to steps.) So for example 'name must begin with X' - we want 
+                # to include these in the query where we are looking for the object, to
+                # ensure that assets with names starting with X are not created for an 
+                # asset folder node which explicitly excludes these via its filters. 
+                additional_filters.append(condition)
         
-        return entities
+        # add some extra fields apart from the stuff in the config
+        field_name = shotgun_entity.get_sg_entity_name_field(self._entity_type)
+        fields_to_retrieve.append(field_name)
+
+        return (additional_filters, fields_to_retrieve, link_map)
+
+    def prefetch_shotgun_data(self, sg_prefetch, entity_ids):
+        """
+        Fetches the shotgun data of several entities for this node in a single query.
+
+        The records cover both the queries run by :meth:`extract_shotgun_data_upwards`
+        and the queries run during folder creation for these entities, so that these
+        can be answered by the :class:`~tank.folder.prefetch.ShotgunPrefetch` instead
+        of Shotgun.
+
+        :param sg_prefetch: :class:`~tank.folder.prefetch.ShotgunPrefetch` instance.
+        :param entity_ids: Ids of the entities to fetch.
+        :returns: Dictionary with the ids of the linked entities the parent nodes
+                  will need, keyed by their shotgun data key.
+        """
+        (conditions, fields, link_map) = self._get_upwards_query()
+
+        fields = set(fields)
+        fields.update(self._get_shotgun_fields())
+        # retrieve the fields of the $token filters so they can be checked
+        # against the values passed down during folder creation.
+        for condition in self._filters["conditions"]:
+            if not condition["path"].startswith("$FROM$"):
+                fields.add(condition["path"])
+
+        records = sg_prefetch.prefetch(self._entity_type, conditions, fields, entity_ids)
+
+        linked_ids = {}
+        for (field, link_obj) in link_map.iteritems():
+            for record in records:
+                value = record.get(field)
+                if isinstance(value, dict) and value.get("type") == link_obj.get_entity_type():
+                    linked_ids.setdefault(link_obj.get_sg_data_key(), set()).add(value["id"])
+
+        return linked_ids
 
     def extract_shotgun_data_upwards(self, sg, shotgun_data):
         """
@@ -266,58 +362,19 @@ class Entity(Folder):
         my_sg_data_key = FilterExpressionToken.sg_data_key_for_folder_obj(self)
         if my_sg_data_key in tokens:
 
-            
-            link_map = {}
-            fields_to_retrieve = []
-            additional_filters = []
-            
-            # TODO: Support nested conditions
-            for condition in self._filters["conditions"]:
-                vals = condition["values"]
-                
-                # note the $FROM$ condition below - this is a bit of a hack to make sure we exclude
-                # the special $FROM$ step based culling filter that is commonly used. Because steps are 
-                # sort of free floating and not associated with an entity, removing them from the 
-                # resolve should be fine in most cases.
-                
-                # so - if at the shot level, we have defined the following filter:
-                # filters: [ { "path": "sg_sequence", "relation": "is", "values": [ "$sequence" ] } ]
-                # the $sequence will be represented by a Token object and we need to get a value for 
-                # this token. We fetch the id for this token and then, as we recurse upwards, and process
-                # the parent folder level (the sequence), this id will be the "seed" when we populate that
-                # level. 
-                
-                if vals[0] and isinstance(vals[0], FilterExpressionToken) and not condition["path"].startswith('$FROM$'):
-                    expr_token = vals[0]
-                    # we should get this field (eg. 'sg_sequence')
-                    fields_to_retrieve.append(condition["path"])
-                    # add to our map for later processing map['sg_sequence'] = 'Sequence'
-                    # note that for List fields, the key is EntityType.field
-                    link_map[ condition["path"] ] = expr_token 
-                
-                elif not condition["path"].startswith('$FROM$'):
-                    # this is a normal filter (we exclude the $FROM$ stuff since it is weird
-                    # and specific to steps.) So for example 'name must begin with X' - we want 
-                    # to include these in the query where we are looking for the object, to
-                    # ensure that assets with names starting with X are not created for an 
-                    # asset folder node which explicitly excludes these via its filters. 
-                    additional_filters.append(condition)
-            
-            # add some extra fields apart from the stuff in the config
+            (additional_filters, fields_to_retrieve, link_map) = self._get_upwards_query()
             field_name = shotgun_entity.get_sg_entity_name_field(self._entity_type)
-            fields_to_retrieve.append(field_name)
 
-            
             # TODO: AND the id query with this folder's query to make sure this path is
             # valid for the current entity. Throw error if not so driver code knows to 
             # stop processing. This would be needed in a setup where (for example) Asset
             # appears in several locations in the filesystem and that the filters are responsible
             # for determining which location to use for a particular asset.
             my_id = tokens[ my_sg_data_key ]["id"]
-            additional_filters.append( {"path": "id", "relation": "is", "values": [my_id]})
+            id_filter = {"path": "id", "relation": "is", "values": [my_id]}
             
             # append additional filter cruft
-            filter_dict = { "logical_operator": "and", "conditions": additional_filters }
+            filter_dict = { "logical_operator": "and", "conditions": additional_filters + [id_filter] }
             
             # carry out find
             rec = sg.find_one(self._entity_type, filter_dict, fields_to_retrieve)
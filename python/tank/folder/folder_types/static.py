@@ -105,6 +105,13 @@ class Static(Folder):
         
         self._cached_sg_data = {}
     
+    def clear_cached_data(self):
+        """
+        Clears the cached results of the constraint queries.
+        """
+        self._cached_sg_data = {}
+        super(Static, self).clear_cached_data()
+
     def is_dynamic(self):
         """
         Returns true if this folder node requires some sort of dynamic input
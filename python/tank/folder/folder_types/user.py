@@ -53,6 +53,7 @@ class UserWorkspace(Entity):
         # lazy setup: we defer the lookup of the current user until the folder node
         # is actually being utilized, see extract_shotgun_data_upwards() below
         self._user_initialized = False
+        self._user_filter = None
         
         # user work spaces are always deferred so make sure to add a setting to the metadata
         # note: This should ideally be a parameter passed to the base class.
@@ -68,6 +69,21 @@ class UserWorkspace(Entity):
                         entity_filter, 
                         create_with_parent=True)
         
+    def clear_cached_data(self):
+        """
+        Clears the current user from the filter query, so that it is looked up
+        again the next time folders are created.
+        """
+        if self._user_initialized:
+            conditions = self._filters["conditions"]
+            for (idx, condition) in enumerate(conditions):
+                if condition is self._user_filter:
+                    del conditions[idx]
+                    break
+            self._user_filter = None
+            self._user_initialized = False
+        super(UserWorkspace, self).clear_cached_data()
+
     def create_folders(self, io_receiver, path, sg_data, is_primary, explicit_child_list, engine):
         """
         Inherited and wrapps base class implementation
@@ -99,8 +115,8 @@ class UserWorkspace(Entity):
                        "user in shotgun.")
                 raise TankError(msg)
     
-            user_filter = { "path": "id", "relation": "is", "values": [ user["id"] ] }
-            self._filters["conditions"].append( user_filter )            
+            self._user_filter = { "path": "id", "relation": "is", "values": [ user["id"] ] }
+            self._filters["conditions"].append( self._user_filter )            
             self._user_initialized = True
         
         return Entity.create_folders(self, io_receiver, path, sg_data, is_primary, explicit_child_list, engine)
@@ -0,0 +1,516 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Concurrent execution of the folder creation items.
+
+"""
+
+import os
+import sys
+import time
+import unicodedata
+import errno
+import shutil
+import threading
+import Queue
+
+from ..util import filesystem
+from .. import LogManager
+
+log = LogManager.get_logger(__name__)
+
+# default number of threads used to process folder creation items
+DEFAULT_MAX_WORKERS = 8
+
+
+def _run_concurrently(func, args_list, max_workers):
+    """
+    Calls a function for each set of arguments from a pool of threads.
+
+    :param func: Function to call.
+    :param args_list: List of argument tuples.
+    :param int max_workers: Maximum number of threads.
+    :returns: List of ``(result, exc_info)`` tuples in the order of the arguments,
+              where ``exc_info`` is the ``sys.exc_info()`` of a failed call, or
+              None.
+    """
+    results = [None] * len(args_list)
+
+    def run(idx):
+        try:
+            results[idx] = (func(*args_list[idx]), None)
+        except Exception:
+            # keep the traceback, so the error can be raised again as it was.
+            results[idx] = (None, sys.exc_info())
+
+    if max_workers <= 1 or len(args_list) <= 1:
+        for idx in range(len(args_list)):
+            run(idx)
+        return results
+
+    indices = Queue.Queue()
+    for idx in range(len(args_list)):
+        indices.put(idx)
+
+    def worker():
+        while True:
+            try:
+                idx = indices.get_nowait()
+            except Queue.Empty:
+                return
+            run(idx)
+
+    workers = [threading.Thread(target=worker) for _ in range(min(max_workers, len(args_list)))]
+    for thread in workers:
+        thread.daemon = True
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return results
+
+
+def _raise_first_error(results):
+    """
+    Raises the error of the first failed call returned by :meth:`_run_concurrently`,
+    with the traceback of the thread it was raised in.
+
+    :param results: List of ``(result, exc_info)`` tuples.
+    """
+    for (_, exc_info) in results:
+        if exc_info is not None:
+            raise exc_info[0], exc_info[1], exc_info[2]
+
+
+def _make_folder(path):
+    """
+    Creates a folder and any missing parent folders with open permissions.
+
+    :param path: Path of the folder to create.
+    """
+    try:
+        os.makedirs(path, 0777)
+    except OSError:
+        # another thread or process may have created it in the meantime.
+        if not os.path.isdir(path):
+            raise
+
+
+def _open_new_file(path):
+    """
+    Opens a file for writing, provided it doesn't exist yet.
+
+    :param path: Path of the file to create.
+    :returns: File object, or None if the file already exists.
+    """
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0666)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+        # like the process_folder_creation hook, never overwrite existing files.
+        log.debug("Not overwriting existing file '%s'.", path)
+        return None
+    return os.fdopen(fd, "wb")
+
+
+def _copy_file(source_path, target_path):
+    """
+    Copies a file, unless the copy already exists, and sets open permissions on the copy.
+
+    :param source_path: Path of the file to copy.
+    :param target_path: Path of the copy.
+    """
+    with open(source_path, "rb") as source_fp:
+        target_fp = _open_new_file(target_path)
+        if target_fp is None:
+            return
+        with target_fp:
+            shutil.copyfileobj(source_fp, target_fp)
+    os.chmod(target_path, 0666)
+
+
+def _create_file(path, content):
+    """
+    Creates a file with open permissions, unless it already exists.
+
+    :param path: Path of the file to create.
+    :param content: Content of the file.
+    """
+    fp = _open_new_file(path)
+    if fp is None:
+        return
+    with fp:
+        fp.write(content)
+    os.chmod(path, 0666)
+
+
+def _fold_name(name):
+    """
+    Returns a form of a file name which is the same for all the names a case
+    insensitive or normalizing file system considers equal.
+
+    :param name: File name.
+    :returns: Case folded and unicode normalized name.
+    """
+    if isinstance(name, str):
+        try:
+            name = name.decode("utf-8")
+        except UnicodeDecodeError:
+            return name.lower()
+    return unicodedata.normalize("NFC", name).lower()
+
+
+# listing of a missing folder
+_EMPTY_LISTING = (frozenset(), frozenset())
+
+
+def _list_folder(path):
+    """
+    Lists the names of the files and folders in a folder.
+
+    :param path: Path of the folder.
+    :returns: Tuple with the set of names and the set of folded names, see
+              :meth:`_fold_name`. Both are empty if the folder doesn't exist or
+              isn't a folder.
+    """
+    try:
+        names = set(os.listdir(path))
+    except OSError as e:
+        if e.errno in (errno.ENOENT, errno.ENOTDIR):
+            return _EMPTY_LISTING
+        raise
+    return (names, set(_fold_name(name) for name in names))
+
+
+class FileSystemSnapshot(object):
+    """
+    Snapshot of which paths exist, taken from a single listing of their folders.
+
+    The folders containing the paths are listed top down from the highest of these
+    folders, one level at a time and concurrently within a level. Folders which are
+    missing from the listing of their parent are known to be empty and are not listed,
+    so checking the paths of a new folder structure needs very few file system calls.
+    Names are compared as listed, which means a broken symbolic link is reported as
+    existing by :meth:`exists`.
+
+    Whether names which only differ by case or unicode normalization are the same
+    depends on the file system, so these paths are checked on the file system, and
+    such folders are listed using the path being checked.
+    """
+
+    def __init__(self, paths, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        :param paths: Paths which will be checked.
+        :param int max_workers: Maximum number of threads listing folders.
+        """
+        start_time = time.time()
+        # listings by folder, see _list_folder()
+        self._listings = {}
+        self._num_listings = 0
+        self._num_fallbacks = 0
+
+        folders = set(os.path.dirname(path) for path in paths)
+        # folders to check in the listing of each folder, which includes the
+        # folders between two folders of the paths.
+        children = {}
+        roots = []
+        for folder in sorted(folders, key=lambda path: (path.count(os.path.sep), path)):
+            chain = [folder]
+            parent = os.path.dirname(folder)
+            while parent != chain[-1] and parent not in folders:
+                chain.append(parent)
+                parent = os.path.dirname(parent)
+            if parent == chain[-1]:
+                # no other folder above this one.
+                roots.append(folder)
+                continue
+            chain.append(parent)
+            for (child, parent) in zip(chain, chain[1:]):
+                children.setdefault(parent, set()).add(child)
+
+        to_list = roots
+        while to_list:
+            results = _run_concurrently(_list_folder, [(path,) for path in to_list], max_workers)
+            self._num_listings += len(to_list)
+            next_to_list = []
+            for (path, (listing, exc_info)) in zip(to_list, results):
+                if exc_info is not None:
+                    # leave the paths of this folder to os.path.
+                    log.debug("Could not list folder '%s': %s", path, exc_info[1])
+                    continue
+                self._listings[path] = listing
+                for child in sorted(children.get(path, [])):
+                    if _fold_name(os.path.basename(child)) in listing[1]:
+                        # listing the folder with the path of the child gives the right
+                        # result even if the names only match on some file systems.
+                        next_to_list.append(child)
+                    else:
+                        self._listings[child] = _EMPTY_LISTING
+                        # nothing exists below a missing folder either.
+                        self._set_missing(child, children)
+            to_list = next_to_list
+
+        self._duration = time.time() - start_time
+
+    def __repr__(self):
+        return "<FileSystemSnapshot %d folders, %d listings>" % (len(self._listings), self._num_listings)
+
+    def _set_missing(self, path, children):
+        """
+        Records that the folders below a missing folder don't exist.
+        """
+        for child in children.get(path, []):
+            self._listings[child] = _EMPTY_LISTING
+            self._set_missing(child, children)
+
+    @property
+    def num_listings(self):
+        """
+        Number of folders listed.
+        """
+        return self._num_listings
+
+    @property
+    def num_fallbacks(self):
+        """
+        Number of paths checked on the file system, because their folder couldn't be listed
+        or their name only matches a listed name on some file systems.
+        """
+        return self._num_fallbacks
+
+    @property
+    def duration(self):
+        """
+        Number of seconds taken by the listings.
+        """
+        return self._duration
+
+    def exists(self, path):
+        """
+        Checks if a path exists, see :meth:`os.path.exists`.
+        """
+        return self._check(path, os.path.exists)
+
+    def lexists(self, path):
+        """
+        Checks if a path exists, without following symbolic links, see :meth:`os.path.lexists`.
+        """
+        return self._check(path, os.path.lexists)
+
+    def _check(self, path, fallback):
+        """
+        Checks if a path is in the listing of its folder, or with the fallback
+        if the folder hasn't been listed or if the name only differs from a
+        listed name by case or normalization.
+        """
+        listing = self._listings.get(os.path.dirname(path))
+        name = os.path.basename(path)
+        if listing is not None:
+            if name in listing[0]:
+                return True
+            if _fold_name(name) not in listing[1]:
+                return False
+        self._num_fallbacks += 1
+        return fallback(path)
+
+
+class _FolderCreationPlan(object):
+    """
+    Works out which folder creation items need to be processed.
+
+    The default process_folder_creation hook processes the items one at a time and
+    checks if each path exists before creating it, which means that items can be
+    skipped because an earlier item created them or one of their parents. This plan
+    replays these rules from a single snapshot of the paths which exist, so that it
+    returns the same locations as the hook while the IO can be done concurrently.
+    """
+
+    def __init__(self, items, preview_mode, snapshot):
+        """
+        :param items: List of folder creation items.
+        :param preview_mode: True if nothing should be created.
+        :param snapshot: :class:`FileSystemSnapshot` of the paths of the items.
+        """
+        self._preview_mode = preview_mode
+        self._snapshot = snapshot
+        self._created_paths = set()
+
+        self.locations = []
+        self.folders = []
+        self.files = []
+        self.symlinks = []
+        # items which create or would create something
+        self.missing_items = []
+
+        for item in items:
+            self._add_item(item)
+
+    @classmethod
+    def get_checked_paths(cls, items):
+        """
+        Returns the paths checked to plan the given items.
+
+        :param items: List of folder creation items.
+        :returns: List of paths.
+        """
+        paths = []
+        for item in items:
+            action = item.get("action")
+            if action in ["entity_folder", "folder"]:
+                paths.append(item.get("path"))
+            elif action == "symlink":
+                if sys.platform != "win32":
+                    paths.append(item.get("path"))
+            elif action == "copy":
+                paths.append(item.get("target_path"))
+            elif action == "create_file":
+                paths.append(os.path.dirname(item.get("path")))
+                paths.append(item.get("path"))
+        return paths
+
+    def _exists(self, path, check="exists"):
+        """
+        Checks if a path exists at this point of the plan.
+        """
+        if path in self._created_paths:
+            return True
+        if check == "lexists":
+            return self._snapshot.lexists(path)
+        return self._snapshot.exists(path)
+
+    def _created(self, path, with_parents=False):
+        """
+        Records that a path is created at this point of the plan.
+        """
+        self._created_paths.add(path)
+        while with_parents:
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            self._created_paths.add(parent)
+            path = parent
+
+    def _add_item(self, item):
+        """
+        Adds an item to the plan, following the rules of the process_folder_creation hook.
+        """
+        num_locations = len(self.locations)
+        self._plan_item(item)
+        if len(self.locations) > num_locations:
+            self.missing_items.append(item)
+
+    def _plan_item(self, item):
+        """
+        Plans the operations of an item.
+        """
+        action = item.get("action")
+
+        if action in ["entity_folder", "folder"]:
+            path = item.get("path")
+            if not self._exists(path):
+                if not self._preview_mode:
+                    self.folders.append(path)
+                    self._created(path, with_parents=True)
+                self.locations.append(path)
+
+        elif action == "symlink":
+            # no windows support
+            if sys.platform == "win32":
+                return
+            path = item.get("path")
+            if not self._exists(path, "lexists"):
+                if not self._preview_mode:
+                    self.symlinks.append((item.get("target"), path))
+                    self._created(path)
+                self.locations.append(path)
+
+        elif action == "copy":
+            target_path = item.get("target_path")
+            if not self._exists(target_path):
+                if not self._preview_mode:
+                    self.files.append((_copy_file, (item.get("source_path"), target_path)))
+                    self._created(target_path)
+                self.locations.append(target_path)
+
+        elif action == "create_file":
+            path = item.get("path")
+            parent_folder = os.path.dirname(path)
+            if not self._exists(parent_folder) and not self._preview_mode:
+                self.folders.append(parent_folder)
+                self._created(parent_folder, with_parents=True)
+            if not self._exists(path):
+                if not self._preview_mode:
+                    self.files.append((_create_file, (path, item.get("content"))))
+                    self._created(path)
+                self.locations.append(path)
+
+        # remote_entity_folder items are already on the shared storage,
+        # see the process_folder_creation hook.
+
+    def get_leaf_folders(self):
+        """
+        Returns the folders to create, without the folders which are created
+        as parents of other folders, sorted by depth.
+        """
+        parents = set()
+        for path in self.folders:
+            parent = os.path.dirname(path)
+            while parent not in parents and parent != path:
+                parents.add(parent)
+                (path, parent) = (parent, os.path.dirname(parent))
+
+        leaves = set(path for path in self.folders if path not in parents)
+        return sorted(leaves, key=lambda path: (path.count(os.path.sep), path))
+
+
+@filesystem.with_cleared_umask
+def process_folder_creation_items(items, preview_mode, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Creates the folders, files and symlinks requested by folder creation items
+    from a pool of threads.
+
+    This processes the same items as the ``process_folder_creation`` core hook
+    and returns the same locations, but checks which paths exist from a single
+    :class:`FileSystemSnapshot` and creates them concurrently. Folders are created
+    first, deepest folders only, since their parents are created with them. Files
+    and symlinks are then created concurrently.
+
+    :param items: List of folder creation items, see the ``process_folder_creation`` hook.
+    :param preview_mode: If True, nothing is created and the locations which would be
+                         created are returned.
+    :param int max_workers: Maximum number of threads.
+    :returns: List of files and folders that have been created.
+    """
+    snapshot = FileSystemSnapshot(_FolderCreationPlan.get_checked_paths(items), max_workers)
+    plan = _FolderCreationPlan(items, preview_mode, snapshot)
+    log.debug(
+        "%d of %d folder creation items are missing, found by listing %d folders in %.3f seconds.",
+        len(plan.missing_items), len(items), snapshot.num_listings, snapshot.duration
+    )
+    if preview_mode:
+        return plan.locations
+
+    folders = plan.get_leaf_folders()
+    log.debug(
+        "Creating %d folders, %d files and %d symlinks using up to %d threads.",
+        len(folders), len(plan.files), len(plan.symlinks), max_workers
+    )
+    _raise_first_error(
+        _run_concurrently(_make_folder, [(path,) for path in folders], max_workers)
+    )
+
+    operations = plan.files + [(os.symlink, args) for args in plan.symlinks]
+    _raise_first_error(
+        _run_concurrently(lambda func, args: func(*args), operations, max_workers)
+    )
+
+    return plan.locations
@@ -13,10 +13,20 @@ Main entry points for folder creation.
 
 """
 
-from .configuration import FolderConfiguration
+import os
+
+from .configuration import get_folder_configuration, get_schema_checksum
 from .folder_io import FolderIOReceiver
-from .folder_types import EntityLinkTypeMismatch
+from .folder_types import Entity, EntityLinkTypeMismatch
+from .folder_types.expression_tokens import FilterExpressionToken
+from .prefetch import ShotgunPrefetch
 from ..errors import TankError
+from ..path_cache import PathCache
+from ..util import login
+from .. import constants
+from .. import LogManager
+
+log = LogManager.get_logger(__name__)
 
 
 def create_single_folder_item(tk, config_obj, io_receiver, entity_type, entity_id, sg_task_data, engine):
@@ -51,7 +61,7 @@ def create_single_folder_item(tk, config_obj, io_receiver, entity_type, entity_i
         # up the tree and resolve all the entity ids that are required 
         # in order to create folders.
         try:
-            shotgun_entity_data = folder_obj.extract_shotgun_data_upwards(tk.shotgun, entity_id_seed)
+            shotgun_entity_data = folder_obj.extract_shotgun_data_upwards(io_receiver.shotgun, entity_id_seed)
         except EntityLinkTypeMismatch:
             # the seed entity id object does not satisfy the link
             # path from folder_obj up to the root. 
@@ -90,57 +100,67 @@ def create_single_folder_item(tk, config_obj, io_receiver, entity_type, entity_i
         
 
 
-def synchronize_folders(tk, full_sync):
+def prefetch_shotgun_data(config_obj, sg_prefetch, items):
+    """
+    Fetches the Shotgun data needed to create folders for several entities in bulk.
+
+    For each folder object representing one of the entity types, walks up the folder
+    configuration once and fetches the records of all the entities needed at each
+    level in a single query, so that the per entity queries of the folder creation
+    can be answered by the :class:`ShotgunPrefetch` instance.
+
+    :param config_obj: a FolderConfiguration object representing the folder configuration
+    :param sg_prefetch: :class:`ShotgunPrefetch` instance to populate
+    :param items: list of dictionaries with the type and id of the entities to create
+                  folders for
+    """
+    entity_ids_by_type = {}
+    for item in items:
+        entity_ids_by_type.setdefault(item["type"], set()).add(item["id"])
+
+    for (entity_type, entity_ids) in entity_ids_by_type.iteritems():
+        for folder_obj in config_obj.get_folder_objs_for_entity_type(entity_type):
+            # this follows extract_shotgun_data_upwards(), which seeds each parent
+            # level with the entities linked from the levels below.
+            linked_ids = {
+                FilterExpressionToken.sg_data_key_for_folder_obj(folder_obj): entity_ids
+            }
+            for parent_obj in [folder_obj] + folder_obj.get_parents():
+                if not isinstance(parent_obj, Entity):
+                    continue
+                parent_ids = linked_ids.get(FilterExpressionToken.sg_data_key_for_folder_obj(parent_obj))
+                if not parent_ids:
+                    continue
+                for (sg_data_key, ids) in parent_obj.prefetch_shotgun_data(sg_prefetch, parent_ids).iteritems():
+                    linked_ids.setdefault(sg_data_key, set()).update(ids)
+
+
+def synchronize_folders(tk, full_sync, progress_callback=None):
     """
     Synchronizes any remote folders to ensure they are present both 
     in the file system and in any local folder caches
     
     :param tk: A tk API instance
     :param full_sync: Do a full sync
+    :param progress_callback: Optional callable reporting the progress of a full sync,
+                              with the signature ``progress_callback(progress_value, message)``.
     :returns: list of items processed
     """
-    return FolderIOReceiver.sync_path_cache(tk, full_sync)
+    return FolderIOReceiver.sync_path_cache(tk, full_sync, progress_callback)
 
     
-def process_filesystem_structure(tk, entity_type, entity_ids, preview, engine):    
+def _compute_folder_items(tk, config, entity_type, entity_ids, preview, engine):
     """
-    Creates filesystem structure in Tank based on Shotgun and a schema config.
-    Internal implementation.
-    
+    Computes the folders to create for entities, see :meth:`process_filesystem_structure`.
+
     :param tk: A tk instance
+    :param config: a FolderConfiguration object reserved for this folder creation
     :param entity_type: A shotgun entity type to create folders for
-    :param entity_ids: list of entity ids to process or a single entity id
+    :param entity_ids: list of entity ids to process
     :param preview: enable dry run mode?
-    :param engine: A string representation matching a level in the schema. Passing this
-                   option indicates to the system that a second pass should be executed and all
-                   which are marked as deferred are processed. Pass None for non-deferred mode.
-                   The convention is to pass the name of the current engine, e.g 'tk-maya'.
-    
-    :returns: list of items processed
-    
+    :param engine: Engine to create folders for / indicate second pass if not None.
+    :returns: FolderIOReceiver holding the folder creation requests
     """
-
-    # check that engine is either a string or None
-    if not (isinstance(engine, basestring) or engine is None):
-        raise ValueError("engine parameter needs to be a string or None")
-
-
-    # Ensure ids is a list
-    if not isinstance(entity_ids, (list, tuple)):
-        if isinstance(entity_ids, int):
-            entity_ids = (entity_ids,)
-        elif isinstance(entity_ids, str) and entity_ids.isdigit():
-            entity_ids = (int(entity_ids),)
-        else:
-            raise ValueError("Parameter entity_ids' type is '%s', accepted types are list, tuple and int." % type(entity_ids).__name__)
-    
-    if len(entity_ids) == 0:
-        return
-
-    # create schema builder
-    schema_cfg_folder = tk.pipeline_configuration.get_schema_config_location()   
-    config = FolderConfiguration(tk, schema_cfg_folder)
-
     # all things to create
     items = []
 
@@ -192,8 +212,14 @@ def process_filesystem_structure(tk, entity_type, entity_ids, preview, engine):
             items.append( { "type": entity_type, "id": i, "sg_task_data": None } )
         
     
+    # fetch the shotgun data for all the items in a few batched queries
+    # rather than in separate queries for every item and folder level
+    sg_prefetch = ShotgunPrefetch(tk.shotgun)
+    if len(items) > 1:
+        prefetch_shotgun_data(config, sg_prefetch, items)
+
     # create an object to receive all IO requests
-    io_receiver = FolderIOReceiver(tk, preview, entity_type, entity_ids)
+    io_receiver = FolderIOReceiver(tk, preview, entity_type, entity_ids, sg_prefetch)
 
     # now loop over all individual objects and create folders
     for i in items:        
@@ -205,6 +231,94 @@ def process_filesystem_structure(tk, entity_type, entity_ids, preview, engine):
                                   i["sg_task_data"],
                                   engine)
 
-    folders_created = io_receiver.execute_folder_creation()
+    log.debug(
+        "Folder creation for %d items ran %d batched Shotgun queries, which answered %d queries.",
+        len(items), sg_prefetch.num_queries, sg_prefetch.num_answered
+    )
+
+    return io_receiver
+
+
+def process_filesystem_structure(tk, entity_type, entity_ids, preview, engine):    
+    """
+    Creates filesystem structure in Tank based on Shotgun and a schema config.
+    Internal implementation.
     
+    :param tk: A tk instance
+    :param entity_type: A shotgun entity type to create folders for
+    :param entity_ids: list of entity ids to process or a single entity id
+    :param preview: enable dry run mode?
+    :param engine: A string representation matching a level in the schema. Passing this
+                   option indicates to the system that a second pass should be executed and all
+                   which are marked as deferred are processed. Pass None for non-deferred mode.
+                   The convention is to pass the name of the current engine, e.g 'tk-maya'.
+                   If the ``TK_DEFERRED_FOLDERS_LEDGER`` environment variable is set to 1,
+                   entities whose deferred folders have already been created for this engine
+                   and the current user are skipped until the schema changes.
+    
+    :returns: list of items processed
+    
+    """
+
+    # check that engine is either a string or None
+    if not (isinstance(engine, basestring) or engine is None):
+        raise ValueError("engine parameter needs to be a string or None")
+
+
+    # Ensure ids is a list
+    if not isinstance(entity_ids, (list, tuple)):
+        if isinstance(entity_ids, int):
+            entity_ids = (entity_ids,)
+        elif isinstance(entity_ids, str) and entity_ids.isdigit():
+            entity_ids = (int(entity_ids),)
+        else:
+            raise ValueError("Parameter entity_ids' type is '%s', accepted types are list, tuple and int." % type(entity_ids).__name__)
+    
+    if len(entity_ids) == 0:
+        return
+
+    # when the ledger is enabled, the deferred folders of entities which have already
+    # been created for this engine and user with the current schema are not processed again.
+    use_ledger = (
+        engine is not None and
+        not preview and
+        os.environ.get(constants.DEFERRED_FOLDERS_LEDGER_ENV_VAR) == "1"
+    )
+    if use_ledger:
+        schema_checksum = get_schema_checksum(tk)
+        # user sandboxes are deferred folders, so they have to be recorded per user.
+        current_user = login.get_current_user(tk)
+        user_id = current_user["id"] if current_user else 0
+        path_cache = PathCache(tk, read_only=True)
+        try:
+            complete = path_cache.is_deferred_folder_creation_complete(
+                entity_type, entity_ids, engine, user_id, schema_checksum
+            )
+        finally:
+            path_cache.close()
+
+        if complete:
+            log.debug(
+                "Deferred folders for %s %s have already been created for engine '%s'.",
+                entity_type, list(entity_ids), engine
+            )
+            return []
+
+    # get the schema builder, which is only loaded again if the schema has changed
+    config = get_folder_configuration(tk)
+
+    # the folder objects are shared by all the folder creations of the tk instance,
+    # but are not needed anymore once the folders to create have been computed.
+    with config.use():
+        io_receiver = _compute_folder_items(tk, config, entity_type, entity_ids, preview, engine)
+
+    folders_created = io_receiver.execute_folder_creation()
+
+    if use_ledger:
+        path_cache = PathCache(tk)
+        try:
+            path_cache.add_deferred_folder_creation(entity_type, entity_ids, engine, user_id, schema_checksum)
+        finally:
+            path_cache.close()
+
     return folders_created
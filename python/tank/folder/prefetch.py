@@ -0,0 +1,251 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Batched Shotgun queries for folder creation.
+
+"""
+
+import copy
+
+
+class _UnsupportedQuery(Exception):
+    """
+    Raised when a query can't be compared with the prefetched queries.
+    """
+
+
+def _freeze(value):
+    """
+    Converts filter data into a hashable value which can be compared
+    with the filters of other queries.
+
+    :param value: Filter, condition or filter value.
+    :returns: Hashable value.
+    :raises _UnsupportedQuery: If the value contains data which can't be compared.
+    """
+    if isinstance(value, dict):
+        if "type" in value and "id" in value:
+            # only the type and id of an entity dictionary matter in a filter.
+            return ("type", value["type"], "id", value["id"])
+        return tuple(sorted((k, _freeze(v)) for (k, v) in value.iteritems()))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+
+    if value is None or isinstance(value, (basestring, int, long, float)):
+        return value
+
+    # e.g. unresolved expression tokens.
+    raise _UnsupportedQuery()
+
+
+class ShotgunPrefetch(object):
+    """
+    Answers the Shotgun queries of the folder objects from records fetched in bulk.
+
+    Folder creation for many entities queries Shotgun once per entity and per level
+    of the folder configuration, always with an ``id is`` condition. Those records
+    can be fetched ahead of time with :meth:`prefetch`, in a single query for all
+    the entity ids of a level. :meth:`find` and :meth:`find_one` then answer any query
+    for one of these ids from the prefetched records, provided the query's other
+    conditions can be checked against the record. All other queries are passed to
+    Shotgun as is.
+    """
+
+    def __init__(self, sg):
+        """
+        :param sg: Shotgun API instance.
+        """
+        self._sg = sg
+        # batches of prefetched records by entity type. Each batch is a
+        # list of [conditions, fields, requested entity ids, records by id]
+        self._batches = {}
+        self._num_queries = 0
+        self._num_answered = 0
+
+    def __repr__(self):
+        return "<ShotgunPrefetch %d queries, %d answered>" % (self._num_queries, self._num_answered)
+
+    @property
+    def num_queries(self):
+        """
+        Number of batched queries sent to Shotgun.
+        """
+        return self._num_queries
+
+    @property
+    def num_answered(self):
+        """
+        Number of queries answered from prefetched records.
+        """
+        return self._num_answered
+
+    def prefetch(self, entity_type, conditions, fields, entity_ids):
+        """
+        Fetches the records of several entities matching the given conditions.
+
+        Ids already prefetched with the same conditions and fields are not
+        fetched again.
+
+        :param entity_type: Shotgun entity type.
+        :param conditions: List of filter conditions, without any condition on the id.
+        :param fields: List of fields to retrieve.
+        :param entity_ids: Ids of the entities to retrieve.
+        :returns: List of the records found for the requested ids.
+        """
+        try:
+            frozen_conditions = frozenset(_freeze(c) for c in conditions)
+        except _UnsupportedQuery:
+            return []
+
+        fields = sorted(set(fields))
+        for batch in self._batches.get(entity_type, []):
+            if batch[0] == frozen_conditions and batch[1] == fields:
+                break
+        else:
+            batch = [frozen_conditions, fields, set(), {}]
+            self._batches.setdefault(entity_type, []).append(batch)
+
+        (_, _, requested_ids, records) = batch
+        missing_ids = set(entity_ids) - requested_ids
+        if missing_ids:
+            filters = {
+                "logical_operator": "and",
+                "conditions": list(conditions) + [
+                    {"path": "id", "relation": "in", "values": sorted(missing_ids)}
+                ]
+            }
+            self._num_queries += 1
+            for record in self._sg.find(entity_type, filters, fields):
+                records[record["id"]] = record
+            requested_ids.update(missing_ids)
+
+        return [records[entity_id] for entity_id in entity_ids if entity_id in records]
+
+    def find(self, entity_type, filters, fields=None):
+        """
+        Finds entities, see :meth:`shotgun_api3.Shotgun.find`.
+
+        :param entity_type: Shotgun entity type.
+        :param filters: Filters for the query.
+        :param fields: List of fields to retrieve.
+        :returns: List of records.
+        """
+        records = self._find_prefetched(entity_type, filters, fields)
+        if records is None:
+            return self._sg.find(entity_type, filters, fields)
+        self._num_answered += 1
+        return records
+
+    def find_one(self, entity_type, filters, fields=None):
+        """
+        Finds a single entity, see :meth:`shotgun_api3.Shotgun.find_one`.
+
+        :param entity_type: Shotgun entity type.
+        :param filters: Filters for the query.
+        :param fields: List of fields to retrieve.
+        :returns: A record or None.
+        """
+        records = self._find_prefetched(entity_type, filters, fields)
+        if records is None:
+            return self._sg.find_one(entity_type, filters, fields)
+        self._num_answered += 1
+        return records[0] if records else None
+
+    def _find_prefetched(self, entity_type, filters, fields):
+        """
+        Answers a query from the prefetched records.
+
+        :param entity_type: Shotgun entity type.
+        :param filters: Filters for the query.
+        :param fields: List of fields to retrieve.
+        :returns: List of records or None if the query can't be answered.
+        """
+        if entity_type not in self._batches or fields is None:
+            return None
+
+        if not isinstance(filters, dict) or filters.get("logical_operator") != "and":
+            return None
+
+        try:
+            conditions = [(_freeze(c), c) for c in filters["conditions"]]
+        except _UnsupportedQuery:
+            return None
+
+        id_conditions = [
+            c for (_, c) in conditions
+            if isinstance(c, dict) and c.get("path") == "id" and c.get("relation") == "is"
+        ]
+        if len(id_conditions) != 1 or len(id_conditions[0]["values"]) != 1:
+            return None
+        entity_id = id_conditions[0]["values"][0]
+        conditions = [(f, c) for (f, c) in conditions if c is not id_conditions[0]]
+        frozen_conditions = frozenset(f for (f, _) in conditions)
+
+        for (batch_conditions, batch_fields, requested_ids, records) in self._batches[entity_type]:
+            if entity_id not in requested_ids:
+                continue
+            if not batch_conditions.issubset(frozen_conditions) or not set(fields).issubset(batch_fields):
+                continue
+
+            record = records.get(entity_id)
+            if record is None:
+                # the entity doesn't exist or doesn't match the prefetched conditions.
+                return []
+
+            # now check the conditions which were not part of the prefetch query.
+            matches = True
+            for (frozen_condition, condition) in conditions:
+                if frozen_condition in batch_conditions:
+                    continue
+                condition_matches = self._match_condition(record, condition, batch_fields)
+                if condition_matches is None:
+                    break
+                matches = matches and condition_matches
+            else:
+                if not matches:
+                    return []
+                result = {"type": record["type"], "id": record["id"]}
+                for field in fields:
+                    result[field] = copy.deepcopy(record.get(field))
+                return [result]
+
+        return None
+
+    def _match_condition(self, record, condition, fields):
+        """
+        Checks if a record matches an ``is`` condition on an entity link.
+
+        :param record: Prefetched record.
+        :param condition: Filter condition.
+        :param fields: Fields retrieved for the record.
+        :returns: True or False, or None if the condition can't be checked.
+        """
+        if not isinstance(condition, dict) or condition.get("relation") != "is":
+            return None
+        if condition.get("path") not in fields or len(condition["values"]) != 1:
+            return None
+
+        value = condition["values"][0]
+        field_value = record.get(condition["path"])
+        if field_value is not None and not isinstance(field_value, dict):
+            # multi entity links or other field types, leave these to Shotgun.
+            return None
+
+        if value is None:
+            return field_value is None
+
+        if isinstance(value, dict) and "type" in value and "id" in value:
+            if field_value is None:
+                return False
+            return field_value.get("type") == value["type"] and field_value.get("id") == value["id"]
+
+        return None
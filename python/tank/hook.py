@@ -462,12 +462,21 @@ class _HooksCache(object):
     A thread-safe cache of loaded hooks.  This uses the hook file path
     and base class as the key to cache all hooks loaded by Toolkit in
     the current session.
+
+    It also caches the final classes of hook inheritance chains, and whether
+    hook files exist on disk, so hooks executed over and over don't touch
+    the disk again until the cache is cleared.
+
+    Lookups don't lock the cache: reading a dictionary is atomic, and items
+    are only ever added to it, or the whole dictionary is replaced.
     """
     def __init__(self):
         """
         Construction
         """
         self._cache = {}
+        self._chain_cache = {}
+        self._exists_cache = {}
         self._cache_lock = threading.Lock()
 
     def thread_exclusive(func):
@@ -497,8 +506,9 @@ class _HooksCache(object):
         Clear the hook cache
         """
         self._cache = {}
+        self._chain_cache = {}
+        self._exists_cache = {}
 
-    @thread_exclusive
     def find(self, hook_path, hook_base_class):
         """
         Find a hook in the cache using the hook path and base class
@@ -527,7 +537,43 @@ class _HooksCache(object):
         if key not in self._cache:
             self._cache[key] = hook_class
 
+    def find_chain(self, hook_paths, hook_base_class):
+        """
+        Find the final class of a hook inheritance chain in the cache.
+
+        :param hook_paths:      List of paths to the hooks, in inheritance order
+        :param hook_base_class: The base class of the first hook
+        :returns:               The Hook class if found, None if not
+        """
+        return self._chain_cache.get((tuple(hook_paths), hook_base_class))
+
     @thread_exclusive
+    def add_chain(self, hook_paths, hook_base_class, hook_class):
+        """
+        Add the final class of a hook inheritance chain to the cache if it
+        isn't already present.
+
+        :param hook_paths:      List of paths to the hooks, in inheritance order
+        :param hook_base_class: The base class of the first hook
+        :param hook_class:      The Hook class of the last hook
+        :returns:               The cached Hook class
+        """
+        return self._chain_cache.setdefault((tuple(hook_paths), hook_base_class), hook_class)
+
+    def file_exists(self, hook_path):
+        """
+        Check whether a hook file exists on disk. The result is cached, for
+        files which exist as well as for files which don't.
+
+        :param hook_path:   The path to the hook
+        :returns:           True if the file exists, False if not
+        """
+        exists = self._exists_cache.get(hook_path)
+        if exists is None:
+            exists = os.path.exists(hook_path)
+            self._exists_cache[hook_path] = exists
+        return exists
+
     def __len__(self):
         """
         Return the number of items currently in the hook cache
@@ -543,6 +589,16 @@ def clear_hooks_cache():
     """
     _hooks_cache.clear()
 
+def hook_file_exists(hook_path):
+    """
+    Checks whether a hook file exists on disk. The result is cached until
+    :meth:`clear_hooks_cache` is called, like the hook classes are.
+
+    :param hook_path: Full path to the hook python file
+    :returns: True if the file exists, False if not
+    """
+    return _hooks_cache.file_exists(hook_path)
+
 def execute_hook(hook_path, parent, **kwargs):
     """
     Executes a hook, old-school style.
@@ -664,13 +720,19 @@ def create_hook_instance(hook_paths, parent, base_class=None):
     else:
         base_class = Hook
 
+    # hooks which have already been created don't need to be checked on disk.
+    hook_class = _hooks_cache.find_chain(hook_paths, base_class)
+    if hook_class:
+        _current_hook_baseclass.value = hook_class
+        return hook_class(parent)
+
     # keep track of the current base class - this is used when loading hooks to dynamically
     # inherit from the correct base.
     _current_hook_baseclass.value = base_class
 
     for hook_path in hook_paths:
 
-        if not os.path.exists(hook_path):
+        if not _hooks_cache.file_exists(hook_path):
             raise TankFileDoesNotExistError(
                 "Cannot execute hook '%s' - this file does not exist on disk!" % hook_path
             )
@@ -708,7 +770,8 @@ def create_hook_instance(hook_paths, parent, base_class=None):
 
     # all class construction done. _current_hook_baseclass contains the last
     # class we iterated over. An instance of this is what we want to return
-    return _current_hook_baseclass.value(parent)
+    hook_class = _hooks_cache.add_chain(hook_paths, base_class, _current_hook_baseclass.value)
+    return hook_class(parent)
 
 
 def get_hook_baseclass():
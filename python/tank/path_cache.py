@@ -19,6 +19,7 @@ import sqlite3
 import sys
 import os
 import itertools
+import threading
 
 # use api json to cover py 2.5
 # todo - replace with proper external library  
@@ -30,6 +31,10 @@ from . import constants
 from .errors import TankError
 from . import LogManager
 from .util.login import get_current_user
+from .util import filesystem
+from .util import LocalFileStorageManager
+from .util.sqlite_pool import SqliteConnectionPool
+from .path_cache_mirror import PathCacheMirror
 
 # Shotgun field definitions to store the path cache data
 SHOTGUN_ENTITY = "FilesystemLocation"
@@ -44,6 +49,13 @@ SG_PIPELINE_CONFIG_FIELD = "pipeline_configuration"
 
 log = LogManager.get_logger(__name__)
 
+# connections shared by the read only path caches of the process
+_read_connection_pool = SqliteConnectionPool()
+
+# in memory copies of the path cache databases, keyed by database path
+_memory_mirrors = {}
+_memory_mirrors_lock = threading.Lock()
+
 class PathCache(object):
     """
     A global cache which holds the mapping between a shotgun entity and a location on disk.
@@ -65,15 +77,62 @@ class PathCache(object):
     # to do so.
     SHOTGUN_ENTITY_QUERY_BATCH_SIZE = 500
 
-    def __init__(self, tk):
+    # number of rows written between two progress reports during a full sync
+    FULL_SYNC_INSERT_BATCH_SIZE = 10000
+
+    # indices dropped while a full sync loads the database, and rebuilt afterwards
+    _INDICES = [
+        ("path_cache_entity", "CREATE INDEX path_cache_entity ON path_cache(entity_type, entity_id)"),
+        ("path_cache_path", "CREATE INDEX path_cache_path ON path_cache(root, path, primary_entity)"),
+        (
+            "path_cache_all",
+            "CREATE UNIQUE INDEX path_cache_all ON path_cache(entity_type, entity_id, root, path, primary_entity)"
+        ),
+        ("shotgun_status_id", "CREATE UNIQUE INDEX shotgun_status_id ON shotgun_status(path_cache_id)"),
+        ("shotgun_status_shotgun_id", "CREATE INDEX shotgun_status_shotgun_id ON shotgun_status(shotgun_id)"),
+    ]
+
+    # pragmas applied to the connections of path caches kept on the local disk.
+    # Write-ahead logging lets lookups run while a synchronization is writing, and
+    # isn't safe on network file systems. Syncing the database less often is fine
+    # since it can always be rebuilt from Shotgun.
+    LOCAL_REPLICA_PRAGMAS = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        # negative values are in KiB, i.e. 16MB
+        "PRAGMA cache_size=-16000",
+        "PRAGMA mmap_size=268435456",
+    ]
+
+    def __init__(self, tk, read_only=False):
         """
         Constructor.
         
         :param tk: Toolkit API instance
+        :param bool read_only: If True, the path cache is only used for lookups and
+                               its connection is taken from a process wide pool, and
+                               given back to it when the path cache is closed. If the
+                               ``TK_PATH_CACHE_IN_MEMORY`` environment variable is set
+                               to 1, lookups are served from an in memory copy of the
+                               database shared by the process.
+
+        If the path cache is synchronized with Shotgun and the ``TK_PATH_CACHE_LOCAL_REPLICA``
+        environment variable is set to 1, the database is kept in the local cache
+        folder of the user, using write-ahead logging, rather than in the location
+        returned by the cache location hook.
         """
         self._connection = None
+        self._pooled_path = None
+        self._path_cache_file = None
+        self._mirror = None
+        self._read_only = read_only
         self._tk = tk
         self._sync_with_sg = tk.pipeline_configuration.get_shotgun_path_cache_enabled()
+        # only a database which can be rebuilt from Shotgun can be kept locally
+        self._local_replica = (
+            self._sync_with_sg and
+            os.environ.get(constants.PATH_CACHE_LOCAL_REPLICA_ENV_VAR) == "1"
+        )
 
         if tk.pipeline_configuration.has_associated_data_roots():
             self._path_cache_disabled = False
@@ -92,9 +151,21 @@ class PathCache(object):
         # will ensure that there is a valid folder and file on
         # disk, created with all the right permissions etc.
         path_cache_file = self._get_path_cache_location()
-        
-        self._connection = sqlite3.connect(path_cache_file)
-        
+        self._path_cache_file = path_cache_file
+
+        configure = self._configure_local_replica if self._local_replica else None
+        if self._read_only:
+            # the schema only needs to be checked once for each database file
+            self._connection = _read_connection_pool.acquire(
+                path_cache_file, self._init_schema, configure
+            )
+            self._pooled_path = path_cache_file
+        else:
+            self._connection = sqlite3.connect(path_cache_file)
+            if configure:
+                configure(self._connection)
+            self._init_schema(self._connection)
+
         # this is to handle unicode properly - make sure that sqlite returns 
         # str objects for TEXT fields rather than unicode. Note that any unicode
         # objects that are passed into the database will be automatically
@@ -103,10 +174,69 @@ class PathCache(object):
         # as UTF-8 (byte string) or unicode. And in the latter case, the returned data
         # will always be unicode.
         self._connection.text_factory = str
-        
-        c = self._connection.cursor()
+
+        if self._read_only and os.environ.get(constants.PATH_CACHE_IN_MEMORY_ENV_VAR) == "1":
+            with _memory_mirrors_lock:
+                self._mirror = _memory_mirrors.setdefault(path_cache_file, PathCacheMirror())
+            self._mirror.check_file_identity(self._get_file_identity())
+
+    def _get_file_identity(self):
+        """
+        Returns a value which changes when the database file is replaced or written to.
+
+        The write-ahead log is included, since the changes of a database using
+        write-ahead logging are only moved into the database file from time to time.
+
+        :returns: Tuple of device, inode, modification time and size tuples for the
+                  database file and its write-ahead log, None for a missing file.
+        """
+        identity = []
+        for path in [self._path_cache_file, "%s-wal" % self._path_cache_file]:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                identity.append(None)
+            else:
+                identity.append((stat.st_dev, stat.st_ino, stat.st_mtime, stat.st_size))
+        return tuple(identity)
+
+    def _get_current_mirror(self):
+        """
+        Returns the in memory copy of the database used for lookups, loading it
+        if it is out of date.
+
+        :returns: :class:`PathCacheMirror` or None if lookups are not served from memory.
+        """
+        if self._mirror is not None and not self._mirror.is_current:
+            self._mirror.load(self._connection)
+        return self._mirror
+
+    def _get_loaded_mirror(self):
+        """
+        :returns: The :class:`PathCacheMirror` of the database used by other path caches
+                  of the process, or None if there isn't any.
+        """
+        return _memory_mirrors.get(self._path_cache_file)
+
+    @classmethod
+    def _configure_local_replica(cls, connection):
+        """
+        Tunes a connection to a path cache database kept on the local disk.
+
+        :param connection: sqlite connection to the database.
+        """
+        for pragma in cls.LOCAL_REPLICA_PRAGMAS:
+            connection.execute(pragma)
+
+    def _init_schema(self, connection):
+        """
+        Creates the tables of a new database or ensures the ones of an existing
+        database are up to date.
+
+        :param connection: sqlite connection to the database.
+        """
+        c = connection.cursor()
         try:
-        
             # get a list of tables in the current database
             ret = c.execute("SELECT name FROM main.sqlite_master WHERE type='table';")
             table_names = [x[0] for x in ret.fetchall()]
@@ -136,8 +266,12 @@ class PathCache(object):
                     CREATE UNIQUE INDEX shotgun_status_id ON shotgun_status(path_cache_id);
 
                     CREATE INDEX shotgun_status_shotgun_id ON shotgun_status(shotgun_id);
+
+                    CREATE TABLE deferred_folders (entity_type text, entity_id integer, engine text, user_id integer, schema_checksum text);
+
+                    CREATE UNIQUE INDEX deferred_folders_entity ON deferred_folders(entity_type, entity_id, engine, user_id);
                     """)
-                self._connection.commit()
+                connection.commit()
                 
             else:
                 
@@ -145,13 +279,19 @@ class PathCache(object):
                 if "event_log_sync" not in table_names:
                     # this is a pre-0.15 setup where the path cache does not have event log sync
                     c.executescript("CREATE TABLE event_log_sync (last_id integer);")
-                    self._connection.commit()
+                    connection.commit()
                 
                 if "shotgun_status" not in table_names:
                     # this is a pre-0.15 setup where the path cache does not have the shotgun_status table
                     c.executescript("""CREATE TABLE shotgun_status (path_cache_id integer, shotgun_id integer);
                                        CREATE UNIQUE INDEX shotgun_status_id ON shotgun_status(path_cache_id);""")
-                    self._connection.commit()
+                    connection.commit()
+
+                if "deferred_folders" not in table_names:
+                    # this is a setup where the path cache does not have the deferred folders ledger
+                    c.executescript("""CREATE TABLE deferred_folders (entity_type text, entity_id integer, engine text, user_id integer, schema_checksum text);
+                                       CREATE UNIQUE INDEX deferred_folders_entity ON deferred_folders(entity_type, entity_id, engine, user_id);""")
+                    connection.commit()
 
                 
                 # now ensure that some key fields that have been added during the dev cycle are there
@@ -171,7 +311,7 @@ class PathCache(object):
                         CREATE UNIQUE INDEX IF NOT EXISTS path_cache_all ON path_cache(entity_type, entity_id, root, path, primary_entity);
                         """)
         
-                    self._connection.commit()
+                    connection.commit()
         
         finally:
             c.close()
@@ -182,7 +322,21 @@ class PathCache(object):
 
         :returns: The path to the path cache file
         """
-        if self._tk.pipeline_configuration.get_shotgun_path_cache_enabled():
+        if self._local_replica:
+            # the hook may return a location on a network file system, which
+            # write-ahead logging doesn't support.
+            cache_root = LocalFileStorageManager.get_configuration_root(
+                self._tk.shotgun_url,
+                self._tk.pipeline_configuration.get_project_id(),
+                None,
+                self._tk.pipeline_configuration.get_shotgun_id(),
+                LocalFileStorageManager.CACHE
+            )
+            path = os.path.join(cache_root, constants.PATH_CACHE_LOCAL_REPLICA_FILE)
+            filesystem.ensure_folder_exists(cache_root)
+            filesystem.touch_file(path)
+
+        elif self._tk.pipeline_configuration.get_shotgun_path_cache_enabled():
 
             # 0.15+ path cache setup - call out to a core hook to determine
             # where the path cache should be located.
@@ -295,13 +449,42 @@ class PathCache(object):
         Close the database connection.
         """
         if self._connection is not None:
-            self._connection.close()
+            if self._pooled_path:
+                _read_connection_pool.release(self._pooled_path, self._connection)
+                self._pooled_path = None
+            else:
+                self._connection.close()
             self._connection = None
+
+    @staticmethod
+    def get_read_connection_stats():
+        """
+        Returns statistics about the connections used by read only path caches.
+
+        See :meth:`~tank.util.sqlite_pool.SqliteConnectionPool.get_stats`.
+
+        :returns: Dictionary of statistics.
+        """
+        return _read_connection_pool.get_stats()
+
+    @staticmethod
+    def get_memory_mirror_stats():
+        """
+        Returns statistics about the in memory copies of path cache databases,
+        including an estimate of the memory they use.
+
+        See :meth:`~tank.path_cache_mirror.PathCacheMirror.get_stats`.
+
+        :returns: Dictionary of statistics, keyed by path cache database location.
+        """
+        with _memory_mirrors_lock:
+            mirrors = dict(_memory_mirrors)
+        return dict((path, mirror.get_stats()) for path, mirror in mirrors.iteritems())
                 
     ############################################################################################
     # shotgun synchronization (SG data pushed into path cache database)
 
-    def synchronize(self, full_sync=False):
+    def synchronize(self, full_sync=False, progress_callback=None):
         """
         Ensure the local path cache is in sync with Shotgun. 
         
@@ -309,6 +492,10 @@ class PathCache(object):
         launch the busy overlay window.
 
         :param full_sync: Boolean to indicate that a full sync should be carried out. 
+        :param progress_callback: Optional callable reporting the progress of a full
+                                  sync, with the signature ``progress_callback(progress_value, message)``.
+                                  The progress value is a float in the range 0.0 to 1.0, or
+                                  None while folders are being retrieved from Shotgun.
         
         :returns: A list of remote items which were detected, created remotely
                   and not existing in this path cache. These are returned as a list of 
@@ -332,7 +519,7 @@ class PathCache(object):
 
             # check if we should do a full sync
             if full_sync:
-                return self._do_full_sync(c)
+                return self._do_full_sync(c, progress_callback)
             
             # first get the last synchronized event log event.        
             res = c.execute("SELECT max(last_id) FROM event_log_sync")
@@ -344,7 +531,7 @@ class PathCache(object):
             # expect back something like [(249660,)] for a running cache and [(None,)] for a clear
             if len(data) != 1 or data[0] is None:
                 # we should do a full sync
-                return self._do_full_sync(c)
+                return self._do_full_sync(c, progress_callback)
     
             # we have an event log id - so check if there are any more recent events
             event_log_id = data[0]
@@ -392,7 +579,7 @@ class PathCache(object):
             if len(response) == 0:
                 # nothing in event log. Probably a truncated setup.
                 log.debug("No sync information in the event log. Falling back on a full sync.")
-                return self._do_full_sync(c)
+                return self._do_full_sync(c, progress_callback)
                 
             elif response[0]["id"] != event_log_id:
                 # there is either no event log data at all or a gap
@@ -404,7 +591,7 @@ class PathCache(object):
                     "like the event log has been truncated, so falling back "
                     "on a full sync." % (event_log_id, response[0]["id"])
                 )
-                return self._do_full_sync(c)
+                return self._do_full_sync(c, progress_callback)
             
             elif len(response) == 1 and response[0]["id"] == event_log_id:
                 # nothing has changed since the last sync
@@ -546,7 +733,7 @@ class PathCache(object):
                 "id": self._tk.pipeline_configuration.get_project_id()
             }
 
-    def _do_full_sync(self, cursor):
+    def _do_full_sync(self, cursor, progress_callback=None):
         """
         Ensure the local path cache is in sync with Shotgun.
         
@@ -558,6 +745,7 @@ class PathCache(object):
             - path
             
         :param cursor: Sqlite database cursor
+        :param progress_callback: Optional callable reporting progress, see :meth:`synchronize`.
         """
         
         show_global_busy("Hang on, Toolkit is preparing folders...", 
@@ -582,7 +770,7 @@ class PathCache(object):
             else:
                 max_event_log_id = sg_data["id"]
             
-            data = self._replay_folder_entities(cursor, max_event_log_id)
+            data = self._replay_folder_entities(cursor, max_event_log_id, progress_callback)
 
         finally:
             clear_global_busy()
@@ -726,8 +914,20 @@ class PathCache(object):
 
         self._update_last_event_log_synced(cursor, max_event_log_id)
 
+        mirror = self._get_loaded_mirror()
+        previous_identity = self._get_file_identity() if mirror else None
+
         self._connection.commit()
 
+        # replay the same events on the in memory copy of the database
+        if mirror:
+            deleted_folder_ids = []
+            for event in sg_data:
+                if event["event_type"] == "Toolkit_Folders_Delete":
+                    deleted_folder_ids.extend(event["meta"].get("sg_folder_ids") or [])
+            mirror.replay(self._connection, created_folder_ids, deleted_folder_ids)
+            mirror.update_file_identity(previous_identity, self._get_file_identity())
+
         # run the actual sync - and at the end, inser the event_log_sync data marker
         # into the database to show where to start syncing from next time.
         return new_items
@@ -813,17 +1013,60 @@ class PathCache(object):
 
         return sg_data
 
-    def _replay_folder_entities(self, cursor, max_event_log_id):
+    def _iter_project_filesystem_location_pages(self):
+        """
+        Retrieves all the filesystem location entities of the project from Shotgun,
+        one page at a time.
+
+        Pages are requested by id rather than by page number, so every query is
+        cheap for Shotgun no matter how many entities there are.
+
+        :returns: Generator yielding lists of FilesystemLocation entity dictionaries,
+                  with the same keys as :meth:`_get_filesystem_location_entities`.
+        """
+        project_entity = self._get_project_link()
+        log.debug("Getting all the project's FilesystemLocation entries. "
+                  "Project id: %s" % project_entity["id"])
+        last_id = 0
+        while True:
+            sg_data = self._tk.shotgun.find(
+                SHOTGUN_ENTITY,
+                [["project", "is", project_entity], ["id", "greater_than", last_id]],
+                [
+                    "id",
+                    SG_METADATA_FIELD,
+                    SG_IS_PRIMARY_FIELD,
+                    SG_ENTITY_ID_FIELD,
+                    SG_PATH_FIELD,
+                    SG_ENTITY_TYPE_FIELD,
+                    SG_ENTITY_NAME_FIELD
+                ],
+                [{"field_name": "id", "direction": "asc"}],
+                limit=self.SHOTGUN_ENTITY_QUERY_BATCH_SIZE
+            )
+            if not sg_data:
+                return
+            yield sg_data
+            if len(sg_data) < self.SHOTGUN_ENTITY_QUERY_BATCH_SIZE:
+                return
+            last_id = sg_data[-1]["id"]
+
+    def _replay_folder_entities(self, cursor, max_event_log_id, progress_callback=None):
         """
         Downloads all the filesystem location entities from Shotgun and repopulates the
         path cache with them.
 
+        Entries are validated and deduplicated in memory as they are downloaded, and
+        then written in a single transaction, with the indices of the database
+        rebuilt once all the rows are in.
+
         Lastly, this method updates the event_log_sync marker in the sqlite database
         that tracks what the most recent event log id was being synced.
 
         :param cursor: Sqlite database cursor
         :param max_event_log_id: max event log marker to write to the path
                                  cache database after a full operation.
+        :param progress_callback: Optional callable reporting progress, see :meth:`synchronize`.
         :returns: A list of remote items which were detected, created remotely
                   and not existing in this path cache. These are returned as a list of
                   dictionaries, each containing keys:
@@ -834,28 +1077,126 @@ class PathCache(object):
         """
         log.debug("Fetching already registered folders from Shotgun...")
 
-        sg_data = self._get_filesystem_location_entities(folder_ids=None)
-
-        # complete sync - clear our tables first
-        log.debug("Full sync - clearing local sqlite path cache tables...")
-        cursor.execute("DELETE FROM event_log_sync")
-        cursor.execute("DELETE FROM shotgun_status")
-        cursor.execute("DELETE FROM path_cache")
-
+        # path_cache rows, with their FilesystemLocation id
+        rows = []
         return_data = []
+        # primary entities keyed by (root, path)
+        primary_entities = {}
+        # (entity type, entity id, root, path) of all the rows
+        entity_paths = set()
+        num_retrieved = 0
+
+        for sg_data in self._iter_project_filesystem_location_pages():
+            num_retrieved += len(sg_data)
+            for fsl_entity in sg_data:
+                mapping = self._get_filesystem_location_mapping(fsl_entity)
+                if mapping is None:
+                    continue
+                entity, local_os_path, root_name, db_path, is_primary = mapping
+
+                # same checks as _add_db_mapping
+                entity_path = (entity["type"], entity["id"], root_name, db_path)
+                if is_primary:
+                    curr_entity = primary_entities.get((root_name, db_path))
+                    if curr_entity is None:
+                        primary_entities[(root_name, db_path)] = entity
+                    elif curr_entity["type"] != entity["type"] or curr_entity["id"] != entity["id"]:
+                        raise TankError("Database concurrency problems: The path '%s' is "
+                                        "already associated with Shotgun entity %s. Please re-run "
+                                        "folder creation to try again." % (local_os_path, str(curr_entity)))
+                    else:
+                        log.debug("Found existing record for '%s', %s. Skipping." % (local_os_path, entity))
+                        continue
+                elif entity_path in entity_paths:
+                    log.debug("Found existing record for '%s', %s. Skipping." % (local_os_path, entity))
+                    continue
 
-        for x in sg_data:
-            imported_data = self._import_filesystem_location_entry(cursor, x)
-            if imported_data:
-                return_data.append(imported_data)
-
-        # lastly, save the id of this event log entry for purpose of future syncing
-        # note - we don't maintain a list of event log entries but just a single
-        # value in the db, so start by clearing the table.
+                entity_paths.add(entity_path)
+                rows.append((
+                    entity["type"], entity["id"], entity["name"], root_name, db_path, is_primary, fsl_entity["id"]
+                ))
+                return_data.append({
+                    "entity": entity,
+                    "path": local_os_path,
+                    "metadata": SG_METADATA_FIELD
+                })
+
+            log.debug("...Retrieved %s records." % num_retrieved)
+            if progress_callback:
+                progress_callback(None, "Retrieved %d folders from Shotgun..." % num_retrieved)
+
+        # free the memory used for deduplication before the load
+        del primary_entities
+        del entity_paths
+
+        # the sqlite module commits any pending transaction before statements
+        # altering the schema, so the transaction is handled explicitly to cover
+        # the whole load, index changes included.
+        isolation_level = self._connection.isolation_level
+        self._connection.isolation_level = None
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # complete sync - clear our tables first
+                log.debug("Full sync - clearing local sqlite path cache tables...")
+                cursor.execute("DELETE FROM event_log_sync")
+                cursor.execute("DELETE FROM shotgun_status")
+                cursor.execute("DELETE FROM path_cache")
+                cursor.execute("DELETE FROM deferred_folders")
+
+                # maintaining the indices for every single row is a lot slower than
+                # building them once all the rows are in.
+                for index_name, _ in self._INDICES:
+                    cursor.execute("DROP INDEX IF EXISTS %s" % index_name)
+
+                log.debug("Full sync - inserting %d entries..." % len(rows))
+                for start in range(0, len(rows), self.FULL_SYNC_INSERT_BATCH_SIZE):
+                    batch = rows[start:start + self.FULL_SYNC_INSERT_BATCH_SIZE]
+                    # the tables are empty, so row ids are allocated here and used
+                    # to link the shotgun_status entries.
+                    cursor.executemany(
+                        "INSERT INTO path_cache(rowid, entity_type, entity_id, entity_name, root, path, primary_entity) "
+                        "VALUES(?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            (rowid,) + row[:-1]
+                            for rowid, row in enumerate(batch, start + 1)
+                        )
+                    )
+                    cursor.executemany(
+                        "INSERT INTO shotgun_status(path_cache_id, shotgun_id) VALUES(?, ?)",
+                        (
+                            (rowid, row[-1])
+                            for rowid, row in enumerate(batch, start + 1)
+                        )
+                    )
+                    if progress_callback:
+                        progress_callback(
+                            float(start + len(batch)) / len(rows),
+                            "Wrote %d of %d folders to the path cache..." % (start + len(batch), len(rows))
+                        )
+
+                log.debug("Full sync - rebuilding indices...")
+                for _, index_sql in self._INDICES:
+                    cursor.execute(index_sql)
+
+                # lastly, save the id of this event log entry for purpose of future syncing
+                # note - we don't maintain a list of event log entries but just a single
+                # value in the db, so start by clearing the table.
+                self._update_last_event_log_synced(cursor, max_event_log_id)
+
+                cursor.execute("COMMIT")
+            except:
+                cursor.execute("ROLLBACK")
+                raise
+        finally:
+            self._connection.isolation_level = isolation_level
 
-        self._update_last_event_log_synced(cursor, max_event_log_id)
+        if progress_callback:
+            progress_callback(1.0, "Synchronized %d folders." % len(rows))
 
-        self._connection.commit()
+        mirror = self._get_loaded_mirror()
+        if mirror:
+            mirror.invalidate()
 
         return return_data
 
@@ -871,21 +1212,15 @@ class PathCache(object):
         cursor.execute("DELETE FROM event_log_sync")
         cursor.execute("INSERT INTO event_log_sync(last_id) VALUES(?)", (event_log_id, ))
 
-    def _import_filesystem_location_entry(self, cursor, fsl_entity):
+    def _get_filesystem_location_mapping(self, fsl_entity):
         """
-        Imports a single filesystem location into the path cache.
+        Validates a filesystem location and resolves the path cache entry it maps to.
 
-        :param cursor: Database cursor.
-        :type :class:`sqlite3.Cursor`
-        :param dict fsl_entry: Filesystem location entity dictionary with keys:
-            - id
-            - type
-            - configuration_metadata
-            - is_primary
-            - linked_entity_id
-            - path
-            - linked_entity_type
-            - code
+        :param dict fsl_entity: Filesystem location entity dictionary, see
+                                :meth:`_import_filesystem_location_entry`.
+        :returns: Tuple with the entity dictionary, the local path, the root name,
+                  the path in its database form and the primary flag, or None if
+                  the entry can't be used on this machine.
         """
         # get entity data from our entry
         entity = {"id": fsl_entity[SG_ENTITY_ID_FIELD],
@@ -959,6 +1294,29 @@ class PathCache(object):
             log.debug("Could not resolve storages - skipping: %s" % e)
             return None
 
+        return entity, local_os_path, root_name, self._path_to_dbpath(relative_path), is_primary
+
+    def _import_filesystem_location_entry(self, cursor, fsl_entity):
+        """
+        Imports a single filesystem location into the path cache.
+
+        :param cursor: Database cursor.
+        :type :class:`sqlite3.Cursor`
+        :param dict fsl_entry: Filesystem location entity dictionary with keys:
+            - id
+            - type
+            - configuration_metadata
+            - is_primary
+            - linked_entity_id
+            - path
+            - linked_entity_type
+            - code
+        """
+        mapping = self._get_filesystem_location_mapping(fsl_entity)
+        if mapping is None:
+            return None
+        entity, local_os_path, _, _, is_primary = mapping
+
         # all validation checks seem ok - go ahead and make the changes.
         new_rowid = self._add_db_mapping(cursor, local_os_path, entity, is_primary)
         if new_rowid:
@@ -1060,6 +1418,77 @@ class PathCache(object):
                 subset_folder_ids
             )
 
+        # the deleted folders may have to be created again, for any entity.
+        cursor.execute("DELETE FROM deferred_folders")
+
+    ############################################################################################
+    # deferred folders ledger
+
+    def is_deferred_folder_creation_complete(self, entity_type, entity_ids, engine, user_id, schema_checksum):
+        """
+        Checks if the deferred folders of some entities have been created for an engine
+        and a user.
+
+        :param str entity_type: Shotgun entity type.
+        :param list entity_ids: Shotgun entity ids.
+        :param str engine: Engine the deferred folders were created for.
+        :param int user_id: Id of the HumanUser the deferred folders were created for,
+                            0 if there is no current user.
+        :param str schema_checksum: Checksum of the schema the folders were created with.
+        :returns: True if all the entities were recorded with :meth:`add_deferred_folder_creation`
+                  for this engine, user and schema, False otherwise.
+        """
+        if self._path_cache_disabled:
+            return False
+
+        entity_ids = list(set(entity_ids))
+        num_complete = 0
+        c = self._connection.cursor()
+        try:
+            for start in range(0, len(entity_ids), self.SQLITE_MAX_ITEMS_FOR_IN_STATEMENT):
+                subset_entity_ids = entity_ids[start:start + self.SQLITE_MAX_ITEMS_FOR_IN_STATEMENT]
+                res = c.execute(
+                    "SELECT COUNT(*) FROM deferred_folders WHERE entity_type = ? AND engine = ? AND user_id = ? "
+                    "AND schema_checksum = ? AND entity_id IN (%s)" % self._gen_param_string(subset_entity_ids),
+                    [entity_type, engine, user_id, schema_checksum] + subset_entity_ids
+                )
+                num_complete += res.fetchone()[0]
+        finally:
+            c.close()
+
+        return num_complete == len(entity_ids)
+
+    def add_deferred_folder_creation(self, entity_type, entity_ids, engine, user_id, schema_checksum):
+        """
+        Records that the deferred folders of some entities have been created for an engine
+        and a user.
+
+        Entries are recorded per user since the deferred folders include the user
+        sandboxes. Entries recorded with another schema are removed, since the schema
+        may now define folders which were not created for them.
+
+        :param str entity_type: Shotgun entity type.
+        :param list entity_ids: Shotgun entity ids.
+        :param str engine: Engine the deferred folders were created for.
+        :param int user_id: Id of the HumanUser the deferred folders were created for,
+                            0 if there is no current user.
+        :param str schema_checksum: Checksum of the schema the folders were created with.
+        """
+        if self._path_cache_disabled:
+            return
+
+        c = self._connection.cursor()
+        try:
+            c.execute("DELETE FROM deferred_folders WHERE schema_checksum != ?", (schema_checksum,))
+            c.executemany(
+                "INSERT OR REPLACE INTO deferred_folders(entity_type, entity_id, engine, user_id, schema_checksum) "
+                "VALUES(?, ?, ?, ?, ?)",
+                [(entity_type, entity_id, engine, user_id, schema_checksum) for entity_id in set(entity_ids)]
+            )
+            self._connection.commit()
+        finally:
+            c.close()
+
     ############################################################################################
     # pre-insertion validation
 
@@ -1229,6 +1658,10 @@ class PathCache(object):
         else:
             # Shotgun insert complete! Now we can commit path cache transaction
             self._connection.commit()
+
+            mirror = self._get_loaded_mirror()
+            if mirror and data_for_sg:
+                mirror.invalidate()
         
         finally:
             c.close()
@@ -1469,6 +1902,14 @@ class PathCache(object):
             return []
         
         paths = []
+
+        mirror = self._get_current_mirror() if cursor is None else None
+        if mirror:
+            for root_name, relative_path in mirror.get_paths(entity_type, entity_id, primary_only):
+                root_path = self._roots.get(root_name)
+                if root_path:
+                    paths.append(self._dbpath_to_path(root_path, relative_path))
+            return paths
         
         # use built in cursor unless specifically provided - means this
         # is part of a larger transaction
@@ -1528,6 +1969,10 @@ class PathCache(object):
             # eg. doesn't belong to the project
             return None
 
+        mirror = self._get_current_mirror() if cursor is None else None
+        if mirror:
+            return mirror.get_entities(root_path, self._path_to_dbpath(relative_path))[0]
+
         # use built in cursor unless specifically provided - means this
         # is part of a larger transaction
         c = cursor or self._connection.cursor()        
@@ -1571,6 +2016,10 @@ class PathCache(object):
             # eg. doesn't belong to the project
             return []
 
+        mirror = self._get_current_mirror()
+        if mirror:
+            return mirror.get_entities(root_path, self._path_to_dbpath(relative_path))[1]
+
         c = self._connection.cursor()
         try:
             db_path = self._path_to_dbpath(relative_path)
@@ -1589,6 +2038,73 @@ class PathCache(object):
         return matches
     
 
+    def get_entities_for_paths(self, paths):
+        """
+        Returns the primary and secondary entities for a batch of paths, using
+        a few bulk queries rather than two queries per path.
+
+        :param paths: List of paths on disk.
+        :returns: Dictionary keyed by path, with tuples holding the primary entity
+                  or None, and the list of secondary entities for each path. Entities
+                  are on the same form as the ones returned by :meth:`get_entity`.
+        :raises: :class:`TankError` if more than one primary entity is found for a path.
+        """
+        results = dict((path, (None, [])) for path in paths)
+
+        if self._path_cache_disabled:
+            # no entries because we don't have a path cache
+            return results
+
+        # group the db paths by root, keeping track of the paths they come from
+        db_paths_by_root = {}
+        for path in results:
+            try:
+                root_name, relative_path = self._separate_root(path)
+            except TankError:
+                # fail gracefully if path is not a valid path
+                # eg. doesn't belong to the project
+                continue
+            db_path = self._path_to_dbpath(relative_path)
+            db_paths_by_root.setdefault(root_name, {}).setdefault(db_path, []).append(path)
+
+        mirror = self._get_current_mirror()
+        if mirror:
+            for root_name, db_paths in db_paths_by_root.iteritems():
+                for db_path, db_path_paths in db_paths.iteritems():
+                    primary, secondary = mirror.get_entities(root_name, db_path)
+                    for path in db_path_paths:
+                        results[path] = (primary and dict(primary), [dict(entity) for entity in secondary])
+            return results
+
+        c = self._connection.cursor()
+        try:
+            for root_name, db_paths in db_paths_by_root.iteritems():
+                db_path_list = list(db_paths)
+                # split sql into batches - sqlite has a max number of terms for its in statement
+                for start in range(0, len(db_path_list), self.SQLITE_MAX_ITEMS_FOR_IN_STATEMENT):
+                    batch = db_path_list[start:start + self.SQLITE_MAX_ITEMS_FOR_IN_STATEMENT]
+                    res = c.execute(
+                        "SELECT path, entity_type, entity_id, entity_name, primary_entity "
+                        "FROM path_cache WHERE root = ? AND path IN (%s)" % ",".join("?" * len(batch)),
+                        [root_name] + batch
+                    )
+                    for db_path, entity_type, entity_id, entity_name, primary_entity in list(res):
+                        # convert to string, not unicode!
+                        entity = {"type": str(entity_type), "id": entity_id, "name": str(entity_name)}
+                        for path in db_paths[db_path]:
+                            primary, secondary = results[path]
+                            if not primary_entity:
+                                secondary.append(entity)
+                            elif primary is not None:
+                                # never supposed to happen!
+                                raise TankError("More than one entry in path database for %s!" % path)
+                            else:
+                                results[path] = (entity, secondary)
+        finally:
+            c.close()
+
+        return results
+
     def ensure_all_entries_are_in_shotgun(self):
         """
         Ensures that all the path cache data in this database is also registered in Shotgun.
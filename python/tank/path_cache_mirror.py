@@ -0,0 +1,320 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+In memory copy of the path cache database, used to serve lookups without
+querying sqlite.
+"""
+
+from __future__ import with_statement
+import sys
+import time
+import threading
+
+from .errors import TankError
+from . import LogManager
+
+log = LogManager.get_logger(__name__)
+
+
+class PathCacheMirror(object):
+    """
+    Holds all the rows of a path cache database in memory, indexed by path and
+    by entity.
+
+    The mirror is loaded from the database in a single query and is then kept
+    current by replaying the ``Toolkit_Folders_Create`` and ``Toolkit_Folders_Delete``
+    events processed by incremental path cache synchronizations. Any other change
+    made to the database, including changes made by other processes, invalidates
+    the mirror, which is then reloaded on its next use.
+    """
+
+    # indices in the row tuples
+    _ENTITY_TYPE, _ENTITY_ID, _ENTITY_NAME, _ROOT, _PATH, _PRIMARY, _SHOTGUN_ID = range(7)
+
+    # sqlite has a limit for how many items fit into a single in statement
+    SQLITE_MAX_ITEMS_FOR_IN_STATEMENT = 200
+
+    _SELECT_ROWS = (
+        "SELECT pc.rowid, pc.entity_type, pc.entity_id, pc.entity_name, pc.root, pc.path, "
+        "pc.primary_entity, ss.shotgun_id FROM path_cache pc "
+        "LEFT JOIN shotgun_status ss ON pc.rowid = ss.path_cache_id"
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = self._new_tables()
+        self._current = False
+        # incremented each time the mirror is invalidated
+        self._generation = 0
+        self._file_identity = None
+        self._load_time = 0.0
+        self._loads = 0
+        self._replayed_syncs = 0
+
+    @staticmethod
+    def _new_tables():
+        """
+        Returns empty tables for the rows held in memory.
+
+        The tables are held in a single tuple, so that a load can replace all of
+        them at once while lookups are reading them without the lock.
+
+        :returns: Tuple with the row tuples keyed by database rowid, and the rowids
+                  keyed by (root, path), by (entity type, entity id) and by
+                  FilesystemLocation id.
+        """
+        return ({}, {}, {}, {})
+
+    @property
+    def is_current(self):
+        """
+        True if the mirror is loaded and no change was made to the database
+        without being replayed on the mirror since.
+        """
+        return self._current
+
+    def check_file_identity(self, identity):
+        """
+        Invalidates the mirror if the database file was replaced or written to
+        since the last time this was called, e.g. by another process.
+
+        :param identity: Value identifying the database file and its state, e.g.
+                         its device, inode, modification time and size.
+        """
+        if identity != self._file_identity:
+            self._file_identity = identity
+            self.invalidate()
+
+    def update_file_identity(self, previous_identity, identity):
+        """
+        Records the identity of the database file after a change which was
+        replayed on the mirror.
+
+        If the file had already changed before, e.g. because another process
+        wrote to it, the mirror is invalidated instead.
+
+        :param previous_identity: Identity of the file before the change.
+        :param identity: Identity of the file after the change.
+        """
+        if previous_identity != self._file_identity:
+            self.invalidate()
+        self._file_identity = identity
+
+    def invalidate(self):
+        """
+        Flags the mirror as out of date so it is reloaded on its next use.
+        """
+        self._current = False
+        self._generation += 1
+
+    def load(self, connection):
+        """
+        Loads all the rows of the database, unless another thread loaded them
+        while this one was waiting.
+
+        The rows are loaded into new tables, which then replace the current ones,
+        so lookups made during the load keep using the previous rows.
+
+        :param connection: sqlite connection to the path cache database.
+        """
+        with self._lock:
+            if self._current:
+                return
+
+            start = time.time()
+            generation = self._generation
+            tables = self._new_tables()
+            cursor = connection.cursor()
+            try:
+                for row in cursor.execute(self._SELECT_ROWS):
+                    self._add_row(row, tables)
+            finally:
+                cursor.close()
+
+            self._tables = tables
+            # the database may have changed again during the load.
+            self._current = generation == self._generation
+            self._load_time = time.time() - start
+            self._loads += 1
+
+        log.debug(
+            "Loaded %d path cache entries in memory in %.3fs, using about %d KB.",
+            len(tables[0]), self._load_time, self.estimate_size() // 1024
+        )
+
+    def replay(self, connection, created_folder_ids, deleted_folder_ids):
+        """
+        Applies folder creation and deletion events to the mirror, once they have
+        been replayed on the database.
+
+        :param connection: sqlite connection to the path cache database.
+        :param list created_folder_ids: Ids of the FilesystemLocation entities
+                                        from the creation events.
+        :param list deleted_folder_ids: Ids of the FilesystemLocation entities
+                                        from the deletion events.
+        """
+        if not self._current:
+            # the mirror will be fully reloaded anyway.
+            return
+
+        cursor = connection.cursor()
+        try:
+            with self._lock:
+                for folder_id in deleted_folder_ids:
+                    for rowid in list(self._tables[3].get(folder_id, [])):
+                        self._remove_row(rowid)
+
+                # the database is the reference for the entries which were
+                # actually imported from the creation events.
+                created_folder_ids = list(created_folder_ids)
+                for start in range(0, len(created_folder_ids), self.SQLITE_MAX_ITEMS_FOR_IN_STATEMENT):
+                    batch = created_folder_ids[start:start + self.SQLITE_MAX_ITEMS_FOR_IN_STATEMENT]
+                    res = cursor.execute(
+                        "%s WHERE ss.shotgun_id IN (%s)" % (self._SELECT_ROWS, ",".join("?" * len(batch))),
+                        batch
+                    )
+                    for row in res:
+                        if row[0] in self._tables[0]:
+                            self._remove_row(row[0])
+                        self._add_row(row)
+        finally:
+            cursor.close()
+        self._replayed_syncs += 1
+
+    def _add_row(self, row, tables=None):
+        """
+        Adds a database row to the mirror and its indices.
+
+        :param row: Tuple with the rowid followed by the values of the row, as
+                    returned by the select query of the mirror.
+        :param tables: Tables to add the row to, see :meth:`_new_tables`. Defaults
+                       to the current tables.
+        """
+        (rows, by_path, by_entity, by_shotgun_id) = tables or self._tables
+        rowid = row[0]
+        values = row[1:]
+        rows[rowid] = values
+        by_path.setdefault((values[self._ROOT], values[self._PATH]), []).append(rowid)
+        by_entity.setdefault((values[self._ENTITY_TYPE], values[self._ENTITY_ID]), []).append(rowid)
+        if values[self._SHOTGUN_ID] is not None:
+            by_shotgun_id.setdefault(values[self._SHOTGUN_ID], []).append(rowid)
+
+    def _remove_row(self, rowid):
+        """
+        Removes a row from the mirror and its indices.
+
+        :param rowid: Database rowid of the row.
+        """
+        (rows, by_path, by_entity, by_shotgun_id) = self._tables
+        values = rows.pop(rowid)
+        for index, key in [
+            (by_path, (values[self._ROOT], values[self._PATH])),
+            (by_entity, (values[self._ENTITY_TYPE], values[self._ENTITY_ID])),
+            (by_shotgun_id, values[self._SHOTGUN_ID]),
+        ]:
+            rowids = index.get(key)
+            if rowids and rowid in rowids:
+                rowids.remove(rowid)
+                if not rowids:
+                    del index[key]
+
+    def _entity_from_row(self, values):
+        """
+        :returns: Shotgun entity dictionary for a row, e.g. {"type": "Shot", "name": "xxx", "id": 123}
+        """
+        # convert to string, not unicode!
+        return {
+            "type": str(values[self._ENTITY_TYPE]),
+            "id": values[self._ENTITY_ID],
+            "name": str(values[self._ENTITY_NAME]),
+        }
+
+    def get_entities(self, root_name, db_path):
+        """
+        Returns the primary and secondary entities for a path.
+
+        :param root_name: Name of the root the path belongs to.
+        :param db_path: Path relative to the root, in its database form.
+        :returns: Tuple with the primary entity dictionary or None and the list
+                  of secondary entity dictionaries.
+        :raises: :class:`TankError` if more than one primary entity is found.
+        """
+        primary = None
+        secondary = []
+        (rows, by_path, _, _) = self._tables
+        for rowid in sorted(by_path.get((root_name, db_path), [])):
+            values = rows.get(rowid)
+            if values is None:
+                continue
+            if values[self._PRIMARY] == 0:
+                secondary.append(self._entity_from_row(values))
+            elif values[self._PRIMARY] != 1:
+                continue
+            elif primary is not None:
+                # never supposed to happen!
+                raise TankError("More than one entry in path database for [%s] %s!" % (root_name, db_path))
+            else:
+                primary = self._entity_from_row(values)
+        return primary, secondary
+
+    def get_paths(self, entity_type, entity_id, primary_only):
+        """
+        Returns the paths associated with an entity.
+
+        :param entity_type: A Shotgun entity type.
+        :param entity_id: A Shotgun entity id.
+        :param primary_only: Only return items marked as primary.
+        :returns: List of (root name, db path) tuples.
+        """
+        paths = []
+        (rows, _, by_entity, _) = self._tables
+        for rowid in sorted(by_entity.get((entity_type, entity_id), [])):
+            values = rows.get(rowid)
+            if values is None or (primary_only and values[self._PRIMARY] != 1):
+                continue
+            paths.append((values[self._ROOT], values[self._PATH]))
+        return paths
+
+    def estimate_size(self):
+        """
+        Estimates the memory used by the mirror.
+
+        Strings shared with other objects are counted as well, so this is an upper bound.
+
+        :returns: Size in bytes.
+        """
+        with self._lock:
+            (rows, by_path, by_entity, by_shotgun_id) = self._tables
+            size = sum(sys.getsizeof(index) for index in self._tables)
+            for values in rows.itervalues():
+                size += sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+            for index in (by_path, by_entity, by_shotgun_id):
+                for key, rowids in index.iteritems():
+                    size += sys.getsizeof(key) + sys.getsizeof(rowids)
+        return size
+
+    def get_stats(self):
+        """
+        Returns statistics about the mirror.
+
+        :returns: Dictionary with the number of ``entries`` held in memory, an
+                  estimate of the memory used in bytes (``estimated_size``), the
+                  number of times the mirror was loaded (``loads``), the duration of
+                  the last load in seconds (``load_time``) and the number of
+                  synchronizations replayed on the mirror (``replayed_syncs``).
+        """
+        return {
+            "entries": len(self._tables[0]),
+            "estimated_size": self.estimate_size(),
+            "loads": self._loads,
+            "load_time": self._load_time,
+            "replayed_syncs": self._replayed_syncs,
+        }
@@ -23,6 +23,7 @@ from .util.version import is_version_older
 from . import constants
 from .platform.environment import InstalledEnvironment, WritableEnvironment
 from .util import shotgun, yaml_cache
+from .util.config_snapshot import ConfigSnapshot
 from .util import ShotgunPath
 from .util import StorageRoots
 from . import hook
@@ -259,7 +260,7 @@ class PipelineConfiguration(object):
                 log.debug("%s: Setting bundle cache fallbacks to %s from external config data" % (self, self._bundle_cache_fallback_paths)
                 )
 
-        # Populate the global yaml_cache if we find a pickled cache on disk.
+        # Populate the global yaml_cache if we find a snapshot or a pickled cache on disk.
         # TODO: For immutable configs, move this into bootstrap
         self._populate_yaml_cache()
 
@@ -357,15 +358,41 @@ class PipelineConfiguration(object):
 
     def _get_yaml_cache_location(self):
         """
-        Returns the location of the yaml cache for this configuration.
+        Returns the location of the yaml cache written by older versions of
+        the ``cache_yaml`` command for this configuration.
         """
         return os.path.join(self._pc_root, "yaml_cache.pickle")
 
+    def _get_config_snapshot_location(self):
+        """
+        Returns the location of the configuration snapshot for this configuration.
+        """
+        return os.path.join(self._pc_root, constants.CONFIG_SNAPSHOT_FILE)
+
     def _populate_yaml_cache(self):
         """
-        Loads pickled yaml_cache items if they are found and merges them into
-        the global YamlCache.
+        Registers the configuration snapshot with the global YamlCache if it is
+        found on disk. Otherwise, loads pickled yaml_cache items if they are found
+        and merges them into the global YamlCache.
         """
+        # the snapshot is also used to look up core hooks.
+        self._config_snapshot = None
+        snapshot_file = self._get_config_snapshot_location()
+        if os.path.exists(snapshot_file):
+            try:
+                snapshot = ConfigSnapshot(snapshot_file, self._pc_root)
+            except TankError as e:
+                log.warning("Could not read configuration snapshot: %s" % e)
+            else:
+                yaml_cache.g_yaml_cache.add_snapshot(snapshot)
+                self._config_snapshot = snapshot
+                log.debug("Registered %s items from configuration snapshot %s" % (len(snapshot), snapshot_file))
+                return
+
+        # a snapshot registered by a previous instance of this configuration
+        # must not be trusted anymore.
+        yaml_cache.g_yaml_cache.remove_snapshot(snapshot_file)
+
         cache_file = self._get_yaml_cache_location()
         if not os.path.exists(cache_file):
             return
@@ -1145,6 +1172,20 @@ class PipelineConfiguration(object):
     ########################################################################################
     # helpers and internal
 
+    def _core_hook_file_exists(self, hook_path):
+        """
+        Checks whether a core hook file exists in the configuration, using the
+        hooks listed in the configuration snapshot when they are up to date.
+
+        :param hook_path: Full path to the hook python file
+        :returns: True if the file exists, False if not
+        """
+        if self._config_snapshot is not None:
+            hook_paths = self._config_snapshot.get_hook_paths()
+            if hook_paths is not None:
+                return os.path.normpath(hook_path) in hook_paths
+        return hook.hook_file_exists(hook_path)
+
     def execute_core_hook_internal(self, hook_name, parent, **kwargs):
         """
         Executes an old-style core hook, passing it any keyword arguments supplied.
@@ -1163,7 +1204,7 @@ class PipelineConfiguration(object):
         hook_folder = self.get_core_hooks_location()
         file_name = "%s.py" % hook_name
         hook_path = os.path.join(hook_folder, file_name)
-        if not os.path.exists(hook_path):
+        if not self._core_hook_file_exists(hook_path):
             # no custom hook detected in the pipeline configuration
             # fall back on the hooks that come with the currently running version
             # of the core API.
@@ -1209,7 +1250,7 @@ class PipelineConfiguration(object):
         # now add a custom hook if that exists.
         hook_folder = self.get_core_hooks_location()
         hook_path = os.path.join(hook_folder, file_name)
-        if os.path.exists(hook_path):
+        if self._core_hook_file_exists(hook_path):
             hook_paths.append(hook_path)
 
         try:
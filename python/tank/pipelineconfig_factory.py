@@ -9,6 +9,8 @@
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
 import os
+import time
+import sqlite3
 import collections
 import pprint
 import cPickle as pickle
@@ -25,6 +27,14 @@ from .util import LocalFileStorageManager
 
 log = LogManager.get_logger(__name__)
 
+# the pipeline configuration data last looked up by path and its project
+# root trie, see _get_project_paths_trie.
+_g_project_paths_trie = (None, None)
+
+# the pipeline configuration data last loaded from the lookup cache, see
+# _load_pipeline_configs_from_lookup_cache.
+_g_lookup_cache_pipeline_configs = (None, None, None)
+
 
 def from_entity(entity_type, entity_id):
     """
@@ -84,9 +94,14 @@ def _from_entity(entity_type, entity_id, force_reread_shotgun_cache):
             "pipeline configuration." % (entity_type, entity_id)
         )
 
-    # now find the pipeline configurations that are matching this project
-    data = _get_pipeline_configs(force_reread_shotgun_cache)
-    associated_sg_pipeline_configs = _get_pipeline_configs_for_project(project_id, data)
+    # now find the pipeline configurations that are matching this project,
+    # using the lookup cache index if possible.
+    associated_sg_pipeline_configs = None
+    if not force_reread_shotgun_cache:
+        associated_sg_pipeline_configs = _get_cached_pipeline_configs_for_project(project_id)
+    if associated_sg_pipeline_configs is None:
+        data = _get_pipeline_configs(force_reread_shotgun_cache)
+        associated_sg_pipeline_configs = _get_pipeline_configs_for_project(project_id, data)
 
     log.debug(
         "Associated pipeline configurations are: %s" % pprint.pformat(associated_sg_pipeline_configs)
@@ -188,16 +203,23 @@ def _from_path(path, force_reread_shotgun_cache):
 
         return PipelineConfiguration(pc_registered_path)
 
-    # now get storage and project data from shotgun.
-    # this will use a cache unless the force flag is set
-    sg_data = _get_pipeline_configs(force_reread_shotgun_cache)
+    # the lookup cache indexes pipeline configurations by project root, so
+    # try that first unless the force flag is set.
+    associated_sg_pipeline_configs = None
+    if not force_reread_shotgun_cache:
+        associated_sg_pipeline_configs = _get_cached_pipeline_configs_for_path(path)
 
-    # now given ALL pipeline configs for ALL projects and their associated projects
-    # and project root paths (in sg_data), figure out which pipeline configurations
-    # are matching the given path. This is done by walking upwards in the path
-    # until a project root is found, and then figuring out which pipeline configurations
-    # belong to that project root.
-    associated_sg_pipeline_configs = _get_pipeline_configs_for_path(path, sg_data)
+    if associated_sg_pipeline_configs is None:
+        # now get storage and project data from shotgun.
+        # this will use a cache unless the force flag is set
+        sg_data = _get_pipeline_configs(force_reread_shotgun_cache)
+
+        # now given ALL pipeline configs for ALL projects and their associated projects
+        # and project root paths (in sg_data), figure out which pipeline configurations
+        # are matching the given path. This is done by walking upwards in the path
+        # until a project root is found, and then figuring out which pipeline configurations
+        # belong to that project root.
+        associated_sg_pipeline_configs = _get_pipeline_configs_for_path(path, sg_data)
 
     log.debug(
         "Associated pipeline configurations are: %s" % pprint.pformat(associated_sg_pipeline_configs)
@@ -543,6 +565,78 @@ def _get_pipeline_configs_for_path(path, data):
     :param path: Path to look for
     :param data: Cache data chunk, obtained using _get_pipeline_configs()
     :returns: list of pipeline configurations matching the path, [] if no match.
+              Pipeline configurations of shallower project roots come first.
+    """
+    # look at the path we passed in - see if any of the computed
+    # project folders are determined to be a parent path
+    return _get_project_paths_trie(data).find(path)
+
+
+class _ProjectPathsTrie(object):
+    """
+    Prefix tree of project root paths, with one level per folder.
+
+    Paths are compared case insensitively (like the SG API, this logic is case
+    preserving, not case insensitive). A path matches a project root if it is
+    the root itself or one of its children, so looking up a path only walks
+    down its own folders, whatever the number of projects.
+    """
+
+    def __init__(self, project_paths):
+        """
+        :param project_paths: Dictionary of lists of pipeline configurations,
+                              keyed by project root path.
+        """
+        # each node is a tuple of a dictionary of child nodes keyed by folder
+        # name, and a list of the pipeline configurations of the project root.
+        self._root = ({}, [])
+        for project_path, pipeline_configs in project_paths.iteritems():
+            node = self._root
+            for folder in project_path.lower().split(os.path.sep):
+                node = node[0].setdefault(folder, ({}, []))
+            node[1].extend(pipeline_configs)
+
+    def find(self, path):
+        """
+        Finds the pipeline configurations of the project roots a path belongs to.
+
+        :param path: Path to look for
+        :returns: list of pipeline configurations matching the path, [] if no match.
+        """
+        matching_pcs = []
+        node = self._root
+        for folder in path.lower().split(os.path.sep):
+            node = node[0].get(folder)
+            if node is None:
+                break
+            matching_pcs.extend(node[1])
+        return matching_pcs
+
+
+def _get_project_paths_trie(data):
+    """
+    Returns the project root trie for the given pipeline configuration data.
+    The trie of the last data is kept, so looking up several paths with the
+    same data only builds it once.
+
+    :param data: Cache data chunk, obtained using _get_pipeline_configs()
+    :returns: :class:`_ProjectPathsTrie` instance.
+    """
+    global _g_project_paths_trie
+    trie_data, trie = _g_project_paths_trie
+    if trie_data is not data:
+        trie = _ProjectPathsTrie(_get_project_paths(data))
+        _g_project_paths_trie = (data, trie)
+    return trie
+
+
+def _get_project_paths(data):
+    """
+    Computes the root paths of all projects in all storages for the current os,
+    see :meth:`_get_pipeline_configs_for_path`.
+
+    :param data: Cache data chunk, obtained using _get_pipeline_configs()
+    :returns: Dictionary of lists of pipeline configurations, keyed by project root path.
     """
     # step 1 - extract all storages for the current os
     storages = []
@@ -583,25 +677,7 @@ def _get_pipeline_configs_for_path(path, data):
 
                 _add_to_project_paths(project_paths, project_name, storage, pc)
 
-    # step 3 - look at the path we passed in - see if any of the computed
-    # project folders are determined to be a parent path
-    all_matching_pcs = []
-
-    for project_path in project_paths:
-
-        # (like the SG API, this logic is case preserving, not case insensitive)
-        path_lower = path.lower()
-        proj_path_lower = project_path.lower()
-        # check if the path matches. Either
-        # direct match: path: /mnt/proj_x == project path: /mnt/proj_x
-        # child path: path: /mnt/proj_x/foo/bar starts with /mnt/proj_x/
-
-        if path_lower == proj_path_lower or path_lower.startswith("%s%s" % (proj_path_lower, os.path.sep)):
-            # found a match!
-            associated_pcs = project_paths[project_path]
-            all_matching_pcs.extend(associated_pcs)
-
-    return all_matching_pcs
+    return project_paths
 
 
 def _add_to_project_paths(project_paths, project_name, storage, pipeline_config):
@@ -702,10 +778,10 @@ def __get_project_id(entity_type, entity_id, force=False):
     if force is False:
         # try to load cache first
         # if that doesn't work, fall back on shotgun
-        cache = _load_lookup_cache()
-        if cache and cache.get(CACHE_KEY):
+        project_id = _load_lookup_cache(CACHE_KEY)
+        if project_id:
             # cache hit!
-            return cache.get(CACHE_KEY)
+            return project_id
 
     # ok, so either we are force recomputing the cache or the cache wasn't there
     sg = shotgun.get_sg_connection()
@@ -763,10 +839,10 @@ def _get_pipeline_configs(force=False):
     if force is False:
         # try to load cache first
         # if that doesn't work, fall back on shotgun
-        cache = _load_lookup_cache()
-        if cache and cache.get(CACHE_KEY):
+        data = _load_pipeline_configs_from_lookup_cache(CACHE_KEY)
+        if data:
             # cache hit!
-            return cache.get(CACHE_KEY)
+            return data
 
     # ok, so either we are force recomputing the cache or the cache wasn't there
     sg = shotgun.get_sg_connection()
@@ -801,71 +877,315 @@ def _get_pipeline_configs(force=False):
     # Index the result by project id so look-ups are easier to do later on.
     projects = dict((project["id"], project) for project in projects)
 
-    # cache this data
+    # cache this data, and index it so pipeline configurations can be looked
+    # up without loading all of it.
     data = {"local_storages": local_storages, "pipeline_configurations": pipeline_configs, "projects": projects}
-    _add_to_lookup_cache(CACHE_KEY, data)
+    _add_to_lookup_cache(CACHE_KEY, data, index_pipeline_configs=True)
 
     return data
 
 
-def _load_lookup_cache():
+#################################################################################################################
+# the lookup cache is an sqlite database with the following tables:
+#
+# - lookup: pickled values by key, with an optional expiry time.
+# - project_paths: the pipeline configurations of each project root path,
+#   indexed by lower case path.
+# - project_pipeline_configs: the pipeline configurations of each project,
+#   indexed by project id. Pipeline configurations for all projects have a
+#   NULL project id.
+#
+# The two last tables index the pipeline configurations stored in the lookup
+# table under the key given to _add_to_lookup_cache, and are only valid while
+# that key is.
+
+# key of the lookup table entry the pipeline configuration tables are built from
+_INDEXED_KEY_SETTING = "indexed_key"
+
+_LOOKUP_CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS lookup (key TEXT PRIMARY KEY, value BLOB, expires_at REAL);
+    CREATE TABLE IF NOT EXISTS project_paths (project_path TEXT, pipeline_config BLOB);
+    CREATE INDEX IF NOT EXISTS project_paths_path ON project_paths(project_path);
+    CREATE TABLE IF NOT EXISTS project_pipeline_configs (project_id INTEGER, pipeline_config BLOB);
+    CREATE INDEX IF NOT EXISTS project_pipeline_configs_id ON project_pipeline_configs(project_id);
+"""
+
+
+def _connect_lookup_cache(create=False):
     """
-    Load lookup cache file from disk.
+    Opens the lookup cache database.
 
-    :returns: cache cache, as constructed by the _add_to_lookup_cache method
+    :param create: Create the database if it doesn't exist.
+    :returns: sqlite3 connection, or None if the database doesn't exist and
+              shouldn't be created.
     """
     cache_file = _get_cache_location()
-    cache_data = {}
+    exists = os.path.exists(cache_file)
+    if not exists:
+        if not create:
+            return None
+        filesystem.ensure_folder_exists(os.path.dirname(cache_file))
+
+    # other processes may be writing to the database, wait for them.
+    connection = sqlite3.connect(cache_file, timeout=30)
+    connection.text_factory = str
+    if create:
+        # another process may have created the file but not the tables yet.
+        connection.executescript(_LOOKUP_CACHE_SCHEMA)
+    if not exists:
+        # and ensure the cache file has got open permissions
+        os.chmod(cache_file, 0o666)
+    return connection
+
+
+def _get_lookup_cache_value(connection, key):
+    """
+    :returns: The unpickled value stored under the given key, or None if there
+              is none or it has expired.
+    """
+    row = connection.execute(
+        "SELECT value FROM lookup WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+        (key, time.time())
+    ).fetchone()
+    return pickle.loads(str(row[0])) if row else None
+
+
+def _load_lookup_cache(key=None):
+    """
+    Load lookup cache data from disk.
+
+    :param key: Key of the value to load. If None, all values are loaded.
+    :returns: The value for the given key, or None if it's not cached or has
+              expired. If no key was given, dictionary of all values which
+              haven't expired, keyed by key.
+    """
+    cache_data = {} if key is None else None
 
     try:
-        fh = open(cache_file, "rb")
-        try:
-            cache_data = pickle.load(fh)
-        finally:
-            fh.close()
+        connection = _connect_lookup_cache()
+        if connection:
+            try:
+                if key is not None:
+                    cache_data = _get_lookup_cache_value(connection, key)
+                else:
+                    rows = connection.execute(
+                        "SELECT key, value FROM lookup WHERE expires_at IS NULL OR expires_at > ?",
+                        (time.time(),)
+                    )
+                    cache_data = dict((k, pickle.loads(str(v))) for k, v in rows)
+            finally:
+                connection.close()
     except Exception as e:
         # failed to load cache from file. Continue silently.
         log.debug(
-            "Failed to load lookup cache %s. Proceeding without cache. Error: %s" % (cache_file, e)
+            "Failed to load lookup cache %s. Proceeding without cache. Error: %s" % (
+                _get_cache_location(), e
+            )
         )
 
     return cache_data
 
 
+def _load_pipeline_configs_from_lookup_cache(key):
+    """
+    Loads pipeline configuration data from the lookup cache. The data is kept
+    in memory until the cache file changes or the data expires, so that it is
+    only decoded once, and so that the project root trie built from it by
+    :meth:`_get_project_paths_trie` is reused.
+
+    :param key: Key of the data in the lookup cache.
+    :returns: Cache data chunk, see _get_pipeline_configs(), or None if it's
+              not cached or has expired.
+    """
+    global _g_lookup_cache_pipeline_configs
+
+    cache_file = _get_cache_location()
+    try:
+        stat = os.stat(cache_file)
+    except OSError:
+        return None
+
+    # the file is checked before it is read, so changes made while reading it
+    # are picked up next time.
+    identity = (cache_file, key, stat.st_mtime, stat.st_size)
+    cached_identity, expires_at, data = _g_lookup_cache_pipeline_configs
+    if cached_identity == identity and (expires_at is None or expires_at > time.time()):
+        return data
+
+    data = None
+    try:
+        connection = _connect_lookup_cache()
+        if connection:
+            try:
+                row = connection.execute(
+                    "SELECT value, expires_at FROM lookup "
+                    "WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (key, time.time())
+                ).fetchone()
+            finally:
+                connection.close()
+            if row:
+                data = pickle.loads(str(row[0]))
+                _g_lookup_cache_pipeline_configs = (identity, row[1], data)
+    except Exception as e:
+        # failed to load cache from file. Continue silently.
+        log.debug(
+            "Failed to load lookup cache %s. Proceeding without cache. Error: %s" % (
+                cache_file, e
+            )
+        )
+
+    return data
+
+
 @filesystem.with_cleared_umask
-def _add_to_lookup_cache(key, data):
+def _add_to_lookup_cache(key, data, ttl=None, index_pipeline_configs=False):
     """
     Add a key to the lookup cache. This method will silently
     fail if the cache cannot be operated on.
 
     :param key: Dictionary key for the cache
     :param data: Data to associate with the dictionary key
+    :param ttl: Number of seconds after which the data expires. If None, it never does.
+    :param index_pipeline_configs: Index the pipeline configurations of the data,
+        obtained using _get_pipeline_configs(), by project root path and project id.
     """
+    try:
+        connection = _connect_lookup_cache(create=True)
+        try:
+            # the connection commits all the changes at once, or none of them.
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO lookup (key, value, expires_at) VALUES (?, ?, ?)",
+                    (
+                        key,
+                        sqlite3.Binary(pickle.dumps(data, pickle.HIGHEST_PROTOCOL)),
+                        None if ttl is None else time.time() + ttl
+                    )
+                )
+                if index_pipeline_configs:
+                    _index_pipeline_configs(connection, key, data)
+        finally:
+            connection.close()
+    except Exception as e:
+        # silently continue in case exceptions are raised
+        log.debug(
+            "Failed to add to lookup cache %s. Error: %s" % (_get_cache_location(), e)
+        )
 
-    # first load the content
-    cache_data = _load_lookup_cache()
-    # update
-    cache_data[key] = data
-    # and write out the cache
-    cache_file = _get_cache_location()
 
-    try:
-        filesystem.ensure_folder_exists(os.path.dirname(cache_file))
+def _index_pipeline_configs(connection, key, data):
+    """
+    Replaces the pipeline configuration index tables with the pipeline
+    configurations of the given data.
 
-        # write cache file
-        fh = open(cache_file, "wb")
+    :param connection: sqlite3 connection to the lookup cache.
+    :param key: Key the data is stored under in the lookup table.
+    :param data: Cache data chunk, obtained using _get_pipeline_configs()
+    """
+    def pickled(pc):
+        return sqlite3.Binary(pickle.dumps(pc, pickle.HIGHEST_PROTOCOL))
+
+    connection.execute("DELETE FROM project_paths")
+    connection.execute("DELETE FROM project_pipeline_configs")
+
+    project_paths = _get_project_paths(data)
+    connection.executemany(
+        "INSERT INTO project_paths (project_path, pipeline_config) VALUES (?, ?)",
+        (
+            (project_path.lower(), pickled(pc))
+            for project_path, pcs in project_paths.iteritems() for pc in pcs
+        )
+    )
+    connection.executemany(
+        "INSERT INTO project_pipeline_configs (project_id, pipeline_config) VALUES (?, ?)",
+        (
+            (pc["project"]["id"] if pc["project"] else None, pickled(pc))
+            for pc in data["pipeline_configurations"]
+        )
+    )
+    connection.execute(
+        "INSERT OR REPLACE INTO lookup (key, value, expires_at) VALUES (?, ?, NULL)",
+        (_INDEXED_KEY_SETTING, sqlite3.Binary(pickle.dumps(key, pickle.HIGHEST_PROTOCOL)))
+    )
+
+
+def _get_cached_pipeline_configs(query, parameters):
+    """
+    Runs a query on the pipeline configuration index tables of the lookup cache.
+
+    :param query: SQL query returning pickled pipeline configurations.
+    :param parameters: Parameters of the query.
+    :returns: List of pipeline configurations, or None if the index doesn't
+              exist or the data it was built from has expired.
+    """
+    try:
+        connection = _connect_lookup_cache()
+        if not connection:
+            return None
         try:
-            pickle.dump(cache_data, fh)
+            indexed_key = _get_lookup_cache_value(connection, _INDEXED_KEY_SETTING)
+            if indexed_key is None:
+                return None
+            # the index is only valid as long as the data it was built from.
+            if not connection.execute(
+                "SELECT 1 FROM lookup WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (indexed_key, time.time())
+            ).fetchone():
+                return None
+            return [pickle.loads(str(row[0])) for row in connection.execute(query, parameters)]
         finally:
-            fh.close()
-        # and ensure the cache file has got open permissions
-        os.chmod(cache_file, 0o666)
-
+            connection.close()
     except Exception as e:
-        # silently continue in case exceptions are raised
         log.debug(
-            "Failed to add to lookup cache %s. Error: %s" % (cache_file, e)
+            "Failed to look up pipeline configurations in lookup cache %s. Error: %s" % (
+                _get_cache_location(), e
+            )
         )
+        return None
+
+
+def _get_cached_pipeline_configs_for_path(path):
+    """
+    Looks up the pipeline configurations for a path in the lookup cache index,
+    see :meth:`_get_pipeline_configs_for_path`.
+
+    :param path: Path to look for
+    :returns: list of pipeline configurations matching the path, [] if no match,
+              None if the index isn't available. Pipeline configurations of
+              shallower project roots come first.
+    """
+    # the path and all its parent folders are candidate project root paths.
+    path_lower = path.lower()
+    candidates = set([path_lower])
+    index = path_lower.find(os.path.sep)
+    while index != -1:
+        candidates.add(path_lower[:index])
+        index = path_lower.find(os.path.sep, index + 1)
+
+    return _get_cached_pipeline_configs(
+        "SELECT pipeline_config FROM project_paths WHERE project_path IN (%s) "
+        "ORDER BY length(project_path), rowid" % (
+            ",".join("?" * len(candidates))
+        ),
+        list(candidates)
+    )
+
+
+def _get_cached_pipeline_configs_for_project(project_id):
+    """
+    Looks up the pipeline configurations for a project in the lookup cache
+    index, see :meth:`_get_pipeline_configs_for_project`.
+
+    :param project_id: Project id to look for
+    :returns: list of pipeline configurations matching the project, [] if no
+              match, None if the index isn't available.
+    """
+    return _get_cached_pipeline_configs(
+        "SELECT pipeline_config FROM project_pipeline_configs "
+        "WHERE project_id IS NULL OR project_id = ? ORDER BY rowid",
+        (project_id,)
+    )
 
 
 def _get_cache_location():
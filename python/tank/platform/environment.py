@@ -90,13 +90,14 @@ class Environment(object):
         self.__app_settings = {}
 
         # populate the above data structures
-        # pass a copy of the data since process is destructive
-        d = copy.deepcopy(self._env_data)
-        self.__process_engines(d.get("engines"))
+        # processing removes the apps and location keys from the settings
+        # dictionaries, so it is given copies of them. The environment data is
+        # only used to check which bundles exist, the settings values can be shared.
+        self.__process_engines(self.__copy_settings(self._env_data.get("engines"), "apps"))
 
         if "frameworks" in self._env_data:
             # there are frameworks defined! Process them
-            self.__process_frameworks(d.get("frameworks"))
+            self.__process_frameworks(self.__copy_settings(self._env_data.get("frameworks")))
 
         # now extract the location key for all the configs
         # these two dicts are keyed in the same way as the settings dicts
@@ -105,6 +106,27 @@ class Environment(object):
         self.__framework_locations = {}
         self.__extract_locations()
 
+    def __copy_settings(self, bundles, nested_section=None):
+        """
+        Copies a section of bundle settings, without copying the settings values.
+
+        :param dict bundles: Settings dictionaries keyed by bundle instance name, or None.
+        :param str nested_section: Optional name of a section of bundles nested in
+                                   the settings of each bundle, e.g. ``apps``, which
+                                   is copied the same way.
+        :returns: Dictionary of copied settings dictionaries, or None.
+        """
+        if not isinstance(bundles, dict):
+            return bundles
+        copied = {}
+        for name, settings in bundles.items():
+            if isinstance(settings, dict):
+                settings = dict(settings)
+                if nested_section and nested_section in settings:
+                    settings[nested_section] = self.__copy_settings(settings[nested_section])
+            copied[name] = settings
+        return copied
+
     def __is_item_disabled(self, settings):
         """
         handles the checks to see if an item is disabled
@@ -201,7 +223,8 @@ class Environment(object):
         loads the main data from disk, raw form
         """
         logger.debug("Loading environment data from path: %s", self._env_path)
-        return g_yaml_cache.get(path) or {}
+        # the data is only read, includes processing builds new data structures.
+        return g_yaml_cache.get(path, frozen=True) or {}
 
     def __load_environment_data(self):
         """
@@ -32,6 +32,8 @@ import os
 import re
 import sys
 import copy
+import time
+import threading
 
 from ..errors import TankError
 from ..template import TemplatePath
@@ -45,6 +47,93 @@ from ..util.includes import resolve_include
 
 log = LogManager.get_logger(__name__)
 
+# Processed include files, keyed by path. Files are resolved again only when
+# they, or one of the files they include, change.
+_include_graph = {}
+# Templates built for template based includes, keyed by include and primary
+# data root.
+_include_templates = {}
+_include_graph_lock = threading.Lock()
+
+
+class _IncludeNode(object):
+    """
+    A processed include file of the include graph.
+    """
+    __slots__ = ["data", "include_files", "included", "result"]
+
+    def __init__(self, data, include_files, included, result):
+        """
+        :param data:            Data of the file, as returned by the yaml cache.
+        :param include_files:   Paths of the files it includes.
+        :param included:        The processed data of the included files.
+        :param result:          Tuple with the processed data of the file and
+                                its framework lookup.
+        """
+        self.data = data
+        self.include_files = include_files
+        self.included = included
+        self.result = result
+
+    def is_up_to_date(self, data, include_files, included):
+        """
+        :returns: True if the node was built from the same file data and
+                  included data.
+        """
+        return (
+            self.data is data and
+            self.include_files == include_files and
+            len(self.included) == len(included) and
+            all(a is b for a, b in zip(self.included, included))
+        )
+
+
+def clear_include_graph():
+    """
+    Forgets all the processed include files.
+    """
+    with _include_graph_lock:
+        _include_graph.clear()
+        _include_templates.clear()
+
+
+def _get_include_template(file_name, include, primary_data_root):
+    """
+    Returns the template for a template based include.
+
+    :param file_name:           The yml file the include is defined in.
+    :param include:             The include path, with {tokens}.
+    :param primary_data_root:   Primary data root of the project.
+    :returns:                   :class:`~tank.template.TemplatePath` instance.
+    """
+    key = (include, primary_data_root)
+    with _include_graph_lock:
+        template = _include_templates.get(key)
+    if template is not None:
+        return template
+
+    # extract all {tokens}
+    _key_name_regex = "[a-zA-Z_ 0-9]+"
+    regex = r"(?<={)%s(?=})" % _key_name_regex
+    key_names = re.findall(regex, include)
+
+    # try to construct a path object for each template
+    try:
+        # create template key objects
+        template_keys = {}
+        for key_name in key_names:
+            template_keys[key_name] = StringKey(key_name)
+
+        # Make a template
+        template = TemplatePath(include, template_keys, primary_data_root)
+    except TankError as e:
+        raise TankError("Syntax error in %s: Could not transform include path '%s' "
+                        "into a template: %s" % (file_name, include, e))
+
+    with _include_graph_lock:
+        _include_templates[key] = template
+    return template
+
 def _resolve_includes(file_name, data, context):
     """
     Parses the includes section and returns a list of valid paths
@@ -71,32 +160,15 @@ def _resolve_includes(file_name, data, context):
                     "because there is no active context." % (file_name, include)
                 )
                 continue
-            
-            # extract all {tokens}
-            _key_name_regex = "[a-zA-Z_ 0-9]+"
-            regex = r"(?<={)%s(?=})" % _key_name_regex
-            key_names = re.findall(regex, include)
-    
+
             # get all the data roots for this project
             # note - it is possible that this call may raise an exception for configs
             # which don't have a primary storage defined - this is logical since such
             # configurations cannot make use of references into the file system hierarchy
             # (because no such hierarchy exists)
             primary_data_root = context.tank.pipeline_configuration.get_primary_data_root()
-    
-            # try to construct a path object for each template
-            try:
-                # create template key objects        
-                template_keys = {}
-                for key_name in key_names:
-                    template_keys[key_name] = StringKey(key_name)
-        
-                # Make a template
-                template = TemplatePath(include, template_keys, primary_data_root)
-            except TankError as e:
-                raise TankError("Syntax error in %s: Could not transform include path '%s' "
-                                "into a template: %s" % (file_name, include, e))
-            
+            template = _get_include_template(file_name, include, primary_data_root)
+
             # and turn the template into a path based on the context
             try:
                 f = context.as_template_fields(template)
@@ -160,7 +232,9 @@ def _resolve_frameworks(lookup_dict, data):
             data["frameworks"] = {}
         if data["frameworks"] is None:
             data["frameworks"] = {}
-        data["frameworks"].update(fw)    
+        # included data is shared by all the files including it, so it is copied
+        # like resolved references are.
+        data["frameworks"].update(copy.deepcopy(fw))
     
     return data
     
@@ -176,11 +250,18 @@ def process_includes(file_name, data, context):
     :returns:           The flattened yml data after all includes have
                         been recursively processed.
     """
+    start_time = time.time()
+    stats = {"files": 0, "resolved": 0}
     # call the recursive method:
-    data, _ = _process_includes_r(file_name, data, context)
+    data, _ = _process_includes_r(file_name, data, context, stats)
+    log.debug(
+        "Processed includes of %s in %.3fs, %d of %d included files were resolved." % (
+            file_name, time.time() - start_time, stats["resolved"], stats["files"]
+        )
+    )
     return data
-        
-def _process_includes_r(file_name, data, context):
+
+def _process_includes_r(file_name, data, context, stats=None):
     """
     Recursively process includes for an environment file.
     
@@ -189,28 +270,82 @@ def _process_includes_r(file_name, data, context):
     1. Load include data into a big dictionary X
     2. recursively go through the current file and replace any 
        @ref with a dictionary value from X
+
+    Included files are only resolved again if they or the files they include
+    have changed since they were last processed.
     
     :param file_name:   The root yml file to process
     :param data:        The contents of the root yml file to process
     :param context:     The current context
+    :param stats:       Optional dictionary in which the number of included
+                        ``files`` and the number of them which were ``resolved``
+                        are counted.
 
     :returns:           A tuple containing the flattened yml data 
                         after all includes have been recursively processed
                         together with a lookup for frameworks to the file 
                         they were loaded from.
     """
-    # first build our big fat lookup dict
+    include_files, included = _process_included_files(file_name, data, context, stats)
+    return _merge_includes(file_name, data, include_files, included)
+
+def _process_included_files(file_name, data, context, stats):
+    """
+    Processes the files included by a yml file.
+
+    :returns: Tuple with the list of included files and the list of their
+              processed data, see :meth:`_process_included_file`.
+    """
     include_files = _resolve_includes(file_name, data, context)
-    
+    # load all the included files at once rather than one after the other.
+    g_yaml_cache.preload(include_files)
+    included = [
+        _process_included_file(include_file, context, stats) for include_file in include_files
+    ]
+    return include_files, included
+
+def _process_included_file(include_file, context, stats):
+    """
+    Processes an included file, reusing the result of a previous call if the
+    file and all the files it includes are unchanged.
+
+    :returns: Tuple with the flattened yml data and the framework lookup of
+              the file. It is shared by all the files including it and must
+              not be modified.
+    """
+    # path exists, so try to read it
+    data = g_yaml_cache.get(include_file, frozen=True)
+    include_files, included = _process_included_files(include_file, data or {}, context, stats)
+    if stats is not None:
+        stats["files"] += 1
+
+    with _include_graph_lock:
+        node = _include_graph.get(include_file)
+    if node and node.is_up_to_date(data, include_files, included):
+        return node.result
+
+    if stats is not None:
+        stats["resolved"] += 1
+    result = _merge_includes(include_file, data or {}, include_files, included)
+    with _include_graph_lock:
+        _include_graph[include_file] = _IncludeNode(data, include_files, included, result)
+    return result
+
+def _merge_includes(file_name, data, include_files, included):
+    """
+    Replaces the references of a yml file with the data of the files it includes.
+
+    :param file_name:       The yml file to process.
+    :param data:            The contents of the yml file.
+    :param include_files:   The files it includes.
+    :param included:        The processed data of each included file.
+    :returns:               Tuple with the flattened yml data and the framework
+                            lookup of the file.
+    """
+    # first build our big fat lookup dict
     lookup_dict = {}
     fw_lookup = {}
-    for include_file in include_files:
-                
-        # path exists, so try to read it
-        included_data = g_yaml_cache.get(include_file) or {}
-                
-        # now resolve this data before proceeding
-        included_data, included_fw_lookup = _process_includes_r(include_file, included_data, context)
+    for include_file, (included_data, included_fw_lookup) in zip(include_files, included):
 
         # update our big lookup dict with this included data:
         if "frameworks" in included_data and isinstance(included_data["frameworks"], dict):
@@ -223,7 +358,11 @@ def _process_includes_r(file_name, data, context):
             for fw_name in included_data["frameworks"].keys():
                 fw_lookup[fw_name] = include_file
 
-            del(included_data["frameworks"])
+            # the included data is shared, so the frameworks are left out of
+            # it rather than deleted.
+            included_data = dict(
+                (key, value) for key, value in included_data.items() if key != "frameworks"
+            )
 
         fw_lookup.update(included_fw_lookup)
         lookup_dict.update(included_data)
@@ -252,7 +391,7 @@ def find_framework_location(file_name, framework_name, context):
                             defined in or None if not found.
     """
     # load the data in for the root file:
-    data = g_yaml_cache.get(file_name) or {}
+    data = g_yaml_cache.get(file_name, frozen=True) or {}
 
     # track root frameworks:
     root_fw_lookup = {}
@@ -312,7 +451,7 @@ def find_reference(file_name, context, token, absolute_location=False):
     :rtype: tuple
     """
     # load the data in 
-    data = g_yaml_cache.get(file_name) or {}
+    data = g_yaml_cache.get(file_name, frozen=True) or {}
     
     # first build our big fat lookup dict
     include_files = _resolve_includes(file_name, data, context)
@@ -321,7 +460,7 @@ def find_reference(file_name, context, token, absolute_location=False):
 
     for include_file in include_files:
         # path exists, so try to read it
-        included_data = g_yaml_cache.get(include_file) or {}
+        included_data = g_yaml_cache.get(include_file, frozen=True) or {}
         
         if token in included_data:
             # If we've been asked to ensure an absolute location, we need
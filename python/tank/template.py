@@ -21,6 +21,7 @@ from . import templatekey
 from .errors import TankError
 from . import constants
 from .template_path_parser import TemplatePathParser
+from .util.lru_cache import LRUCache
 
 class Template(object):
     """
@@ -103,6 +104,11 @@ class Template(object):
         # string which will be prefixed to definition
         self._prefix = ''
         self._static_tokens = []
+        # regular expressions used to quickly parse paths, if possible
+        self._path_regexes = []
+
+        # cache of the fields extracted from paths by get_fields
+        self._fields_cache = LRUCache(_get_fields_cache_size())
 
     def __repr__(self):
         class_name = self.__class__.__name__
@@ -360,6 +366,18 @@ class Template(object):
         # Remove empty strings
         return [x for x in tokens if x]
 
+    def _calc_path_regexes(self):
+        """
+        Compiles the regular expressions used to parse paths for each variation
+        of the definition, see :meth:`TemplatePathParser.compile_path_regex`.
+
+        :returns: List with a compiled regular expression or None for each variation.
+        """
+        return [
+            TemplatePathParser.compile_path_regex(ordered_keys, static_tokens)
+            for ordered_keys, static_tokens in zip(self._ordered_keys, self._static_tokens)
+        ]
+
     @property
     def parent(self):
         """
@@ -456,18 +474,43 @@ class Template(object):
         :returns: Values found in the path based on keys in template
         :rtype: Dictionary
         """
+        # paths are typically parsed over and over, so results are cached,
+        # including failures.
+        try:
+            cache_key = (
+                os.path.normpath(input_path),
+                skip_keys if isinstance(skip_keys, basestring) else tuple(skip_keys or [])
+            )
+            cached_result = self._fields_cache.get(cache_key)
+        except TypeError:
+            # unhashable skip keys, don't use the cache
+            cache_key = None
+            cached_result = LRUCache.MISSING
+
+        if cached_result is not LRUCache.MISSING:
+            fields, error = cached_result
+            if fields is None:
+                raise TankError(error)
+            return fields.copy()
+
         path_parser = None
         fields = None
 
-        for ordered_keys, static_tokens in zip(self._ordered_keys, self._static_tokens):
-            path_parser = TemplatePathParser(ordered_keys, static_tokens)
+        path_regexes = self._path_regexes or [None] * len(self._static_tokens)
+        for ordered_keys, static_tokens, path_regex in zip(self._ordered_keys, self._static_tokens, path_regexes):
+            path_parser = TemplatePathParser(ordered_keys, static_tokens, path_regex)
             fields = path_parser.parse_path(input_path, skip_keys)
             if fields != None:
                 break
 
         if fields is None:
-            raise TankError("Template %s: %s" % (str(self), path_parser.last_error))
+            error = "Template %s: %s" % (str(self), path_parser.last_error)
+            if cache_key is not None:
+                self._fields_cache.set(cache_key, (None, error))
+            raise TankError(error)
 
+        if cache_key is not None:
+            self._fields_cache.set(cache_key, (fields.copy(), None))
         return fields
 
 
@@ -505,6 +548,7 @@ class TemplatePath(Template):
         self._static_tokens = []
         for definition in self._definitions:
             self._static_tokens.append(self._calc_static_tokens(definition))
+        self._path_regexes = self._calc_path_regexes()
 
     @property
     def root_path(self):
@@ -612,6 +656,7 @@ class TemplateString(Template):
         self._static_tokens = []
         for definition in self._definitions:
             self._static_tokens.append(self._calc_static_tokens(definition))
+        self._path_regexes = self._calc_path_regexes()
     
     @property
     def parent(self):
@@ -642,6 +687,26 @@ class TemplateString(Template):
         adj_path = os.path.join(self._prefix, input_path)
         return super(TemplateString, self).get_fields(adj_path, skip_keys=skip_keys)
 
+def _get_fields_cache_size():
+    """
+    Returns the number of paths for which each template should cache
+    the extracted fields.
+
+    :returns: Cache size, which can be overridden with the
+              ``TK_TEMPLATE_FIELDS_CACHE_SIZE`` environment variable.
+    """
+    size = os.environ.get(constants.TEMPLATE_FIELDS_CACHE_SIZE_ENV_VAR)
+    if size is None:
+        return constants.DEFAULT_TEMPLATE_FIELDS_CACHE_SIZE
+    try:
+        return int(size)
+    except ValueError:
+        raise TankError(
+            "Invalid value '%s' for %s, expecting an integer." % (
+                size, constants.TEMPLATE_FIELDS_CACHE_SIZE_ENV_VAR
+            )
+        )
+
 def split_path(input_path):
     """
     Split a path into tokens.
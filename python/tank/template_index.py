@@ -0,0 +1,191 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Precompiled dispatch index used to quickly narrow down which templates
+may match a given path.
+
+Every template variation is parsed by the :class:`TemplatePathParser` using
+its static tokens. A path can only ever be parsed successfully by a variation if
+a number of cheap conditions hold, all of which mirror checks the parser itself
+performs:
+
+- Key values can never contain a path separator, so the path cannot contain
+  more separators than the static tokens of the variation do.
+- The parser either expects the path to start with the first static token,
+  or to start with a key value (which can't contain a separator) directly
+  followed by the first static token.
+- A variation without any keys only matches its single static token.
+- All static tokens must be found in the path, in order.
+
+The index groups variations by the directory part of their first static token
+so that a path lookup is a handful of dictionary hits (one per directory level
+of the path) rather than a full parse for every single template.
+"""
+
+import os
+
+from .template import TemplatePath
+
+
+class TemplateIndex(object):
+    """
+    Index of templates keyed on their leading static path tokens.
+
+    The index is built from a dictionary of templates, as returned by
+    :meth:`~tank.template.read_templates`, and is used to compute the
+    candidate templates that could possibly match a path. Candidates
+    still need to be validated against the path - the index only discards
+    templates which are guaranteed not to match.
+    """
+
+    class _Entry(object):
+        """
+        Container for the precomputed data of a single template variation.
+        """
+        def __init__(self, order, template, num_keys, static_tokens):
+            """
+            :param order: Position of the template in the templates dictionary.
+            :param template: :class:`Template` instance the variation belongs to.
+            :param num_keys: Number of keys in the variation.
+            :param static_tokens: Lower case static tokens of the variation.
+            """
+            self.order = order
+            self.template = template
+            self.num_keys = num_keys
+            self.static_tokens = static_tokens
+            self.first_token = static_tokens[0]
+            self.num_tokens = len(static_tokens)
+            self.max_separators = sum(token.count(os.path.sep) for token in static_tokens)
+
+        def _tokens_found(self, lower_path):
+            """
+            Checks that all static tokens can be found in the path, in order.
+            The parser gives up on the path if it is not the case.
+
+            :param lower_path: Normalized, lower case path.
+            :returns: True if all tokens were found.
+            """
+            position = 0
+            for token in self.static_tokens:
+                position = lower_path.find(token, position)
+                if position == -1:
+                    return False
+                position += len(token)
+            return True
+
+        def can_start_with_token(self, lower_path, num_separators):
+            """
+            Checks if the path can be parsed starting with the first static token.
+
+            :param lower_path: Normalized, lower case path.
+            :param num_separators: Number of path separators in the path.
+            :returns: True if the variation may match the path.
+            """
+            if num_separators > self.max_separators:
+                return False
+            if self.num_keys == 0:
+                return lower_path == self.first_token
+            return (
+                self.num_keys >= self.num_tokens - 1 and
+                lower_path.startswith(self.first_token) and
+                self._tokens_found(lower_path)
+            )
+
+        def can_start_with_key(self, lower_path, num_separators, first_separator):
+            """
+            Checks if the path can be parsed starting with a key value.
+
+            :param lower_path: Normalized, lower case path.
+            :param num_separators: Number of path separators in the path.
+            :param first_separator: Position of the first separator in the path
+                                    or the path length if there is none.
+            :returns: True if the variation may match the path.
+            """
+            if self.num_keys < self.num_tokens or num_separators > self.max_separators:
+                return False
+            # the leading key value can't contain a separator, so the first
+            # token must be found before (or at) the first separator.
+            if lower_path.find(self.first_token, 1, first_separator + len(self.first_token)) == -1:
+                return False
+            return self._tokens_found(lower_path)
+
+    def __init__(self, templates):
+        """
+        :param templates: Dictionary of templates, keyed by template name.
+        """
+        # keep a shallow copy so we can detect changes made to the
+        # templates dictionary after the index was built.
+        self._snapshot = dict(templates)
+
+        # entries keyed by the directory part of their first token
+        self._entries_by_dir = {}
+        # entries which may be parsed with a leading key value
+        self._floating_entries = []
+        # templates which we don't know how to index and
+        # always need to be validated
+        self._unindexed = []
+
+        for order, template in enumerate(templates.values()):
+            if not isinstance(template, TemplatePath):
+                self._unindexed.append((order, template))
+                continue
+
+            for ordered_keys, static_tokens in zip(template._ordered_keys, template._static_tokens):
+                if not static_tokens:
+                    self._unindexed.append((order, template))
+                    continue
+                entry = self._Entry(order, template, len(ordered_keys), static_tokens)
+                directory = entry.first_token.rsplit(os.path.sep, 1)[0] if os.path.sep in entry.first_token else ""
+                self._entries_by_dir.setdefault(directory, []).append(entry)
+                if entry.num_keys >= entry.num_tokens:
+                    self._floating_entries.append(entry)
+
+    def is_current(self, templates):
+        """
+        Checks if the index is up to date with the given templates.
+
+        :param templates: Dictionary of templates, keyed by template name.
+        :returns: True if the index was built from the same templates.
+        """
+        return self._snapshot == templates
+
+    def get_candidates(self, path):
+        """
+        Returns the templates which could match the given path, in the order
+        they appear in the templates dictionary the index was built from.
+
+        :param path: Path to match against the templates.
+        :returns: List of :class:`Template` instances.
+        """
+        lower_path = os.path.normpath(path).lower()
+        num_separators = lower_path.count(os.path.sep)
+        first_separator = lower_path.find(os.path.sep)
+        if first_separator == -1:
+            first_separator = len(lower_path)
+
+        candidates = dict(self._unindexed)
+
+        # each directory level of the path can be the directory
+        # part of the first token. Include the empty root.
+        position = 0
+        while position != -1:
+            for entry in self._entries_by_dir.get(lower_path[:position], []):
+                if entry.can_start_with_token(lower_path, num_separators):
+                    candidates[entry.order] = entry.template
+            position = lower_path.find(os.path.sep, position + 1)
+
+        for entry in self._floating_entries:
+            if entry.order not in candidates and entry.can_start_with_key(
+                lower_path, num_separators, first_separator
+            ):
+                candidates[entry.order] = entry.template
+
+        return [candidates[order] for order in sorted(candidates)]
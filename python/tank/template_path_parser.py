@@ -13,6 +13,7 @@ Parsing of template paths into values for specified keys using a list of static
 """
 
 import os
+import re
 from .errors import TankError
 
 class TemplatePathParser(object):
@@ -46,20 +47,62 @@ class TemplatePathParser(object):
             self.fully_resolved = fully_resolved
             self.last_error = last_error    
     
-    def __init__(self, ordered_keys, static_tokens):
+    def __init__(self, ordered_keys, static_tokens, path_regex=None):
         """
         Construction
                                 
         :param ordered_keys:    Template key objects in order that they appear in the
                                 template definition.
         :param static_tokens:   Pieces of the definition that don't represent Template Keys.
+        :param path_regex:      Optional regular expression returned by :meth:`compile_path_regex`
+                                for these keys and tokens, used to parse unambiguous paths
+                                without exploring all possible key values.
         """
         self.ordered_keys = ordered_keys
         self.static_tokens = static_tokens
+        self.path_regex = path_regex
         self.fields = {}
         self.input_path = None
         self.last_error = "Unable to parse path" 
 
+    @staticmethod
+    def compile_path_regex(ordered_keys, static_tokens):
+        """
+        Compiles an anchored regular expression matching paths made of the static
+        tokens with a key value between each of them, if the resulting match is
+        guaranteed to be the only possible way to resolve the keys.
+
+        This is the case when none of the keys can have a value containing the first
+        character of the token following it, e.g. a path separator or a ``.`` after
+        an :class:`IntegerKey`. Each key value then ends at the first occurrence of
+        that character and there is only one way to split the path.
+
+        :param ordered_keys:    Template key objects in order that they appear in the
+                                template definition.
+        :param static_tokens:   Pieces of the definition that don't represent Template Keys.
+
+        :returns:               A compiled regular expression with a group for each key,
+                                to match against lower case paths, or None if the keys
+                                can't be resolved unambiguously.
+        """
+        if not ordered_keys or len(static_tokens) not in (len(ordered_keys), len(ordered_keys) + 1):
+            return None
+
+        pattern = "^%s" % re.escape(static_tokens[0])
+        for index, key in enumerate(ordered_keys):
+            # characters which can't be part of the key value
+            excluded = [os.path.sep]
+            if index + 1 < len(static_tokens):
+                token = static_tokens[index + 1]
+                if token[0] != os.path.sep:
+                    if key._can_contain(token[0]):
+                        return None
+                    excluded.append(token[0])
+                pattern += "([^%s]+)%s" % ("".join(re.escape(c) for c in excluded), re.escape(token))
+            else:
+                pattern += "([^%s]+)" % re.escape(os.path.sep)
+        return re.compile(pattern + r"\Z")
+
     def parse_path(self, input_path, skip_keys):
         """
         Parses a path against the set of keys and static tokens to extract valid values
@@ -105,7 +148,14 @@ class TemplatePathParser(object):
                 # template with no keys - in this case not matching 
                 # the input path. Return for no match.
                 return None        
-            
+
+        if self.path_regex and not [key for key in self.ordered_keys if key.name in skip_keys]:
+            fields = self.__parse_path_fast(input_path, lower_path)
+            if fields is not None:
+                return fields
+            # fall back to the full parsing to report accurate errors
+            # or resolve paths the regular expression couldn't match.
+
         # find all occurances of all tokens in the path.  This will 
         # produce a list of lists, one list of positions for each token.
         #
@@ -237,6 +287,58 @@ class TemplatePathParser(object):
         # return the single unique set of fields:
         return fields
     
+    def __parse_path_fast(self, input_path, lower_path):
+        """
+        Parses a path using the precompiled regular expression. This will only
+        return fields if the full parsing is guaranteed to return the same ones.
+
+        :param input_path:  The normalized path to parse.
+        :param lower_path:  The lower case version of the path.
+
+        :returns:           A dictionary of fields mapping key names to their values
+                            or None if the path couldn't be resolved this way.
+        """
+        match = self.path_regex.match(lower_path)
+        if not match:
+            return None
+
+        first_token = self.static_tokens[0]
+        if len(self.ordered_keys) >= len(self.static_tokens):
+            # the path could also be resolved starting with a key value
+            # if the first token can be found before the first separator.
+            first_separator = lower_path.find(os.path.sep)
+            if first_separator == -1:
+                first_separator = len(lower_path)
+            if lower_path.find(first_token, 1, first_separator + len(first_token)) != -1:
+                return None
+
+        # make sure the token occurrences we matched would all be
+        # found when looking for them one after the other.
+        start_pos = 0
+        for index, token in enumerate(self.static_tokens):
+            token_pos = 0 if index == 0 else match.end(index)
+            position = lower_path.find(token, start_pos)
+            # the next token is searched from the first occurrence of this one
+            next_start_pos = position + len(token)
+            while 0 <= position < token_pos:
+                position = lower_path.find(token, position + len(token))
+            if position != token_pos:
+                return None
+            start_pos = next_start_pos
+
+        fields = {}
+        str_values = {}
+        for index, key in enumerate(self.ordered_keys):
+            value_str = input_path[match.start(index + 1):match.end(index + 1)]
+            if str_values.setdefault(key.name, value_str) != value_str:
+                # conflicting values for the same key
+                return None
+            try:
+                fields[key.name] = key.value_from_str(value_str)
+            except TankError:
+                return None
+        return fields
+
     def __find_possible_key_values_recursive(self, path, key_position, tokens, token_positions, 
                                              keys, skip_keys, key_values=None):
         """
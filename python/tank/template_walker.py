@@ -0,0 +1,354 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Template aware directory walker used to find files matching a template, and
+scanner collapsing the files found into sequences.
+"""
+
+import os
+import re
+import sys
+import fnmatch
+
+from .errors import TankError
+from . import constants
+
+# same check as the one used by the glob module.
+_MAGIC_CHECK = re.compile("[*?[]")
+
+
+def _has_magic(pattern):
+    """
+    :returns: True if the pattern contains glob wildcards.
+    """
+    return _MAGIC_CHECK.search(pattern) is not None
+
+
+class TemplatePathWalker(object):
+    """
+    Finds paths matching glob patterns built from a template, matching the
+    behaviour of :func:`glob.iglob`.
+
+    Unlike :func:`glob.iglob`, each directory is listed only once per walker, no
+    matter how many patterns are searched, and directory entries are discarded
+    as soon as a single key folder level holds a value which isn't valid for its
+    key, instead of descending into them.
+    """
+
+    def __init__(self):
+        # directory listings, keyed by directory path
+        self._listings = {}
+        # result of existence checks, keyed by path
+        self._exists = {}
+
+    def iter_paths(self, pattern, definition=None, keys=None):
+        """
+        Yields paths matching a glob pattern.
+
+        :param pattern: Glob pattern, typically the result of applying fields to
+                        a template with ``*`` for the missing ones.
+        :param definition: Optional template definition the pattern was built from. If
+                           set, directory levels holding a single key in the definition
+                           are validated against their key as the walker descends.
+        :param keys: Dictionary of :class:`TemplateKey` for the definition, keyed by name.
+        """
+        level_keys = {}
+        if definition and keys:
+            # the template definition uses os specific separators. We can only
+            # use it when its levels line up with the ones of the pattern.
+            components = definition.split(os.path.sep)
+            for level, component in enumerate(reversed(components)):
+                key = keys.get(component[1:-1]) if component.startswith("{") and component.endswith("}") else None
+                if key and component.count("{") == 1:
+                    level_keys[level] = key
+        return self._iglob(pattern, 0, level_keys)
+
+    def _iglob(self, pathname, level, level_keys):
+        """
+        Mirrors :func:`glob.iglob`, with cached listings and validation of
+        key values.
+
+        :param pathname: Pattern to search for.
+        :param level: Depth of the basename of the pathname, from the leaf level.
+        :param level_keys: Dictionary of :class:`TemplateKey` keyed by depth.
+        """
+        dirname, basename = os.path.split(pathname)
+        if not _has_magic(pathname):
+            if basename:
+                if self._lexists(pathname):
+                    yield pathname
+            elif os.path.isdir(dirname):
+                # patterns ending with a slash should match only directories
+                yield pathname
+            return
+
+        if not dirname:
+            for name in self._glob_in_dir(os.curdir, basename, level_keys.get(level)):
+                yield name
+            return
+
+        # os.path.split() returns the argument itself as a dirname if it is a
+        # drive or UNC path, prevent infinite recursions in that case.
+        if dirname != pathname and _has_magic(dirname):
+            dirs = self._iglob(dirname, level + 1, level_keys)
+        else:
+            dirs = [dirname]
+
+        for dirname in dirs:
+            if _has_magic(basename):
+                names = self._glob_in_dir(dirname, basename, level_keys.get(level))
+            elif (not basename and os.path.isdir(dirname)) or (
+                basename and self._lexists(os.path.join(dirname, basename))
+            ):
+                names = [basename]
+            else:
+                names = []
+            for name in names:
+                yield os.path.join(dirname, name)
+
+    def _glob_in_dir(self, dirname, pattern, key):
+        """
+        Lists entries matching a pattern in a directory.
+
+        :param dirname: Directory to list.
+        :param pattern: Pattern the entries need to match.
+        :param key: Optional :class:`TemplateKey` the entries must be valid values for.
+        :returns: List of entry names.
+        """
+        dirname = dirname or os.curdir
+        if isinstance(pattern, unicode) and not isinstance(dirname, unicode):
+            # same as glob, list unicode entries for unicode patterns
+            dirname = unicode(dirname, sys.getfilesystemencoding() or sys.getdefaultencoding())
+        names = self._list_dir(dirname)
+        if pattern[0] != ".":
+            names = [name for name in names if name[0] != "."]
+        names = fnmatch.filter(names, pattern)
+        if key is not None:
+            names = [name for name in names if self._is_valid_value(key, name)]
+        return names
+
+    def _list_dir(self, dirname):
+        """
+        Lists a directory, only accessing the file system the first time.
+
+        :param dirname: Directory to list.
+        :returns: List of entry names, empty if the directory can't be listed.
+        """
+        # unicode and str paths have different listings
+        cache_key = (type(dirname), dirname)
+        names = self._listings.get(cache_key)
+        if names is None:
+            try:
+                names = os.listdir(dirname)
+            except os.error:
+                names = []
+            self._listings[cache_key] = names
+        return names
+
+    def _lexists(self, path):
+        """
+        Checks if a path exists, only accessing the file system the first time.
+
+        :param path: Path to check.
+        :returns: True if the path exists.
+        """
+        exists = self._exists.get(path)
+        if exists is None:
+            exists = os.path.lexists(path)
+            self._exists[path] = exists
+        return exists
+
+    @staticmethod
+    def _is_valid_value(key, value):
+        """
+        :returns: True if the string is a valid value for the key.
+        """
+        try:
+            key.value_from_str(value)
+        except TankError:
+            return False
+        return True
+
+
+class TemplateSequenceScanner(object):
+    """
+    Groups paths matching a template into sequences, i.e. paths which only differ
+    by the values of their abstract keys, like frame numbers or stereo eyes.
+
+    Only a single path is parsed with the template for each sequence found in a
+    directory. The abstract key values of the other paths are extracted from their
+    name, without parsing the whole path.
+
+    This requires the abstract key values of the leaf level to be found in a single
+    way: each key from the first abstract key onward must be preceded by a static
+    token whose last character it can't contain, so the values can be resolved from
+    the end of the name. Paths are parsed one by one otherwise.
+    """
+
+    def __init__(self, template):
+        """
+        :param template: :class:`TemplatePath` the paths to scan match.
+        """
+        self._template = template
+        self._abstract_keys = dict(
+            (name, key) for name, key in template.keys.iteritems() if key.is_abstract
+        )
+        self._leaf_regex, self._leaf_keys = self._compile_leaf_regex()
+
+    def _compile_leaf_regex(self):
+        """
+        Compiles a regular expression extracting the abstract key values from
+        the leaf level of paths.
+
+        :returns: Tuple with the compiled regular expression, to match against
+                  lower case names, and the list of key names for each of its
+                  groups, None for keys which aren't abstract. (None, None) if
+                  the key values can't be found unambiguously.
+        """
+        definitions = self._template._definitions
+        # optional keys in the leaf level would give a different regular
+        # expression for each variation, and names could match several of them.
+        leaves = set(definition.split(os.path.sep)[-1] for definition in definitions)
+        if len(leaves) != 1:
+            return None, None
+
+        # token, key name, token, key name, ..., token
+        pieces = re.split(r"{(%s)}" % constants.TEMPLATE_KEY_NAME_REGEX, leaves.pop())
+        abstract_indices = [
+            index for index in range(1, len(pieces), 2) if pieces[index] in self._abstract_keys
+        ]
+        if not abstract_indices:
+            return None, None
+
+        for index in abstract_indices:
+            # the values of keys used more than once need to be checked against
+            # each other, which we can only do by parsing the whole path.
+            if definitions[0].count("{%s}" % pieces[index]) != 1:
+                return None, None
+
+        first_index = abstract_indices[0]
+        # whatever is before the first abstract key is kept as it is
+        keys_before = first_index > 1
+        pattern = "^(?:.*)" if keys_before else "^"
+        group_keys = []
+        keys = self._template.keys
+        for index in range(first_index - 1, len(pieces)):
+            piece = pieces[index]
+            if index % 2 == 0:
+                pattern += re.escape(piece.lower())
+                continue
+            key = keys[piece]
+            previous_token = pieces[index - 1].lower()
+            if index == first_index and not keys_before:
+                # the start of the value is fixed.
+                pattern += "(.+)"
+            elif not previous_token or key._can_contain(previous_token[-1]):
+                return None, None
+            else:
+                pattern += "([^%s]+)" % re.escape(previous_token[-1])
+            group_keys.append(piece if key.is_abstract else None)
+
+        return re.compile(pattern + r"\Z", re.DOTALL), group_keys
+
+    def _split_name(self, path):
+        """
+        Extracts the abstract key values from the leaf level of a path.
+
+        :param path: Path to split.
+        :returns: Tuple with the path with the abstract key values masked out and
+                  a dictionary of abstract key values, keyed by key name. None if
+                  the path needs to be parsed on its own.
+        """
+        dirname, name = os.path.split(path)
+        lower_name = name.lower()
+        if len(lower_name) != len(name):
+            return None
+        match = self._leaf_regex.match(lower_name)
+        if match is None:
+            return None
+
+        values = {}
+        masked = []
+        position = 0
+        for group, key_name in enumerate(self._leaf_keys, 1):
+            if key_name is None:
+                continue
+            start, end = match.span(group)
+            try:
+                values[key_name] = self._abstract_keys[key_name].value_from_str(name[start:end])
+            except TankError:
+                return None
+            masked.append(name[position:start])
+            position = end
+        masked.append(name[position:])
+        # abstract values are replaced with a character which can't be in a name
+        return (dirname, "\0".join(masked)), values
+
+    def iter_sequences(self, paths):
+        """
+        Groups paths into sequences.
+
+        Paths which are not valid for the template are discarded.
+
+        :param paths: Paths matching the template, typically found on disk.
+        :returns: Generator yielding a tuple for each sequence, with the dictionary
+                  of fields of one of the paths of the sequence, and a dictionary with
+                  the list of values found for each abstract key, keyed by key name.
+        """
+        sequences = {}
+        # keep the order in which sequences are found
+        sequence_keys = []
+        for path in paths:
+            split = self._split_name(path) if self._leaf_regex else None
+            if split is None:
+                fields = self._template.validate_and_get_fields(path)
+                if fields is not None:
+                    yield fields, dict(
+                        (name, [value]) for name, value in fields.iteritems() if name in self._abstract_keys
+                    )
+                continue
+            sequence_key, values = split
+            if sequence_key not in sequences:
+                sequences[sequence_key] = []
+                sequence_keys.append(sequence_key)
+            sequences[sequence_key].append((path, values))
+
+        for sequence_key in sequence_keys:
+            fields = None
+            found_values = {}
+            for path, values in sequences[sequence_key]:
+                if fields is None:
+                    # paths of a sequence only differ by valid abstract key values,
+                    # they are all parsed the same way.
+                    fields = self._template.validate_and_get_fields(path)
+                    if fields is None:
+                        continue
+                for name, value in values.iteritems():
+                    found_values.setdefault(name, []).append(value)
+            if fields is not None:
+                yield fields, found_values
+
+    @staticmethod
+    def get_frame_ranges(frames):
+        """
+        Computes contiguous frame ranges.
+
+        :param frames: Frame numbers, in any order. Values which are not integers,
+                       e.g. frame specs, are ignored.
+        :returns: Sorted list of (first frame, last frame) tuples.
+        """
+        ranges = []
+        for frame in sorted(set(f for f in frames if isinstance(f, (int, long)))):
+            if ranges and ranges[-1][1] == frame - 1:
+                ranges[-1] = (ranges[-1][0], frame)
+            else:
+                ranges.append((frame, frame))
+        return ranges
@@ -276,6 +276,30 @@ class TemplateKey(object):
     def _as_value(self, str_value):
         return str_value
 
+    def _can_contain(self, char):
+        """
+        Checks if a valid string value for this key can contain the given character.
+
+        This is used by the template path parser to find out if a key value can
+        be delimited unambiguously by the static token following it. Derived classes
+        can override this method when they know some characters are never valid.
+
+        :param char: Single lower case character. The check is done case insensitively.
+        :returns: False if no valid value can contain the character, True otherwise.
+        """
+        return True
+
+    def _choices_can_contain(self, char):
+        """
+        Checks if any of the choices for this key contains the given character.
+
+        :param char: Single lower case character. The check is done case insensitively.
+        :returns: True if the key has no choices or if a choice contains the character.
+        """
+        if not self.choices:
+            return True
+        return any(char in str(choice).lower() for choice in self.choices)
+
     def __repr__(self):
         return "<Sgtk %s %s>" % (self.__class__.__name__, self.name)
 
@@ -513,6 +537,23 @@ class StringKey(TemplateKey):
 
         return str_value
 
+    def _can_contain(self, char):
+        """
+        Checks if a valid string value for this key can contain the given character.
+
+        :param char: Single lower case character. The check is done case insensitively.
+        :returns: False if no valid value can contain the character, True otherwise.
+        """
+        if self._filter_regex_u:
+            try:
+                u_char = char if isinstance(char, unicode) else char.decode("utf-8")
+            except UnicodeDecodeError:
+                # part of a multi-byte character, we can't tell.
+                return True
+            if self._filter_regex_u.search(u_char):
+                return False
+        return self._choices_can_contain(char)
+
     def __validate(self, value, validate_transforms):
         """
         Test if a value is valid for this key.
@@ -947,6 +988,18 @@ class IntegerKey(TemplateKey):
         """
         return int(str_value)
 
+    def _can_contain(self, char):
+        """
+        Checks if a valid string value for this key can contain the given character.
+
+        :param char: Single lower case character. The check is done case insensitively.
+        :returns: False if no valid value can contain the character, True otherwise.
+        """
+        # only digits and padding are allowed in integer strings
+        if not (char.isdigit() or char.isspace()):
+            return False
+        return self._choices_can_contain(char)
+
 
 class SequenceKey(IntegerKey):
     """
@@ -1103,6 +1156,22 @@ class SequenceKey(IntegerKey):
         # resolve it via the integerKey base class
         return super(SequenceKey, self)._as_value(str_value)
 
+    def _can_contain(self, char):
+        """
+        Checks if a valid string value for this key can contain the given character.
+
+        :param char: Single lower case character. The check is done case insensitively.
+        :returns: False if no valid value can contain the character, True otherwise.
+        """
+        if char.isdigit() or char.isspace():
+            return True
+        # frame specs, format strings and flame patterns are the
+        # only non numeric values allowed.
+        special_strings = (
+            self._frame_specs + self.VALID_FORMAT_STRINGS + [self.FRAMESPEC_FORMAT_INDICATOR, "[-]"]
+        )
+        return any(char in special_string.lower() for special_string in special_strings)
+
     def _extract_format_string(self, value):
         """
         Returns XYZ given the string "FORMAT:    XYZ"
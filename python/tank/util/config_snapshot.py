@@ -0,0 +1,318 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Snapshot of the parsed yaml files of a configuration, written by the
+``tank cache_yaml`` command and used to populate the yaml cache without
+parsing the files.
+"""
+
+from __future__ import with_statement
+
+import os
+import mmap
+import fnmatch
+import struct
+import hashlib
+import threading
+import cPickle as pickle
+
+from ..errors import TankError
+from .. import LogManager
+
+log = LogManager.get_logger(__name__)
+
+
+class ConfigSnapshot(object):
+    """
+    Read access to a configuration snapshot file.
+
+    A snapshot holds the data of each yaml file of a configuration in its own
+    section, serialized with the highest pickle protocol. It is laid out as::
+
+        header:   magic, format version, manifest length, manifest sha1
+        manifest: pickled dictionary with the entries of the files keyed by
+                  path relative to the configuration root, with the modification
+                  time and size of the file, and the offset, length and sha1 of
+                  its section. It also lists the hooks found in the core hooks
+                  folder, along with the modification time of the folder.
+        sections
+
+    Only the header and the manifest are read when a snapshot is opened. The
+    manifest is validated with a single hash check, and the file is memory
+    mapped so that sections are only read and decoded when a file is requested.
+    A section is only used if the file on disk still has the same modification
+    time and size, and its content hash matches the manifest.
+
+    :meth:`validate` checks all the files of the snapshot on disk at once, so
+    that the files found unchanged don't need to be checked again each time
+    they are requested.
+    """
+
+    MAGIC = "SGTKSNAP"
+
+    # version of the file layout, snapshots with a different version are ignored.
+    FORMAT_VERSION = 2
+
+    # magic, format version, manifest length, manifest sha1
+    _HEADER = struct.Struct("<8sIQ20s")
+
+    def __init__(self, path, root):
+        """
+        Opens a snapshot.
+
+        :param str path: Path to the snapshot file.
+        :param str root: Root folder of the configuration the snapshot was written for.
+        :raises: :class:`TankError` if the file is not a valid snapshot.
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, "rb") as fh:
+                header = fh.read(self._HEADER.size)
+                if len(header) != self._HEADER.size:
+                    raise TankError("Truncated header.")
+                magic, version, manifest_length, manifest_digest = self._HEADER.unpack(header)
+                if magic != self.MAGIC:
+                    raise TankError("Not a configuration snapshot.")
+                if version != self.FORMAT_VERSION:
+                    raise TankError("Unsupported snapshot format version %s." % version)
+                manifest_data = fh.read(manifest_length)
+                if hashlib.sha1(manifest_data).digest() != manifest_digest:
+                    raise TankError("Corrupted manifest.")
+                manifest = pickle.loads(manifest_data)
+                self._sections_offset = self._HEADER.size + manifest_length
+                if os.fstat(fh.fileno()).st_size > self._sections_offset:
+                    self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    # empty files can't be mapped.
+                    self._mmap = None
+        except TankError as e:
+            raise TankError("Invalid configuration snapshot %s: %s" % (path, e))
+        except Exception as e:
+            raise TankError("Could not read configuration snapshot %s: %s" % (path, e))
+
+        # entries keyed by normalized path
+        self._entries = dict(
+            (_get_path(root, relative_path), entry)
+            for relative_path, entry in manifest["files"].iteritems()
+        )
+        self._decoded = 0
+        # os.stat results of the files found unchanged by validate(), keyed by path
+        self._validated = {}
+
+        if manifest["hooks_folder"] is None:
+            self._hooks_folder = None
+            self._hook_paths = None
+        else:
+            self._hooks_folder = _get_path(root, manifest["hooks_folder"])
+            self._hook_paths = frozenset(
+                os.path.join(self._hooks_folder, file_name) for file_name in manifest["hooks"]
+            )
+        self._hooks_folder_mtime = manifest["hooks_folder_mtime"]
+        self._hooks_validated = False
+
+    @property
+    def path(self):
+        """
+        Path to the snapshot file.
+        """
+        return self._path
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_data(self, path, stat):
+        """
+        Decodes the data of a file from the snapshot.
+
+        :param str path: Normalized path to the yaml file.
+        :param stat: Current ``os.stat`` result of the file.
+        :returns: Tuple with a boolean set to True if the snapshot holds up to
+                  date data for the file, and the data.
+        """
+        entry = self._entries.get(path)
+        if entry is None or self._mmap is None:
+            return False, None
+        mtime, size, offset, length, digest = entry
+        if stat.st_mtime != mtime or stat.st_size != size:
+            return False, None
+
+        start = self._sections_offset + offset
+        with self._lock:
+            section = self._mmap[start:start + length]
+        if len(section) != length or hashlib.sha1(section).digest() != digest:
+            log.warning("Ignoring corrupted section for %s in %s." % (path, self._path))
+            return False, None
+        self._decoded += 1
+        return True, pickle.loads(section)
+
+    def validate(self):
+        """
+        Checks which files of the snapshot are unchanged on disk, and whether
+        hooks were added to or removed from the core hooks folder, replacing
+        the results of previous calls.
+
+        :returns: Number of files found unchanged.
+        """
+        validated = {}
+        for path, entry in self._entries.iteritems():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if stat.st_mtime == entry[0] and stat.st_size == entry[1]:
+                validated[path] = stat
+
+        hooks_validated = False
+        if self._hooks_folder is not None:
+            hooks_validated = _get_mtime(self._hooks_folder) == self._hooks_folder_mtime
+
+        with self._lock:
+            self._validated = validated
+            self._hooks_validated = hooks_validated
+        return len(validated)
+
+    def get_validated_stat(self, path):
+        """
+        :param str path: Normalized path to the yaml file.
+        :returns: The ``os.stat`` result of the file if :meth:`validate` found
+                  it unchanged, None otherwise.
+        """
+        return self._validated.get(path)
+
+    def invalidate(self, path):
+        """
+        Stops trusting the result of :meth:`validate` for the given file, which
+        is checked on disk again when its data is requested.
+
+        :param str path: Normalized path to the yaml file.
+        """
+        with self._lock:
+            self._validated.pop(path, None)
+
+    def get_hook_paths(self):
+        """
+        :returns: Set of paths of the hooks found in the core hooks folder when the
+                  snapshot was written, or None if the snapshot doesn't list them
+                  or if :meth:`validate` found that the folder changed since.
+        """
+        if not self._hooks_validated:
+            return None
+        return self._hook_paths
+
+    def get_stats(self):
+        """
+        :returns: Dictionary with the number of ``entries`` in the snapshot and the
+                  number of sections ``decoded`` so far.
+        """
+        return {"entries": len(self._entries), "decoded": self._decoded}
+
+    def close(self):
+        """
+        Unmaps the snapshot file.
+        """
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+
+    @classmethod
+    def write(cls, path, root, cache_items, hooks_folder=None):
+        """
+        Writes a snapshot.
+
+        The file is written next to its final location and then renamed, so
+        processes reading the previous snapshot are not affected.
+
+        :param str path: Path to the snapshot file.
+        :param str root: Root folder of the configuration.
+        :param cache_items: :class:`~tank.util.yaml_cache.CacheItem` instances to
+                            write. Items for files outside of the root are skipped.
+        :param str hooks_folder: Core hooks folder of the configuration, whose
+                                 hooks are listed in the snapshot. Not listed if
+                                 None or outside of the root.
+        :returns: Number of files written to the snapshot.
+        """
+        root = os.path.normpath(root)
+        files = {}
+        sections = []
+        offset = 0
+        for item in cache_items:
+            relative_path = os.path.relpath(item.path, root)
+            if relative_path.startswith(os.pardir):
+                continue
+            section = pickle.dumps(item.data, pickle.HIGHEST_PROTOCOL)
+            files[relative_path.replace(os.path.sep, "/")] = (
+                item.stat.st_mtime,
+                item.stat.st_size,
+                offset,
+                len(section),
+                hashlib.sha1(section).digest()
+            )
+            sections.append(section)
+            offset += len(section)
+
+        manifest = {
+            "files": files,
+            "hooks_folder": None,
+            "hooks_folder_mtime": None,
+            "hooks": [],
+        }
+        if hooks_folder is not None:
+            relative_path = os.path.relpath(hooks_folder, root)
+            if not relative_path.startswith(os.pardir):
+                manifest["hooks_folder"] = relative_path.replace(os.path.sep, "/")
+                # the modification time is read first, so hooks added while the
+                # folder is listed invalidate the list.
+                manifest["hooks_folder_mtime"] = _get_mtime(hooks_folder)
+                if manifest["hooks_folder_mtime"] is not None:
+                    manifest["hooks"] = fnmatch.filter(os.listdir(hooks_folder), "*.py")
+
+        manifest_data = pickle.dumps(manifest, pickle.HIGHEST_PROTOCOL)
+        header = cls._HEADER.pack(
+            cls.MAGIC, cls.FORMAT_VERSION, len(manifest_data), hashlib.sha1(manifest_data).digest()
+        )
+
+        temp_path = "%s.%d.tmp" % (path, os.getpid())
+        try:
+            with open(temp_path, "wb") as fh:
+                fh.write(header)
+                fh.write(manifest_data)
+                for section in sections:
+                    fh.write(section)
+            if os.path.exists(path):
+                # rename doesn't replace existing files on Windows
+                os.remove(path)
+            os.rename(temp_path, path)
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise TankError("Unable to write configuration snapshot %s: %s" % (path, e))
+
+        return len(files)
+
+
+def _get_path(root, relative_path):
+    """
+    :returns: The normalized path of a path relative to the configuration root
+              stored in a snapshot.
+    """
+    return os.path.normpath(os.path.join(root, *relative_path.split("/")))
+
+
+def _get_mtime(path):
+    """
+    :returns: The modification time of the given path, or None if it doesn't exist.
+    """
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
@@ -0,0 +1,165 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Read only dictionaries and lists, used to share parsed data, e.g. the content
+of yaml files, without copying it for every consumer.
+"""
+
+import copy
+
+
+def _read_only(self, *args, **kwargs):
+    """
+    Replaces the methods modifying frozen containers.
+    """
+    raise TypeError(
+        "'%s' object is read only, use thaw() to get a modifiable copy." % type(self).__name__
+    )
+
+
+class FrozenDict(dict):
+    """
+    Read only dictionary.
+
+    It is a :class:`dict`, so it can be used anywhere a dictionary is read, but all
+    the methods modifying it raise a ``TypeError``. :meth:`thaw` or ``copy.deepcopy``
+    return a modifiable deep copy made of regular dictionaries and lists.
+    """
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    clear = _read_only
+    pop = _read_only
+    popitem = _read_only
+    setdefault = _read_only
+    update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        result = {}
+        memo[id(self)] = result
+        for key, value in self.iteritems():
+            result[copy.deepcopy(key, memo)] = copy.deepcopy(value, memo)
+        return result
+
+    def __reduce__(self):
+        # the default implementation restores the items with __setitem__
+        return (FrozenDict, (dict(self),))
+
+    def __repr__(self):
+        return "FrozenDict(%s)" % dict.__repr__(self)
+
+    def thaw(self):
+        """
+        :returns: A modifiable deep copy of the dictionary.
+        """
+        return copy.deepcopy(self)
+
+
+class FrozenList(list):
+    """
+    Read only list.
+
+    It is a :class:`list`, so it can be used anywhere a list is read, but all
+    the methods modifying it raise a ``TypeError``. :meth:`thaw` or ``copy.deepcopy``
+    return a modifiable deep copy made of regular dictionaries and lists.
+    """
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __setslice__ = _read_only
+    __delslice__ = _read_only
+    __iadd__ = _read_only
+    __imul__ = _read_only
+    append = _read_only
+    extend = _read_only
+    insert = _read_only
+    pop = _read_only
+    remove = _read_only
+    reverse = _read_only
+    sort = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        result = []
+        memo[id(self)] = result
+        for value in self:
+            result.append(copy.deepcopy(value, memo))
+        return result
+
+    def __reduce__(self):
+        # the default implementation restores the items with extend
+        return (FrozenList, (list(self),))
+
+    def __repr__(self):
+        return "FrozenList(%s)" % list.__repr__(self)
+
+    def thaw(self):
+        """
+        :returns: A modifiable deep copy of the list.
+        """
+        return copy.deepcopy(self)
+
+
+def freeze(data):
+    """
+    Returns a read only version of some data.
+
+    Dictionaries and lists are recursively converted to :class:`FrozenDict` and
+    :class:`FrozenList`. Containers shared by several parts of the data, e.g. yaml
+    aliases, are only converted once and remain shared. Data which is already
+    frozen is returned as is.
+
+    :param data: Data to freeze, typically loaded from a yaml file.
+    :returns: The frozen data.
+    """
+    return _freeze(data, {})
+
+
+def _freeze(data, memo):
+    """
+    Recursive implementation of :func:`freeze`.
+
+    :param data: Data to freeze.
+    :param dict memo: Frozen containers keyed by the id of their source.
+    """
+    if isinstance(data, (FrozenDict, FrozenList)):
+        return data
+    if isinstance(data, dict):
+        frozen = memo.get(id(data))
+        if frozen is None:
+            frozen = FrozenDict(
+                (key, _freeze(value, memo)) for key, value in data.iteritems()
+            )
+            memo[id(data)] = frozen
+        return frozen
+    if isinstance(data, list):
+        frozen = memo.get(id(data))
+        if frozen is None:
+            frozen = FrozenList(_freeze(value, memo) for value in data)
+            memo[id(data)] = frozen
+        return frozen
+    return data
+
+
+def thaw(data):
+    """
+    Returns a modifiable deep copy of some data, converting frozen containers
+    back to regular dictionaries and lists.
+
+    :param data: Data to copy, frozen or not.
+    :returns: The modifiable copy.
+    """
+    return copy.deepcopy(data)
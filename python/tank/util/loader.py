@@ -13,16 +13,26 @@ Methods for loading and managing plugins, e.g. Apps, Engines, Hooks etc.
 
 """
 
+import os
 import sys
 import imp
+import types
+import marshal
+import hashlib
+import tempfile
 import traceback
 import inspect
 
 from ..errors import TankError
 from .. import LogManager
+from . import filesystem
+from .local_file_storage import LocalFileStorageManager
 
 log = LogManager.get_logger(__name__)
 
+# number of plugin files compiled and loaded from the bytecode cache
+_bytecode_cache_stats = {"compiled": 0, "cached": 0}
+
 class TankLoadPluginError(TankError):
     """
     Errors related to git communication
@@ -51,8 +61,13 @@ def load_plugin(plugin_file, valid_base_class, alternate_base_classes=None):
     module_uid = uuid.uuid4().hex
     module = None
     try:
+        # compiling doesn't need the import lock, only running the module code does.
+        code = _get_plugin_code(plugin_file)
         imp.acquire_lock()
-        module = imp.load_source(module_uid, plugin_file)
+        try:
+            module = _load_plugin_module(module_uid, plugin_file, code)
+        finally:
+            imp.release_lock()
     except Exception:
         # log the full callstack to make sure that whatever the
         # calling code is doing, this error is logged to help
@@ -67,8 +82,6 @@ def load_plugin(plugin_file, valid_base_class, alternate_base_classes=None):
         message += "Traceback (most recent call last):\n"
         message += "\n".join( traceback.format_tb(exc_traceback))
         raise TankLoadPluginError(message)
-    finally:
-        imp.release_lock()
 
     # cool, now validate the module
     found_classes = list()
@@ -123,3 +136,103 @@ def load_plugin(plugin_file, valid_base_class, alternate_base_classes=None):
 
     # return the class that was found.
     return found_classes[0]
+
+def get_bytecode_cache_stats():
+    """
+    Returns the number of plugin files which were compiled, and the number of
+    them which were loaded from the bytecode cache, since the start of the
+    session.
+
+    :returns: Dictionary with ``compiled`` and ``cached`` counts.
+    """
+    return dict(_bytecode_cache_stats)
+
+def _get_bytecode_cache_path(plugin_file, stat):
+    """
+    Returns the path of the cached bytecode of a plugin file. The path changes
+    with the modification time and size of the file and with the version of
+    python, so outdated bytecode is never used.
+
+    :param plugin_file: Path to the plugin file.
+    :param stat:        ``os.stat`` result of the plugin file.
+    :returns:           Path to the cached bytecode.
+    """
+    key = repr((
+        os.path.abspath(plugin_file), stat.st_mtime, stat.st_size, sys.version, imp.get_magic()
+    ))
+    return os.path.join(
+        LocalFileStorageManager.get_global_root(LocalFileStorageManager.CACHE),
+        "plugin_bytecode",
+        "%s.pyc" % hashlib.sha1(key.encode("utf-8")).hexdigest()
+    )
+
+def _get_plugin_code(plugin_file):
+    """
+    Returns the code object of a plugin file, loaded from the bytecode cache
+    if the file was compiled before, or compiled and added to the cache.
+
+    The bytecode cache is local to the user, so plugins stored on slow network
+    storage are only read and compiled once, and even if python can't write
+    ``.pyc`` files next to them.
+
+    :param plugin_file: Path to the plugin file.
+    :returns:           Code object.
+    """
+    stat = os.stat(plugin_file)
+    cache_path = _get_bytecode_cache_path(plugin_file, stat)
+    try:
+        with open(cache_path, "rb") as fh:
+            code = marshal.load(fh)
+        if isinstance(code, types.CodeType):
+            _bytecode_cache_stats["cached"] += 1
+            return code
+    except (IOError, OSError):
+        # not cached yet
+        pass
+    except Exception as e:
+        log.debug("Ignoring invalid bytecode cache %s: %s" % (cache_path, e))
+
+    with open(plugin_file, "rb") as fh:
+        source = fh.read()
+    code = compile(source, plugin_file, "exec", 0, True)
+    _bytecode_cache_stats["compiled"] += 1
+
+    # write the bytecode to a unique file next to its final location and then
+    # rename it, so other processes and threads never read partially written files.
+    temp_path = None
+    try:
+        filesystem.ensure_folder_exists(os.path.dirname(cache_path))
+        (fd, temp_path) = tempfile.mkstemp(
+            prefix="%s." % os.path.basename(cache_path),
+            suffix=".tmp",
+            dir=os.path.dirname(cache_path)
+        )
+        with os.fdopen(fd, "wb") as fh:
+            marshal.dump(code, fh)
+        os.rename(temp_path, cache_path)
+    except Exception as e:
+        # the plugin can still be loaded, it will just be compiled again next time.
+        log.debug("Unable to cache bytecode of %s in %s: %s" % (plugin_file, cache_path, e))
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return code
+
+def _load_plugin_module(module_name, plugin_file, code):
+    """
+    Runs the code of a plugin file in a new module, like ``imp.load_source`` does.
+
+    :param module_name: Name of the module.
+    :param plugin_file: Path to the plugin file.
+    :param code:        Code object of the plugin file.
+    :returns:           The module.
+    """
+    module = imp.new_module(module_name)
+    module.__file__ = plugin_file
+    sys.modules[module_name] = module
+    try:
+        exec(code, module.__dict__)
+    except Exception:
+        del sys.modules[module_name]
+        raise
+    return module
@@ -0,0 +1,162 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Bounded, thread-safe least recently used cache.
+"""
+
+from __future__ import with_statement
+import threading
+
+
+class LRUCache(object):
+    """
+    Thread-safe dictionary-like cache holding at most a given number of items.
+    When the cache is full, the least recently used item is discarded.
+
+    Hits and misses are counted so the efficiency of the cache can be
+    reported for diagnostics.
+    """
+
+    # sentinel returned by get when an item is not in the cache.
+    MISSING = object()
+
+    # indices in the linked list nodes
+    _PREV, _NEXT, _KEY, _VALUE = range(4)
+
+    def __init__(self, max_size):
+        """
+        :param int max_size: Maximum number of items in the cache. If 0, nothing
+                             will be cached.
+        """
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._init_items()
+
+    def _init_items(self):
+        """
+        Resets the items stored in the cache.
+        """
+        # items are stored in a circular doubly linked list, from least recently
+        # used to most recently used, so they can be moved and evicted in
+        # constant time. The root node is never removed.
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None]
+        self._nodes = {}
+
+    @property
+    def max_size(self):
+        """
+        Maximum number of items held in the cache.
+        """
+        return self._max_size
+
+    @property
+    def hits(self):
+        """
+        Number of times an item was found in the cache.
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        Number of times an item was not found in the cache.
+        """
+        return self._misses
+
+    def __len__(self):
+        """
+        :returns: Number of items in the cache.
+        """
+        return len(self._nodes)
+
+    def get(self, key):
+        """
+        Retrieves an item from the cache and marks it as the most recently used.
+
+        :param key: Key of the item.
+        :returns: The cached value or :attr:`LRUCache.MISSING` if not found.
+        """
+        with self._lock:
+            node = self._nodes.get(key)
+            if node is None:
+                self._misses += 1
+                return self.MISSING
+            self._hits += 1
+            self._unlink(node)
+            self._append(node)
+            return node[self._VALUE]
+
+    def set(self, key, value):
+        """
+        Adds or updates an item in the cache, evicting the least recently used
+        item if the cache is full.
+
+        :param key: Key of the item.
+        :param value: Value to cache.
+        """
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            node = self._nodes.get(key)
+            if node is not None:
+                self._unlink(node)
+                node[self._VALUE] = value
+            else:
+                if len(self._nodes) >= self._max_size:
+                    oldest = self._root[self._NEXT]
+                    self._unlink(oldest)
+                    del self._nodes[oldest[self._KEY]]
+                node = [None, None, key, value]
+                self._nodes[key] = node
+            self._append(node)
+
+    def clear(self):
+        """
+        Removes all items from the cache and resets the statistics.
+        """
+        with self._lock:
+            self._init_items()
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self):
+        """
+        Returns statistics about the cache usage.
+
+        :returns: Dictionary with keys ``hits``, ``misses``, ``size`` and ``max_size``.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._nodes),
+                "max_size": self._max_size,
+            }
+
+    def _unlink(self, node):
+        """
+        Removes a node from the linked list.
+        """
+        node[self._PREV][self._NEXT] = node[self._NEXT]
+        node[self._NEXT][self._PREV] = node[self._PREV]
+
+    def _append(self, node):
+        """
+        Inserts a node as the most recently used one in the linked list.
+        """
+        last = self._root[self._PREV]
+        node[self._PREV] = last
+        node[self._NEXT] = self._root
+        last[self._NEXT] = node
+        self._root[self._PREV] = node
@@ -0,0 +1,202 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Pool of sqlite connections shared by a process.
+"""
+
+from __future__ import with_statement
+import os
+import time
+import sqlite3
+import threading
+
+
+class SqliteConnectionPool(object):
+    """
+    Thread-aware pool of sqlite connections, keyed by database file.
+
+    sqlite connections can only be used by the thread which created them, so
+    idle connections are kept per thread. An idle connection is reused as long
+    as the database file is the same as when the connection was last used: same
+    device, inode, modification time and size. Connections are never reused once
+    the file was modified, e.g. by another process, or replaced.
+
+    The database can be prepared, e.g. to check its schema, the first time a
+    connection to a given file (device and inode) is opened in the process.
+    Empty files are always prepared.
+
+    Time spent opening connections and preparing databases is accumulated so it
+    can be reported for diagnostics.
+    """
+
+    # maximum number of idle connections kept per thread and database
+    MAX_IDLE_CONNECTIONS = 2
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # idle connections of each thread, keyed by database path
+        self._local = threading.local()
+        # (path, file identity) tuples of the databases already prepared
+        self._prepared = set()
+        self._init_stats()
+
+    def _init_stats(self):
+        """
+        Resets the usage statistics.
+        """
+        self._stats = {
+            "opened": 0,
+            "reused": 0,
+            "discarded": 0,
+            "prepared": 0,
+            "open_time": 0.0,
+            "prepare_time": 0.0,
+        }
+
+    def _idle_connections(self, path):
+        """
+        :returns: The list of (file identity, connection) tuples idle in the
+                  current thread for a database path.
+        """
+        idle = getattr(self._local, "idle", None)
+        if idle is None:
+            idle = self._local.idle = {}
+        return idle.setdefault(path, [])
+
+    def _connection_identities(self):
+        """
+        :returns: Dictionary with the file identity of the connections in use in
+                  the current thread, keyed by connection id.
+        """
+        identities = getattr(self._local, "identities", None)
+        if identities is None:
+            identities = self._local.identities = {}
+        return identities
+
+    def _count(self, stat, value=1):
+        """
+        Increments a statistic.
+        """
+        with self._lock:
+            self._stats[stat] += value
+
+    def acquire(self, path, prepare=None, configure=None):
+        """
+        Returns a connection to a database, reusing an idle one from the current
+        thread if the database file hasn't changed since it was last used.
+
+        :param str path: Path to the database file.
+        :param prepare: Optional callable, called with a new connection the first
+                        time the file is opened in the process.
+        :param configure: Optional callable, called with every new connection before
+                          it is prepared, e.g. to set connection level pragmas.
+        :returns: A :class:`sqlite3.Connection`, to give back with :meth:`release`.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        # the connection can be reused until the file is modified, replaced by
+        # another one, or deleted. The schema can only change when the file is
+        # modified and only needs to be checked again if the file is replaced.
+        identity = (stat.st_dev, stat.st_ino, stat.st_mtime, stat.st_size) if stat else None
+        prepared_key = (path, stat.st_dev, stat.st_ino) if stat and stat.st_size else None
+
+        idle = self._idle_connections(path)
+        while idle:
+            connection_identity, connection = idle.pop()
+            if identity is not None and connection_identity == identity:
+                self._count("reused")
+                self._connection_identities()[id(connection)] = identity
+                return connection
+            # the file changed on disk
+            connection.close()
+            self._count("discarded")
+
+        start = time.time()
+        connection = sqlite3.connect(path)
+        try:
+            if configure:
+                configure(connection)
+        except:
+            connection.close()
+            raise
+        self._count("open_time", time.time() - start)
+        self._count("opened")
+
+        with self._lock:
+            needs_prepare = prepared_key is None or prepared_key not in self._prepared
+        if prepare and needs_prepare:
+            start = time.time()
+            try:
+                prepare(connection)
+            except:
+                connection.close()
+                raise
+            self._count("prepare_time", time.time() - start)
+            self._count("prepared")
+            if prepared_key is not None:
+                with self._lock:
+                    self._prepared.add(prepared_key)
+
+        self._connection_identities()[id(connection)] = identity
+        return connection
+
+    def release(self, path, connection):
+        """
+        Gives back a connection obtained with :meth:`acquire` so it can be reused
+        by the current thread. Any pending transaction is rolled back.
+
+        :param str path: Path to the database file the connection was opened on.
+        :param connection: The :class:`sqlite3.Connection` to give back.
+        """
+        identity = self._connection_identities().pop(id(connection), None)
+        idle = self._idle_connections(path)
+        if identity is None or len(idle) >= self.MAX_IDLE_CONNECTIONS:
+            connection.close()
+            return
+        try:
+            connection.rollback()
+            stat = os.stat(path)
+        except (sqlite3.Error, OSError):
+            connection.close()
+            return
+        # the connection may have modified the file, which doesn't prevent it
+        # from being reused.
+        if identity[:2] == (stat.st_dev, stat.st_ino):
+            identity = (stat.st_dev, stat.st_ino, stat.st_mtime, stat.st_size)
+        idle.append((identity, connection))
+
+    def clear(self):
+        """
+        Closes the idle connections of the current thread, forgets which databases
+        were prepared and resets the statistics.
+        """
+        idle = getattr(self._local, "idle", {})
+        for connections in idle.values():
+            for _, connection in connections:
+                connection.close()
+        idle.clear()
+        with self._lock:
+            self._prepared.clear()
+            self._init_stats()
+
+    def get_stats(self):
+        """
+        Returns statistics about the pool usage.
+
+        :returns: Dictionary with the number of connections ``opened``, ``reused``
+                  and ``discarded`` because their file changed, the number of databases
+                  ``prepared`` and the time in seconds spent opening connections
+                  (``open_time``) and preparing databases (``prepare_time``).
+        """
+        with self._lock:
+            return dict(self._stats)
@@ -17,9 +17,17 @@ from __future__ import with_statement
 
 import os
 import copy
+import time
 import threading
 
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
 from tank_vendor import yaml
+from .frozen_data import freeze
+from .. import constants
 from ..errors import (
     TankError,
     TankUnreadableFileError,
@@ -47,6 +55,7 @@ class CacheItem(object):
         """
         self._path = os.path.normpath(path)
         self._data = data
+        self._frozen_data = None
 
         if stat is None:
             try:
@@ -65,9 +74,22 @@ class CacheItem(object):
 
     def _set_data(self, config_data):
         self._data = config_data
+        self._frozen_data = None
 
     data = property(_get_data, _set_data)
 
+    @property
+    def frozen_data(self):
+        """
+        Read only version of the item's data, see :func:`~tank.util.frozen_data.freeze`.
+        It is only built the first time it is requested.
+        """
+        # items unpickled from older caches don't have the attribute.
+        frozen_data = getattr(self, "_frozen_data", None)
+        if frozen_data is None and self._data is not None:
+            frozen_data = self._frozen_data = freeze(self._data)
+        return frozen_data
+
     @property
     def path(self):
         """The path to the file on disk that the item was sourced from."""
@@ -107,6 +129,12 @@ class CacheItem(object):
             raise TypeError("Given item must be of type CacheItem.")
         return (other.stat.st_mtime == self.stat.st_mtime and not self.size_differs(other))
 
+    def __getstate__(self):
+        # the frozen data can be rebuilt from the data.
+        state = self.__dict__.copy()
+        state["_frozen_data"] = None
+        return state
+
     def __getitem__(self, key):
         # Backwards compatibility just in case something outside
         # of this module is expecting the old dict structure.
@@ -125,15 +153,44 @@ class CacheItem(object):
 class YamlCache(object):
     """
     Main yaml cache class
+
+    Files are loaded while holding one of a fixed set of locks picked from their
+    path, so threads loading different files don't wait on each other.
     """
 
-    def __init__(self, cache_dict=None, is_static=False):
+    # number of locks files are loaded under
+    _PATH_LOCK_COUNT = 16
+
+    # maximum number of threads loading files in preload()
+    _PRELOAD_WORKERS = 8
+
+    # preload() only starts threads when more files than this need checking
+    _PRELOAD_SERIAL_MAX_FILES = 2
+
+    def __init__(self, cache_dict=None, is_static=False, stat_ttl=None):
         """
         Construction
+
+        :param cache_dict:  Dictionary of CacheItems keyed by path to start with.
+        :param is_static:   Whether the cache is static, see :attr:`is_static`.
+        :param stat_ttl:    Number of seconds during which a file checked on disk
+                            is not checked again, see :attr:`stat_ttl`. Defaults
+                            to the value of the ``TK_YAML_CACHE_STAT_TTL``
+                            environment variable.
         """
         self._cache = cache_dict or dict()
+        # protects the dictionaries of the cache, never held while loading files
         self._lock = threading.Lock()
+        self._path_locks = [threading.Lock() for _ in range(self._PATH_LOCK_COUNT)]
         self._is_static = is_static
+        # configuration snapshots files are loaded from before being parsed
+        self._snapshots = []
+        # time at which files requested with get() were last checked on disk,
+        # keyed by path
+        self._validated_at = {}
+        if stat_ttl is None:
+            stat_ttl = _get_stat_ttl_from_env()
+        self._stat_ttl = stat_ttl
 
     def _get_is_static(self):
         """
@@ -148,6 +205,22 @@ class YamlCache(object):
 
     is_static = property(_get_is_static, _set_is_static)
 
+    def _get_stat_ttl(self):
+        """
+        Number of seconds during which a file checked on disk by :meth:`get` is
+        trusted to be unchanged, and returned without being checked again. This
+        saves the ``os.stat`` calls of files requested many times in a row, which
+        can be slow on network storage. 0 checks the file on every request.
+        """
+        return self._stat_ttl
+
+    def _set_stat_ttl(self, stat_ttl):
+        with self._lock:
+            self._stat_ttl = max(0, stat_ttl)
+            self._validated_at.clear()
+
+    stat_ttl = property(_get_stat_ttl, _set_stat_ttl)
+
     def invalidate(self, path):
         """
         Invalidates the cache for a given path. This is usually called when writing
@@ -156,24 +229,34 @@ class YamlCache(object):
         with self._lock:
             if path in self._cache:
                 del self._cache[path]
+            self._validated_at.pop(os.path.normpath(path), None)
+            snapshots = self._snapshots
+        for snapshot in snapshots:
+            snapshot.invalidate(os.path.normpath(path))
 
-    def get(self, path, deepcopy_data=True):
+    def get(self, path, deepcopy_data=True, frozen=False):
         """
         Retrieve the yaml data for the specified path.  If it's not already
         in the cache of the cached version is out of date then this will load
         the Yaml file from disk.
+
+        Callers which only read the data should request a frozen version of it,
+        which is shared by all of them instead of being copied for each call.
+        Frozen dictionaries and lists raise a ``TypeError`` if modified, and can
+        be turned into modifiable copies with their ``thaw()`` method.
         
         :param path:            The path of the yaml file to load.
         :param deepcopy_data:   Return deepcopy of data. Default is True.
+        :param frozen:          Return a read only version of the data, made of
+                                :class:`~tank.util.frozen_data.FrozenDict` and
+                                :class:`~tank.util.frozen_data.FrozenList`. If True,
+                                ``deepcopy_data`` is ignored. Default is False.
         :returns:               The raw yaml data loaded from the file.
         """
-        # Adding a new CacheItem to the cache will cause the file mtime
-        # and size on disk to be checked against existing cache data,
-        # then the loading of the yaml data if necessary before returning
-        # the appropriate item back to us, which will be either the new
-        # item we have created here with the yaml data stored within, or
-        # the existing cached data.
-        item = self._add(CacheItem(path))
+        item = self._get_item(path)
+
+        if frozen:
+            return item.frozen_data
 
         # If asked to, return a deep copy of the cached data to ensure that 
         # the cached data is not updated accidentally!
@@ -182,6 +265,102 @@ class YamlCache(object):
         else:
             return item.data
 
+    def preload(self, paths, max_workers=None):
+        """
+        Loads the given files into the cache, reading and parsing several of
+        them at the same time. Files already cached and unchanged on disk are
+        not loaded again, and files which don't need to be checked on disk,
+        e.g. because they were checked less than :attr:`stat_ttl` seconds ago,
+        are skipped. Threads are only used when more than a couple of files
+        need to be checked.
+
+        This is mostly useful when many files are about to be requested, and
+        when reading them is slow, e.g. on network storage.
+
+        :param paths:       List of paths of yaml files.
+        :param max_workers: Maximum number of threads loading files. Defaults
+                            to 8.
+        :raises:            The error raised for the first file which could not
+                            be loaded, once all files have been processed.
+        """
+        # remove duplicates and files which don't need to be checked, while
+        # keeping the order
+        unique_paths = []
+        seen = set()
+        for path in paths:
+            if path in seen:
+                continue
+            seen.add(path)
+            norm_path = os.path.normpath(path)
+            if self._get_recently_validated(norm_path) is not None:
+                continue
+            if self.is_static:
+                with self._lock:
+                    if norm_path in self._cache:
+                        continue
+            unique_paths.append(path)
+
+        num_workers = min(len(unique_paths), max_workers or self._PRELOAD_WORKERS)
+        if num_workers <= 1 or len(unique_paths) <= self._PRELOAD_SERIAL_MAX_FILES:
+            for path in unique_paths:
+                self._get_item(path)
+            return
+
+        path_queue = queue.Queue()
+        for index, path in enumerate(unique_paths):
+            path_queue.put((index, path))
+        errors = []
+
+        def load_paths():
+            while True:
+                try:
+                    index, path = path_queue.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    self._get_item(path)
+                except Exception as e:
+                    errors.append((index, e))
+
+        workers = [threading.Thread(target=load_paths) for _ in range(num_workers)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        if errors:
+            # report the same error as if the files had been loaded in order.
+            raise min(errors, key=lambda error: error[0])[1]
+
+    def add_snapshot(self, snapshot):
+        """
+        Registers a configuration snapshot. Files which are not cached yet are
+        decoded from the snapshot instead of being parsed, as long as they are
+        unchanged on disk since the snapshot was written. A snapshot previously
+        registered for the same file is replaced.
+
+        All the files of the snapshot are checked on disk once, when it is
+        registered. The files found unchanged are then returned by :meth:`get`
+        without being checked again, until they are invalidated or the snapshot
+        is registered again.
+
+        :param snapshot: :class:`~tank.util.config_snapshot.ConfigSnapshot` instance.
+        """
+        snapshot.validate()
+        with self._lock:
+            self._snapshots = [s for s in self._snapshots if s.path != snapshot.path]
+            self._snapshots.append(snapshot)
+
+    def remove_snapshot(self, path):
+        """
+        Unregisters the configuration snapshot read from the given file, if any.
+
+        :param path: Path to the snapshot file.
+        """
+        with self._lock:
+            self._snapshots = [s for s in self._snapshots if s.path != path]
+
     def get_cached_items(self):
         """
         Returns a list of all CacheItems stored in the cache.
@@ -212,11 +391,14 @@ class YamlCache(object):
         :param item:    The CacheItem to add to the cache.
         :returns:       The cached CacheItem.
         """
-        self._lock.acquire()
+        path = item.path
 
-        try:
-            path = item.path
-            cached_item = self._cache.get(path)
+        # Only threads adding files sharing the same path lock wait on each
+        # other while the data is loaded. The main lock is only held while
+        # the cache dictionary is accessed.
+        with self._path_locks[hash(path) % self._PATH_LOCK_COUNT]:
+            with self._lock:
+                cached_item = self._cache.get(path)
 
             # If this is a static cache, we won't do any checks on
             # mod time and file size. If it's in the cache we return
@@ -225,11 +407,6 @@ class YamlCache(object):
             if self.is_static:
                 if cached_item:
                     return cached_item
-                else:
-                    if not item.data:
-                        self._populate_cache_item_data(item)
-                    self._cache[path] = item
-                    return item
             else:
                 # Since this isn't a static cache, we need to make sure
                 # that we don't need to invalidate and recache this item
@@ -242,14 +419,84 @@ class YamlCache(object):
                     # to return the instance we have since that's
                     # what previous logic in the cache did.
                     return cached_item
-                else:
-                    # Load the yaml data from disk. If it's not already populated.
-                    if not item.data:
-                        self._populate_cache_item_data(item)
-                    self._cache[path] = item
-                    return item
-        finally:
-            self._lock.release()
+
+            # Load the yaml data from disk. If it's not already populated.
+            if not item.data and not self._load_from_snapshot(item):
+                self._populate_cache_item_data(item)
+            with self._lock:
+                self._cache[path] = item
+            return item
+
+    def _get_item(self, path):
+        """
+        Returns the up to date cached item for the given path, loading the file
+        if needed.
+
+        :param path:    The path of the yaml file.
+        :returns:       The cached CacheItem.
+        """
+        # Files checked recently enough are returned without looking at them
+        # on disk again.
+        norm_path = os.path.normpath(path)
+        item = self._get_recently_validated(norm_path)
+        if item is None:
+            item = self._get_validated_by_snapshot(norm_path)
+        if item is None:
+            # Adding a new CacheItem to the cache will cause the file mtime
+            # and size on disk to be checked against existing cache data,
+            # then the loading of the yaml data if necessary before returning
+            # the appropriate item back to us, which will be either the new
+            # item we have created here with the yaml data stored within, or
+            # the existing cached data.
+            item = self._add(CacheItem(path))
+            if self._stat_ttl:
+                with self._lock:
+                    self._validated_at[item.path] = time.time()
+        return item
+
+    def _get_recently_validated(self, path):
+        """
+        Returns the cached item for the given path if it was checked on disk
+        less than :attr:`stat_ttl` seconds ago.
+
+        :param path:    Normalized path of the yaml file.
+        :returns:       The cached CacheItem or None.
+        """
+        if not self._stat_ttl:
+            return None
+        with self._lock:
+            validated_at = self._validated_at.get(path)
+            if validated_at is None or time.time() - validated_at >= self._stat_ttl:
+                return None
+            return self._cache.get(path)
+
+    def _get_validated_by_snapshot(self, path):
+        """
+        Returns the cached item for the given path without checking it on disk
+        if a registered snapshot found it unchanged when it was registered. The
+        item is decoded from the snapshot if it is not cached yet.
+
+        :param path:    Normalized path of the yaml file.
+        :returns:       The cached CacheItem or None.
+        """
+        for snapshot in self._snapshots:
+            stat = snapshot.get_validated_stat(path)
+            if stat is not None:
+                return self._add(CacheItem(path, stat=stat))
+        return None
+
+    def _load_from_snapshot(self, item):
+        """
+        Populates the CacheItem's data from a registered snapshot.
+
+        :returns: True if a snapshot holds up to date data for the item.
+        """
+        for snapshot in self._snapshots:
+            found, data = snapshot.get_data(item.path, item.stat)
+            if found:
+                item.data = data
+                return True
+        return False
 
     def _populate_cache_item_data(self, item):
         """
@@ -258,7 +505,7 @@ class YamlCache(object):
         path = item.path
         try:
             with open(path, "r") as fh:
-                raw_data = yaml.load(fh)
+                raw_data = _load_yaml(fh.read())
         except IOError:
             raise TankFileDoesNotExistError("File does not exist: %s" % path)
         except Exception as e:
@@ -266,5 +513,38 @@ class YamlCache(object):
         # Populate the item's data before adding it to the cache.
         item.data = raw_data
 
+def _load_yaml(yaml_string):
+    """
+    Parses yaml data, using the libyaml based loader when it is available.
+
+    The libyaml loader only builds standard yaml types. Data using python
+    specific tags is parsed again with the pure python loader, so the result
+    is always the same as with ``yaml.load``.
+
+    :param str yaml_string: The yaml data.
+    :returns: The parsed data.
+    """
+    if yaml.__with_libyaml__:
+        try:
+            return yaml.load(yaml_string, Loader=yaml.CSafeLoader)
+        except yaml.constructor.ConstructorError:
+            pass
+    return yaml.load(yaml_string)
+
+def _get_stat_ttl_from_env():
+    """
+    :returns: The number of seconds set in the ``TK_YAML_CACHE_STAT_TTL``
+              environment variable, or 0 if it is not set or invalid.
+    """
+    stat_ttl = os.environ.get(constants.YAML_CACHE_STAT_TTL_ENV_VAR)
+    if not stat_ttl:
+        return 0
+    try:
+        return max(0, float(stat_ttl))
+    except ValueError:
+        # the global cache is built on import, so bad values can't be reported
+        # by raising.
+        return 0
+
 # The global instance of the YamlCache.
 g_yaml_cache = YamlCache()
@@ -13,7 +13,7 @@ from __future__ import with_statement
 import uuid
 import os
 import sys
-from mock import patch
+from mock import patch, Mock
 
 from tank_test.tank_test_base import setUpModule # noqa
 from tank_test.tank_test_base import ShotgunTestBase, TankTestBase
@@ -564,6 +564,53 @@ class TestCachedConfiguration(ShotgunTestBase):
         self._cached_config._descriptor.is_immutable = lambda: False
         self.assertEqual(self._cached_config.status(), self._cached_config.LOCAL_CFG_DIFFERENT)
 
+    def test_concurrent_bundle_downloads(self):
+        """
+        Ensures missing bundles are downloaded from several threads and that progress
+        is reported for every bundle.
+        """
+        descriptors = []
+        for idx in range(6):
+            descriptor = Mock()
+            descriptor.exists_local.return_value = idx % 3 == 0
+            descriptors.append(descriptor)
+        downloaded = []
+
+        def download_bundle(descriptor):
+            # The download of this bundle fails and it should be skipped.
+            if descriptor is descriptors[1]:
+                raise Exception("Download failed")
+            downloaded.append(descriptor)
+
+        progress = []
+        with patch.object(self._cached_config, "_download_bundle", side_effect=download_bundle):
+            self._cached_config._download_bundles_concurrently(
+                descriptors, 3, lambda message, idx, nb: progress.append((idx, nb))
+            )
+
+        self.assertEqual(set(downloaded), set([descriptors[2], descriptors[4], descriptors[5]]))
+        self.assertEqual(progress, [(idx, 6) for idx in range(6)])
+
+    def test_interrupted_bundle_download(self):
+        """
+        Ensures a download thread stopped by an exception which isn't an error
+        doesn't leave the calling thread waiting for it.
+        """
+        descriptors = []
+        for _ in range(2):
+            descriptor = Mock()
+            descriptor.exists_local.return_value = False
+            descriptors.append(descriptor)
+
+        progress = []
+        with patch.object(self._cached_config, "_download_bundle", side_effect=SystemExit):
+            self._cached_config._download_bundles_concurrently(
+                descriptors, 2, lambda message, idx, nb: progress.append(message)
+            )
+
+        self.assertEqual(len(progress), 2)
+        self.assertTrue(all(message.startswith("Failed to download") for message in progress))
+
     def _update_deploy_file(self, generation=None, descriptor=None, corrupt=False):
         """
         Updates the deploy file.
@@ -153,7 +153,7 @@ class TestFunctionality(ShotgunTestBase):
         # with what was added during __init__, and then we remove the parameters we know can't
         # be serialized. We're left with a small list of values that can be serialized.
         instance_data_members = instance_attrs - class_attrs - unserializable_attrs
-        self.assertEqual(len(instance_data_members), 7)
+        self.assertEqual(len(instance_data_members), 8)
 
         # Create a manager that hasn't been updated yet.
         clean_mgr = ToolkitManager()
@@ -169,6 +169,7 @@ class TestFunctionality(ShotgunTestBase):
         modified_mgr.do_shotgun_config_lookup = False
         modified_mgr.plugin_id = "basic.default"
         modified_mgr.allow_config_overrides = False
+        modified_mgr.bundle_download_concurrency = 4
 
         # Extract settings and make sure the implementation still stores dictionaries.
         modified_settings = modified_mgr.extract_settings()
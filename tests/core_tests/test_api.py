@@ -61,6 +61,37 @@ class TestTemplateFromPath(TankTestBase):
         self.assertIsInstance(template, TemplateString)
 
 
+    def test_index_matches_linear_scan(self):
+        """Check the template index returns the same templates as validating all of them."""
+        paths = [
+            self.project_root,
+            os.path.join(self.project_root, "sequences", "Sequence_1"),
+            os.path.join(self.project_root, "sequences", "Sequence_1", "shot_010", "Anm", "work"),
+            os.path.join(self.project_root, "sequences/Sequence_1/shot_010/Anm/publish/shot_010.jfk.v001.ma"),
+            os.path.join(self.project_root, "sequences/Sequence_1/shot_010/Anm/work/shot_010.jfk.v001.ma"),
+            os.path.join(self.project_root, "assets", "Character", "Hero", "Mod", "work"),
+            "Nuke Script Name, v002",
+            "relative/path/to/file.ma",
+            "/",
+        ]
+        for path in paths:
+            expected = [t for t in self.tk.templates.values() if t.validate(path)]
+            self.assertEqual(expected, self.tk.templates_from_path(path))
+
+    def test_index_updated(self):
+        """Check that changes to the templates dictionary are picked up."""
+        file_path = os.path.join(self.project_root, "foo", "bar_1.ma")
+        self.assertIsNone(self.tk.template_from_path(file_path))
+
+        keys = {"name": StringKey("name")}
+        template = TemplatePath("foo/{name}.ma", keys, self.project_root, "foo_template")
+        self.tk.templates["foo_template"] = template
+        self.assertEqual(template, self.tk.template_from_path(file_path))
+
+        self.tk.templates = {}
+        self.assertIsNone(self.tk.template_from_path(file_path))
+
+
 class TestTemplatesLoaded(TankTestBase):
     """Test case for the loading of templates from project level config."""
     def setUp(self):
@@ -79,6 +110,15 @@ class TestTemplatesLoaded(TankTestBase):
             template = self.tk.templates.get(expected_name)
             self.assertTrue(isinstance(template, TemplatePath))
 
+    def test_reload_clears_fields_cache(self):
+        """Test that reloading templates discards the fields cached by the previous templates."""
+        template = self.tk.templates["shot_project"]
+        template.validate(self.project_root)
+        self.assertEqual(1, self.tk.get_template_cache_stats()["shot_project"]["size"])
+        self.tk.reload_templates()
+        self.assertEqual(0, template._fields_cache.get_stats()["size"])
+        self.assertEqual(0, self.tk.get_template_cache_stats()["shot_project"]["size"])
+
     def test_project_roots_set(self):
         """Test project root on templates with alternate and primary roots are set correctly."""
 
@@ -183,6 +223,19 @@ class TestPathsFromTemplate(TankTestBase):
         self.assertNotIn(bad_file_path, result)
 
 
+    def test_iter_paths(self):
+        """
+        Test that paths are yielded by iter_paths_from_template.
+        """
+        fields = {"Sequence": "Seq_1", "Shot": "shot_1", "Step": "step_name"}
+        skip_keys = ["version"]
+        paths = self.tk.iter_paths_from_template(self.template, fields, skip_keys=skip_keys)
+        self.assertFalse(isinstance(paths, list))
+        self.assertEqual(set([self.file_1, self.file_2]), set(paths))
+        # the caller's list shouldn't be modified.
+        self.assertEqual(["version"], skip_keys)
+
+
 class TestAbstractPathsFromTemplate(TankTestBase):
     """Tests Tank.abstract_paths_from_template method."""
     def setUp(self):
@@ -302,9 +355,31 @@ class TestAbstractPathsFromTemplate(TankTestBase):
         result = self.tk.abstract_paths_from_template(self.template, {"name": "filename"})
         self.assertEqual(set(expected), set(result))
 
+    def test_frame_ranges(self):
+        # remove a frame for one of the eyes only, it is still found for the other one.
+        os.remove(os.path.join(self.shot_a_path, "left", "filename.0002.exr"))
+        os.remove(os.path.join(self.shot_a_path, "left", "filename.0003.exr"))
+        os.remove(os.path.join(self.shot_a_path, "right", "filename.0003.exr"))
+        expected = {
+            os.path.join(self.shot_a_path, "%V", "filename.%04d.exr"): {"SEQ": [(1, 2), (4, 4)]},
+            os.path.join(self.shot_a_path, "%V", "anothername.%04d.exr"): {"SEQ": [(1, 4)]},
+        }
+        result = self.tk.abstract_paths_from_template(
+            self.template, {"Shot": "AAA"}, return_frame_ranges=True
+        )
+        self.assertEqual(expected, result)
+
+    def test_frame_ranges_leaf_skipped(self):
+        # the leaf level isn't listed when all its non abstract keys are known.
+        expected = {os.path.join(self.shot_a_path, "%V", "filename.%04d.exr"): {}}
+        result = self.tk.abstract_paths_from_template(
+            self.template, {"Shot": "AAA", "name": "filename"}, return_frame_ranges=True
+        )
+        self.assertEqual(expected, result)
+
 
 class TestPathsFromTemplateGlob(TankTestBase):
-    """Tests for Tank.paths_from_template method which check the string sent to glob.glob."""
+    """Tests for Tank.paths_from_template method which check the glob string searched for."""
     def setUp(self):
         super(TestPathsFromTemplateGlob, self).setUp()
         keys = {"Shot": StringKey("Shot"),
@@ -313,7 +388,7 @@ class TestPathsFromTemplateGlob(TankTestBase):
 
         self.template = TemplatePath("{Shot}/{version}/filename.{seq_num}", keys, root_path=self.project_root)
 
-    @patch("tank.api.glob.iglob")
+    @patch("tank.template_walker.TemplatePathWalker.iter_paths")
     def assert_glob(self, fields, expected_glob, skip_keys, mock_glob):
         # want to ensure that value returned from glob is returned
         expected = [os.path.join(self.project_root, "shot_1","001","filename.00001")]
@@ -261,6 +261,46 @@ class TestFromPath(TestContext):
 
 
 
+class TestFromPaths(TestContext):
+
+    @patch("tank.util.login.get_current_user")
+    def test_same_as_from_path(self, get_current_user):
+        """Check contexts built in bulk are the same as the ones built one by one."""
+        get_current_user.return_value = self.current_user
+        paths = [
+            self.project_root,
+            self.seq_path,
+            self.shot_path,
+            os.path.join(self.shot_path, "some", "file.ma"),
+            self.shot_path_alt,
+            self.step_path,
+            self.other_user_path,
+            os.path.abspath(os.path.join(self.project_root, "..")),
+        ]
+        result = self.tk.contexts_from_paths(paths)
+        self.assertEqual(sorted(result), sorted(paths))
+        for path in paths:
+            self.assertEqual(result[path], self.tk.context_from_path(path))
+        self.assertEqual(self.shot["id"], result[self.step_path].entity["id"])
+        self.assertEqual(self.step["id"], result[self.step_path].step["id"])
+        self.assertEqual(self.other_user["id"], result[self.other_user_path].user["id"])
+
+    def test_single_hook_call(self):
+        """Check the path cache and the context_additional_entities hook are only used once."""
+        paths = [os.path.join(self.shot_path, "file_%d.ma" % index) for index in range(10)]
+        with patch.object(self.tk, "execute_core_hook", wraps=self.tk.execute_core_hook) as execute_core_hook:
+            with patch(
+                "tank.path_cache.PathCache.get_entities_for_paths",
+                autospec=True,
+                side_effect=tank.path_cache.PathCache.get_entities_for_paths
+            ) as get_entities_for_paths:
+                result = self.tk.contexts_from_paths(paths)
+        self.assertEqual(execute_core_hook.call_count, 1)
+        self.assertEqual(get_entities_for_paths.call_count, 1)
+        for path in paths:
+            self.assertEqual(self.shot["id"], result[path].entity["id"])
+
+
 class TestFromPathWithPrevious(TestContext):
 
     @patch("tank.util.login.get_current_user")
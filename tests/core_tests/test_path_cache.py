@@ -13,6 +13,7 @@ from __future__ import with_statement, print_function
 import os
 import sys
 import time
+import threading
 import Queue
 import StringIO
 import shutil
@@ -132,6 +133,81 @@ class TestInit(TestPathCache):
             )
 
 
+class TestReadOnly(TestPathCache):
+    """
+    Tests for path caches using pooled connections.
+    """
+    def test_connection_reused(self):
+        """Test that read only path caches reuse connections and only check the schema once."""
+        shot_path = os.path.join(self.project_root, "seq", "shot_name")
+        add_item_to_cache(self.path_cache, {"type": "Shot", "id": 1, "name": "shot_name"}, shot_path)
+
+        with patch.object(path_cache.PathCache, "_init_schema", autospec=True) as init_schema:
+            pc = path_cache.PathCache(self.tk, read_only=True)
+            connection = pc._connection
+            self.assertEqual(pc.get_entity(shot_path), {"type": "Shot", "id": 1, "name": "shot_name"})
+            pc.close()
+            self.assertIsNone(pc._connection)
+
+            pc = path_cache.PathCache(self.tk, read_only=True)
+            self.assertIs(pc._connection, connection)
+            self.assertEqual(pc.get_entity(shot_path), {"type": "Shot", "id": 1, "name": "shot_name"})
+            pc.close()
+        self.assertLessEqual(init_schema.call_count, 1)
+        self.assertGreater(path_cache.PathCache.get_read_connection_stats()["reused"], 0)
+
+
+class TestLocalReplica(TankTestBase):
+    """
+    Tests for path caches kept on the local disk.
+    """
+    def setUp(self):
+        super(TestLocalReplica, self).setUp()
+        self.setup_multi_root_fixtures()
+        env_patcher = patch.dict(os.environ, {constants.PATH_CACHE_LOCAL_REPLICA_ENV_VAR: "1"})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+    def test_location_and_pragmas(self):
+        """Test that the database is kept in the local cache folder, with write-ahead logging."""
+        pc = path_cache.PathCache(self.tk)
+        try:
+            location = pc._get_path_cache_location()
+            self.assertEqual(os.path.basename(location), constants.PATH_CACHE_LOCAL_REPLICA_FILE)
+            self.assertEqual(
+                os.path.basename(os.path.dirname(location)),
+                "p{0}c{1}".format(
+                    self.tk.pipeline_configuration.get_project_id(),
+                    self.tk.pipeline_configuration.get_shotgun_id()
+                )
+            )
+            self.assertEqual(pc._connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            # NORMAL
+            self.assertEqual(pc._connection.execute("PRAGMA synchronous").fetchone()[0], 1)
+
+            shot_path = os.path.join(self.project_root, "seq", "shot_name")
+            add_item_to_cache(pc, {"type": "Shot", "id": 1, "name": "shot_name"}, shot_path)
+        finally:
+            pc.close()
+
+        # pooled connections are tuned as well.
+        pc = path_cache.PathCache(self.tk, read_only=True)
+        try:
+            self.assertEqual(pc._connection.execute("PRAGMA synchronous").fetchone()[0], 1)
+            self.assertEqual(pc.get_entity(shot_path), {"type": "Shot", "id": 1, "name": "shot_name"})
+        finally:
+            pc.close()
+
+    def test_requires_shotgun_sync(self):
+        """Test that path caches not synchronized with Shotgun are never kept locally."""
+        with patch.object(
+            self.tk.pipeline_configuration, "get_shotgun_path_cache_enabled", return_value=False
+        ):
+            with patch.object(path_cache.PathCache, "_init_db"):
+                pc = path_cache.PathCache(self.tk)
+        self.assertFalse(pc._local_replica)
+
+
 class TestAddMapping(TestPathCache):
 
     def setUp(self):
@@ -363,6 +439,56 @@ class TestGetEntity(TestPathCache):
         self.assertIsNone(result)
 
 
+class TestGetEntitiesForPaths(TestPathCache):
+    """
+    Tests for get_entities_for_paths.
+    """
+    def setUp(self):
+        super(TestGetEntitiesForPaths, self).setUp()
+        self.non_project = {"type": "NonProjectEntity", "id": 999, "name": "NonProjectName"}
+        proj = {"type": "Project", "id": self.project["id"], "name": self.project["name"]}
+        add_item_to_cache(self.path_cache, proj, self.project_root)
+        add_item_to_cache(self.path_cache, proj, self.alt_root_1)
+
+    def test_same_as_single_lookups(self):
+        """Test that the bulk lookup finds the same entities as get_entity and get_secondary_entities."""
+        shot_path = os.path.join(self.project_root, "seq", "shot_name")
+        alt_shot_path = os.path.join(self.alt_root_1, "seq", "shot_name")
+        add_item_to_cache(self.path_cache, self.non_project, shot_path)
+        add_item_to_cache(self.path_cache, {"type": "Sequence", "id": 3, "name": "seq"}, shot_path, primary=False)
+        add_item_to_cache(self.path_cache, self.non_project, alt_shot_path)
+
+        paths = [
+            self.project_root,
+            self.alt_root_1,
+            shot_path,
+            alt_shot_path,
+            os.path.join(self.project_root, "seq"),
+            os.path.join("path", "not", "in", "project"),
+        ]
+        results = self.path_cache.get_entities_for_paths(paths)
+        self.assertEqual(sorted(results), sorted(paths))
+        for path in paths:
+            self.assertEqual(
+                results[path],
+                (self.path_cache.get_entity(path), self.path_cache.get_secondary_entities(path))
+            )
+        self.assertEqual(results[shot_path][1], [{"type": "Sequence", "id": 3, "name": "seq"}])
+
+    def test_many_paths(self):
+        """Test that lookups are batched when there are more paths than sqlite can handle at once."""
+        paths = [
+            os.path.join(self.project_root, "seq", "shot_%d" % index)
+            for index in range(path_cache.PathCache.SQLITE_MAX_ITEMS_FOR_IN_STATEMENT * 2 + 1)
+        ]
+        for index, path in enumerate(paths):
+            add_item_to_cache(self.path_cache, {"type": "Shot", "id": index, "name": "shot_%d" % index}, path)
+
+        results = self.path_cache.get_entities_for_paths(paths)
+        for index, path in enumerate(paths):
+            self.assertEqual(results[path], ({"type": "Shot", "id": index, "name": "shot_%d" % index}, []))
+
+
 class TestGetPaths(TestPathCache):
     def test_add_and_find_shot(self):
         # add two paths to cache for a shot
@@ -1175,6 +1301,299 @@ class TestPathCacheDelete(TankTestBase):
         pc.remove_filesystem_location_entries(self.tk, path_ids)
 
 
+class TestPathCacheMemoryMirror(TankTestBase):
+    """
+    Tests for read only path caches serving lookups from memory.
+    """
+
+    def setUp(self):
+        super(TestPathCacheMemoryMirror, self).setUp()
+        self._project_link = self.mockgun.create("Project", {"name": "MyProject"})
+        self._shot_entity = self.mockgun.create("Shot", {"code": "MyShot", "project": self._project_link})
+        self._shot_entity["name"] = "MyShot"
+        self._shot_full_path = os.path.join(self.project_root, "shot")
+        self._seq_entity = {"type": "Sequence", "id": 3, "name": "MySeq"}
+
+        self._pc = path_cache.PathCache(self.tk)
+        add_item_to_cache(self._pc, self._shot_entity, self._shot_full_path)
+        add_item_to_cache(self._pc, self._seq_entity, self._shot_full_path, primary=False)
+
+        env_patcher = patch.dict(os.environ, {constants.PATH_CACHE_IN_MEMORY_ENV_VAR: "1"})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+    def tearDown(self):
+        self._pc.close()
+        path_cache._memory_mirrors.clear()
+        super(TestPathCacheMemoryMirror, self).tearDown()
+
+    def _get_shot_paths(self):
+        """
+        :returns: The shot paths found by a read only path cache.
+        """
+        pc = path_cache.PathCache(self.tk, read_only=True)
+        try:
+            return pc.get_paths(self._shot_entity["type"], self._shot_entity["id"], primary_only=True)
+        finally:
+            pc.close()
+
+    def _get_mirror_stats(self):
+        """
+        :returns: Statistics of the single mirror in use.
+        """
+        stats = path_cache.PathCache.get_memory_mirror_stats()
+        self.assertEqual(len(stats), 1)
+        return list(stats.values())[0]
+
+    def test_lookups(self):
+        """
+        Ensures lookups from memory return the same results as sqlite queries.
+        """
+        paths = [
+            self._shot_full_path,
+            self.project_root,
+            os.path.join(self.project_root, "unknown"),
+            os.path.join("path", "not", "in", "project"),
+        ]
+        for _ in range(2):
+            pc = path_cache.PathCache(self.tk, read_only=True)
+            try:
+                self.assertIsNotNone(pc._mirror)
+                for path in paths:
+                    self.assertEqual(pc.get_entity(path), self._pc.get_entity(path))
+                    self.assertEqual(pc.get_secondary_entities(path), self._pc.get_secondary_entities(path))
+                self.assertEqual(pc.get_entities_for_paths(paths), self._pc.get_entities_for_paths(paths))
+                for entity in [self._shot_entity, self._seq_entity]:
+                    for primary_only in [True, False]:
+                        self.assertEqual(
+                            pc.get_paths(entity["type"], entity["id"], primary_only),
+                            self._pc.get_paths(entity["type"], entity["id"], primary_only)
+                        )
+            finally:
+                pc.close()
+
+        # the database is only loaded once
+        stats = self._get_mirror_stats()
+        self.assertEqual(stats["loads"], 1)
+        num_rows = self._pc._connection.execute("SELECT COUNT(*) FROM path_cache").fetchone()[0]
+        self.assertEqual(stats["entries"], num_rows)
+        self.assertGreater(stats["estimated_size"], 0)
+
+        # path caches which can be written to always use sqlite.
+        self.assertIsNone(self._pc._mirror)
+
+    def test_incremental_sync_replayed(self):
+        """
+        Ensures folder creation and deletion events synchronized by the process
+        are replayed on the mirror.
+        """
+        self.assertEqual(self._get_shot_paths(), [self._shot_full_path])
+
+        # Remove the shot path from Shotgun, and register a new one from another computer.
+        self._pc.remove_filesystem_location_entries(
+            self.tk, [self._pc.get_shotgun_id_from_path(self._shot_full_path)]
+        )
+        new_shot_path = os.path.join(self.project_root, "new_shot")
+        with temp_env_var(SHOTGUN_HOME=os.path.join(self.tank_temp, "other_path_cache_root")):
+            pc = path_cache.PathCache(self.tk)
+            try:
+                pc.synchronize()
+                add_item_to_cache(pc, self._shot_entity, new_shot_path)
+            finally:
+                pc.close()
+
+        # nothing changes until the process synchronizes the path cache.
+        self.assertEqual(self._get_shot_paths(), [self._shot_full_path])
+        with patch.object(self._pc, "_do_full_sync") as do_full_sync:
+            self._pc.synchronize()
+        self.assertFalse(do_full_sync.called)
+
+        self.assertEqual(self._get_shot_paths(), [new_shot_path])
+        stats = self._get_mirror_stats()
+        self.assertEqual(stats["loads"], 1)
+        self.assertEqual(stats["replayed_syncs"], 1)
+
+    def test_local_changes_reloaded(self):
+        """
+        Ensures changes made to the database outside of incremental synchronizations
+        are picked up.
+        """
+        self.assertEqual(self._get_shot_paths(), [self._shot_full_path])
+        other_path = os.path.join(self.project_root, "other_shot")
+        add_item_to_cache(self._pc, self._shot_entity, other_path)
+        self.assertEqual(sorted(self._get_shot_paths()), sorted([self._shot_full_path, other_path]))
+        self.assertEqual(self._get_mirror_stats()["loads"], 2)
+
+    def test_concurrent_reload(self):
+        """
+        Ensures threads looking up paths while the mirror is out of date only
+        reload it once, and that lookups made during the reload find the entries.
+        """
+        self.assertEqual(self._get_shot_paths(), [self._shot_full_path])
+        mirror = list(path_cache._memory_mirrors.values())[0]
+        mirror.invalidate()
+
+        results = []
+        load = mirror.load
+
+        def slow_load(connection):
+            # lookups made while the rows are loaded use the previous rows.
+            results.append(mirror.get_paths(self._shot_entity["type"], self._shot_entity["id"], True))
+            time.sleep(0.1)
+            load(connection)
+
+        with patch.object(mirror, "load", side_effect=slow_load):
+            threads = [
+                threading.Thread(target=lambda: results.append(self._get_shot_paths()))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(self._get_mirror_stats()["loads"], 2)
+        self.assertTrue(results)
+        for paths in results:
+            self.assertEqual(len(paths), 1)
+
+    def test_other_process_changes_reloaded(self):
+        """
+        Ensures changes made to the database by another process are picked up.
+        """
+        self.assertEqual(self._get_shot_paths(), [self._shot_full_path])
+
+        # a path cache from another process doesn't know about the mirror.
+        other_path = os.path.join(self.project_root, "other_process_shot")
+        with patch.object(path_cache, "_memory_mirrors", {}):
+            pc = path_cache.PathCache(self.tk)
+            try:
+                add_item_to_cache(pc, self._shot_entity, other_path)
+            finally:
+                pc.close()
+
+        self.assertEqual(sorted(self._get_shot_paths()), sorted([self._shot_full_path, other_path]))
+        self.assertEqual(self._get_mirror_stats()["loads"], 2)
+
+
+class TestFullSyncBulkImport(TankTestBase):
+    """
+    Tests for full synchronizations importing all the folders in a single load.
+    """
+
+    def setUp(self):
+        super(TestFullSyncBulkImport, self).setUp()
+        self._project_link = self.mockgun.create("Project", {"name": "MyProject"})
+        self._shot_entities = []
+        # register folders from "another computer"
+        with temp_env_var(SHOTGUN_HOME=os.path.join(self.tank_temp, "other_path_cache_root")):
+            self._remote_pc = path_cache.PathCache(self.tk)
+        self._remote_pc.synchronize()
+        for index in range(5):
+            shot = self.mockgun.create("Shot", {"code": "shot_%d" % index, "project": self._project_link})
+            shot["name"] = shot["code"]
+            self._shot_entities.append(shot)
+            add_item_to_cache(self._remote_pc, shot, os.path.join(self.project_root, "shot_%d" % index))
+        add_item_to_cache(
+            self._remote_pc,
+            {"type": "Sequence", "id": 3, "name": "MySeq"},
+            os.path.join(self.project_root, "shot_0"),
+            primary=False
+        )
+        self._pc = path_cache.PathCache(self.tk)
+
+        # exercise paging and batched inserts
+        for name, value in [("SHOTGUN_ENTITY_QUERY_BATCH_SIZE", 2), ("FULL_SYNC_INSERT_BATCH_SIZE", 2)]:
+            patcher = patch.object(path_cache.PathCache, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._pc.close()
+        self._remote_pc.close()
+        super(TestFullSyncBulkImport, self).tearDown()
+
+    def _get_contents(self, pc):
+        """
+        :returns: Sorted rows of the path_cache and shotgun_status tables, joined.
+        """
+        return sorted(pc._connection.execute(
+            "SELECT pc.entity_type, pc.entity_id, pc.entity_name, pc.root, pc.path, pc.primary_entity, "
+            "ss.shotgun_id FROM path_cache pc LEFT JOIN shotgun_status ss ON pc.rowid = ss.path_cache_id"
+        ))
+
+    def _get_index_names(self, pc):
+        """
+        :returns: Sorted names of the indices of the database.
+        """
+        return sorted(
+            row[0] for row in pc._connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        )
+
+    def test_import(self):
+        """
+        Ensures the imported entries are the ones registered in Shotgun, and that
+        progress is reported.
+        """
+        # the local path cache only knows about the project
+        self.assertNotEqual(self._get_contents(self._pc), self._get_contents(self._remote_pc))
+
+        progress_callback = Mock()
+        new_items = self._pc.synchronize(full_sync=True, progress_callback=progress_callback)
+        self.assertEqual(self._get_contents(self._pc), self._get_contents(self._remote_pc))
+        self.assertEqual(len(new_items), len(self._get_contents(self._pc)))
+        self.assertEqual(
+            self._get_index_names(self._pc),
+            # the index of the deferred folders ledger is not dropped during the load.
+            sorted([name for name, _ in path_cache.PathCache._INDICES] + ["deferred_folders_entity"])
+        )
+        self.assertEqual(progress_callback.call_args[0][0], 1.0)
+
+        # lookups work as usual, and a new incremental sync has nothing to do.
+        self.assertEqual(
+            self._pc.get_paths("Shot", self._shot_entities[1]["id"], primary_only=True),
+            [os.path.join(self.project_root, "shot_1")]
+        )
+        self.assertEqual(self._pc.synchronize(), [])
+
+    def test_duplicates_skipped(self):
+        """
+        Ensures duplicate FilesystemLocation entities are only imported once.
+        """
+        for fsl in self.mockgun.find(
+            path_cache.SHOTGUN_ENTITY, [],
+            ["code", "path", "project", "pipeline_configuration", "linked_entity_type",
+             "linked_entity_id", "is_primary", "configuration_metadata"]
+        ):
+            del fsl["id"]
+            del fsl["type"]
+            self.mockgun.create(path_cache.SHOTGUN_ENTITY, fsl)
+
+        self._pc.synchronize(full_sync=True)
+        contents = self._get_contents(self._pc)
+        self.assertEqual(len(self.mockgun.find(path_cache.SHOTGUN_ENTITY, [])), 2 * len(contents))
+        # one row per unique path and entity, linked to the first FilesystemLocation
+        self.assertEqual(
+            [row[:-1] for row in contents],
+            [row[:-1] for row in self._get_contents(self._remote_pc)]
+        )
+
+    def test_rollback(self):
+        """
+        Ensures the database is left untouched if the load fails.
+        """
+        self._pc.synchronize(full_sync=True)
+        contents = self._get_contents(self._pc)
+        index_names = self._get_index_names(self._pc)
+
+        with patch.object(self._pc, "_update_last_event_log_synced", side_effect=Exception("Failed")):
+            with self.assertRaisesRegex(Exception, "Failed"):
+                self._pc.synchronize(full_sync=True)
+
+        self.assertEqual(self._get_contents(self._pc), contents)
+        self.assertEqual(self._get_index_names(self._pc), index_names)
+
+
 class TestPathCacheBatchOperation(TankTestBase):
     """
     Tests the deletion of 2000+ filesystem locations (#44931)
@@ -18,7 +18,6 @@ from tank.errors import TankInitError
 from sgtk.util import ShotgunPath
 from tank_test.tank_test_base import TankTestBase, ShotgunTestBase, setUpModule # noqa
 from mock import patch
-import cPickle as pickle
 
 
 class TestTankFromPath(TankTestBase):
@@ -438,6 +437,29 @@ class TestPipelineConfigurationEnumeration(ShotgunTestBase):
             ]
         )
 
+    def test_get_pipeline_configs_from_child_path(self):
+        """
+        Makes sure children of project roots are matched case insensitively, and
+        that the project root trie is only built once for the same data.
+        """
+        project_root = os.path.join(self.primary_storage["windows_path"], "with_tank_name")
+        trie = sgtk.pipelineconfig_factory._get_project_paths_trie(self._sg_data)
+
+        pcs = sgtk.pipelineconfig_factory._get_pipeline_configs_for_path(
+            os.path.join(project_root.upper(), "sequences", "seq_1"), self._sg_data
+        )
+        self.assertEqual(
+            pcs,
+            sgtk.pipelineconfig_factory._get_pipeline_configs_for_path(project_root, self._sg_data)
+        )
+        self.assertIs(sgtk.pipelineconfig_factory._get_project_paths_trie(self._sg_data), trie)
+
+        # folders which only start like the project root don't match it.
+        pcs = sgtk.pipelineconfig_factory._get_pipeline_configs_for_path(
+            "%s_2" % project_root, self._sg_data
+        )
+        self.assertEqual(pcs, [])
+
     def test_get_pipeline_configs_for_project(self):
         """
         Makes sure _get_pipeline_configs_for_project can match a path to the right list of possible pipelines.
@@ -502,12 +524,20 @@ class TestLookupCache(ShotgunTestBase):
             cache_data = sgtk.pipelineconfig_factory._load_lookup_cache()
             # The new paths_v2 sections should be in there.
             self.assertIn("paths_v2", cache_data)
+            self.assertEqual(
+                sgtk.pipelineconfig_factory._load_lookup_cache("paths_v2"), cache_data["paths_v2"]
+            )
 
             # Remove the paths
-            cache_data.pop("paths_v2")
-
-            with open(sgtk.pipelineconfig_factory._get_cache_location(), "wb") as fh:
-                pickle.dump(cache_data, fh)
+            connection = sgtk.pipelineconfig_factory._connect_lookup_cache()
+            with connection:
+                connection.execute("DELETE FROM lookup WHERE key = ?", ("paths_v2",))
+            connection.close()
+
+            # The index built from the paths can't be used anymore.
+            self.assertIsNone(
+                sgtk.pipelineconfig_factory._get_cached_pipeline_configs_for_path(self.project_root)
+            )
 
             # Do not force read from Shotgun, but since the cache is not present
             # it should be loaded from Shotgun.
@@ -515,6 +545,65 @@ class TestLookupCache(ShotgunTestBase):
             sgtk.pipelineconfig_factory._get_pipeline_configs(False)
             self.assertTrue(mock.called)
 
+    def test_indexed_lookups(self):
+        """
+        Ensure pipeline configurations looked up in the cache index match the
+        ones found in the cached data.
+        """
+        with patch("tank.util.shotgun.get_sg_connection", return_value=self.mockgun):
+            data = sgtk.pipelineconfig_factory._get_pipeline_configs(True)
+
+        for path in [
+            self.project_root,
+            os.path.join(self.project_root, "sequences", "seq_1"),
+            os.path.join(self.project_root.upper(), "foo"),
+            "%s_not_a_child" % self.project_root,
+            self.tank_temp
+        ]:
+            self.assertEqual(
+                sgtk.pipelineconfig_factory._get_cached_pipeline_configs_for_path(path),
+                sgtk.pipelineconfig_factory._get_pipeline_configs_for_path(path, data)
+            )
+
+        project_id = self.project["id"]
+        pcs = sgtk.pipelineconfig_factory._get_cached_pipeline_configs_for_project(project_id)
+        self.assertEqual(
+            pcs, sgtk.pipelineconfig_factory._get_pipeline_configs_for_project(project_id, data)
+        )
+        self.assertNotEqual(pcs, [])
+
+    def test_pipeline_configs_reused(self):
+        """
+        Ensure the pipeline configuration data loaded from the cache, and its
+        project root trie, are reused until the cache changes.
+        """
+        with patch("tank.util.shotgun.get_sg_connection", return_value=self.mockgun):
+            sgtk.pipelineconfig_factory._get_pipeline_configs(True)
+            data = sgtk.pipelineconfig_factory._get_pipeline_configs(False)
+            trie = sgtk.pipelineconfig_factory._get_project_paths_trie(data)
+            with patch("tank.pipelineconfig_factory._connect_lookup_cache") as connect:
+                self.assertIs(sgtk.pipelineconfig_factory._get_pipeline_configs(False), data)
+            self.assertFalse(connect.called)
+            self.assertIs(sgtk.pipelineconfig_factory._get_project_paths_trie(data), trie)
+
+            # rewriting the cache reloads the data.
+            sgtk.pipelineconfig_factory._get_pipeline_configs(True)
+            new_data = sgtk.pipelineconfig_factory._get_pipeline_configs(False)
+            self.assertIsNot(new_data, data)
+            self.assertEqual(new_data, data)
+
+    def test_expiry(self):
+        """
+        Ensure expired values are not returned.
+        """
+        sgtk.pipelineconfig_factory._add_to_lookup_cache("expired", 1, ttl=-1)
+        sgtk.pipelineconfig_factory._add_to_lookup_cache("valid", 2, ttl=60)
+        sgtk.pipelineconfig_factory._add_to_lookup_cache("permanent", 3)
+        self.assertIsNone(sgtk.pipelineconfig_factory._load_lookup_cache("expired"))
+        self.assertEqual(sgtk.pipelineconfig_factory._load_lookup_cache("valid"), 2)
+        self.assertEqual(sgtk.pipelineconfig_factory._load_lookup_cache("permanent"), 3)
+        self.assertNotIn("expired", sgtk.pipelineconfig_factory._load_lookup_cache())
+
 
 class TestTankFromWithSiteConfig(TankTestBase):
     """
@@ -14,6 +14,7 @@ import sys
 import time
 
 import unittest2
+import mock
 import tank
 from tank import TankError
 from tank_test.tank_test_base import TankTestBase, ShotgunTestBase, setUpModule # noqa
@@ -245,6 +246,64 @@ class TestMissingKeys(TestTemplate):
         self.assertEqual(["Shot"], result)
 
 
+class TestFieldsCache(TestTemplate):
+    """
+    Tests the caching of fields extracted from paths.
+    """
+    def setUp(self):
+        super(TestFieldsCache, self).setUp()
+        self.template_path = TemplatePath(
+            "shots/{Sequence}/{Shot}/{Step}/work/{Shot}.{branch}.v{version}.ma",
+            self.keys,
+            os.path.join(os.path.sep, "root")
+        )
+        self.path = os.path.join(
+            os.path.sep, "root", "shots", "seq_1", "s1", "Anm", "work", "s1.main.v003.ma"
+        )
+
+    def test_hit(self):
+        """
+        Tests that fields are cached and copies are returned.
+        """
+        fields = self.template_path.get_fields(self.path)
+        fields["Shot"] = "modified"
+        self.assertEqual(self.template_path._fields_cache.get_stats()["misses"], 1)
+
+        fields = self.template_path.get_fields(self.path + os.path.sep)
+        self.assertEqual("s1", fields["Shot"])
+        self.assertEqual(self.template_path._fields_cache.get_stats()["hits"], 1)
+
+    def test_negative_results(self):
+        """
+        Tests that failures are cached with their error message.
+        """
+        bad_path = self.path.replace("v003", "vXXX")
+        with self.assertRaises(TankError) as first_error:
+            self.template_path.get_fields(bad_path)
+        with self.assertRaises(TankError) as second_error:
+            self.template_path.get_fields(bad_path)
+        self.assertEqual(str(first_error.exception), str(second_error.exception))
+        self.assertFalse(self.template_path.validate(bad_path))
+        self.assertEqual(self.template_path._fields_cache.get_stats()["hits"], 2)
+
+    def test_skip_keys(self):
+        """
+        Tests that skipped keys are part of the cache key.
+        """
+        self.assertIn("Step", self.template_path.get_fields(self.path))
+        self.assertNotIn("Step", self.template_path.get_fields(self.path, skip_keys=["Step"]))
+        self.assertIn("Step", self.template_path.get_fields(self.path))
+
+    def test_cache_size(self):
+        """
+        Tests that the cache size can be configured through the environment.
+        """
+        with mock.patch.dict(os.environ, {"TK_TEMPLATE_FIELDS_CACHE_SIZE": "0"}):
+            template = TemplatePath("{Shot}.ma", self.keys, os.path.join(os.path.sep, "root"))
+        template.get_fields(os.path.join(os.path.sep, "root", "s1.ma"))
+        self.assertEqual(template._fields_cache.get_stats()["size"], 0)
+
+
 class TestSplitPath(unittest2.TestCase):
     def test_mixed_sep(self):
         "tests that split works with mixed seperators"
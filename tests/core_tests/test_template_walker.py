@@ -0,0 +1,171 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import glob
+
+from mock import patch
+
+from tank.template import TemplatePath
+from tank.template_walker import TemplatePathWalker, TemplateSequenceScanner
+from tank.templatekey import StringKey, IntegerKey, SequenceKey
+from tank_test.tank_test_base import TankTestBase, setUpModule # noqa
+
+
+class TestTemplatePathWalker(TankTestBase):
+    """
+    Tests for the TemplatePathWalker class.
+    """
+    def setUp(self):
+        super(TestTemplatePathWalker, self).setUp()
+        self.root = os.path.join(self.tank_temp, "walker_root")
+        for relative_path in [
+            "shot_1/001/file.ma",
+            "shot_1/002/file.ma",
+            "shot_1/abc/file.ma",
+            "shot_1/.hidden/file.ma",
+            "shot_2/001/file.ma",
+            "shot_2/001/file.mb",
+        ]:
+            self.create_file(os.path.join(self.root, *relative_path.split("/")))
+        self.keys = {"Shot": StringKey("Shot"), "version": IntegerKey("version", format_spec="03")}
+
+    def test_same_as_glob(self):
+        """
+        Tests that the walker finds the same paths as glob.
+        """
+        patterns = [
+            os.path.join("*", "*", "file.ma"),
+            os.path.join("shot_1", "*", "file.*"),
+            os.path.join("shot_*", "001", "file.m[ab]"),
+            os.path.join("shot_1", ".*", "file.ma"),
+            os.path.join("shot_1", "001", "file.ma"),
+            os.path.join("shot_3", "*", "file.ma"),
+            os.path.join("*"),
+        ]
+        walker = TemplatePathWalker()
+        for pattern in patterns:
+            pattern = os.path.join(self.root, pattern)
+            self.assertEqual(sorted(glob.iglob(pattern)), sorted(walker.iter_paths(pattern)))
+
+    def test_listings_shared(self):
+        """
+        Tests that directories are listed only once by a walker.
+        """
+        walker = TemplatePathWalker()
+        with patch("os.listdir", wraps=os.listdir) as listdir_mock:
+            list(walker.iter_paths(os.path.join(self.root, "*", "*", "file.ma")))
+            list(walker.iter_paths(os.path.join(self.root, "*", "*", "file.mb")))
+        listed = [call[0][0] for call in listdir_mock.call_args_list]
+        self.assertEqual(len(listed), len(set(listed)))
+        self.assertEqual(len(listed), 3)
+
+    def test_key_validation(self):
+        """
+        Tests that directories holding invalid key values are not walked down.
+        """
+        definition = os.path.join("{Shot}", "{version}", "file.ma")
+        walker = TemplatePathWalker()
+        with patch("os.path.lexists", wraps=os.path.lexists) as lexists_mock:
+            paths = list(walker.iter_paths(os.path.join(self.root, "*", "*", "file.ma"), definition, self.keys))
+        self.assertEqual(
+            sorted(paths),
+            sorted([
+                os.path.join(self.root, "shot_1", "001", "file.ma"),
+                os.path.join(self.root, "shot_1", "002", "file.ma"),
+                os.path.join(self.root, "shot_2", "001", "file.ma"),
+            ])
+        )
+        checked = [call[0][0] for call in lexists_mock.call_args_list]
+        self.assertNotIn(os.path.join(self.root, "shot_1", "abc", "file.ma"), checked)
+
+
+class TestTemplateSequenceScanner(TankTestBase):
+    """
+    Tests for the TemplateSequenceScanner class.
+    """
+    def setUp(self):
+        super(TestTemplateSequenceScanner, self).setUp()
+        self.keys = {
+            "name": StringKey("name"),
+            "eye": StringKey("eye", default="%V", choices=["left", "right", "%V"], abstract=True),
+            "SEQ": SequenceKey("SEQ", format_spec="04"),
+            "version": IntegerKey("version"),
+        }
+        self.root = os.path.join(self.tank_temp, "scanner_root")
+
+    def _scan(self, definition, names):
+        """
+        Scans paths made of the root and the given names with a template.
+
+        :returns: List of (fields, abstract values) tuples.
+        """
+        template = TemplatePath(definition, self.keys, self.root)
+        scanner = TemplateSequenceScanner(template)
+        paths = [os.path.join(self.root, *name.split("/")) for name in names]
+        return list(scanner.iter_sequences(paths))
+
+    def test_single_parse_per_sequence(self):
+        """
+        Tests that a single path is parsed for each sequence.
+        """
+        names = ["left/a.b.%04d.exr" % frame for frame in range(1, 11)]
+        names += ["left/c.%04d.exr" % frame for frame in range(1, 11)]
+        names += ["right/c.%04d.exr" % frame for frame in range(1, 11)]
+        with patch.object(TemplatePath, "validate_and_get_fields", autospec=True,
+                          side_effect=TemplatePath.validate_and_get_fields) as mocked:
+            sequences = self._scan("{eye}/{name}.{SEQ}.exr", names)
+        self.assertEqual(mocked.call_count, 3)
+        self.assertEqual(
+            sorted((fields["eye"], fields["name"], values["SEQ"]) for fields, values in sequences),
+            [
+                ("left", "a.b", range(1, 11)),
+                ("left", "c", range(1, 11)),
+                ("right", "c", range(1, 11)),
+            ]
+        )
+
+    def test_invalid_paths(self):
+        """
+        Tests that invalid paths are parsed on their own and discarded.
+        """
+        sequences = self._scan(
+            "{eye}/{name}.{SEQ}.exr",
+            ["left/a.0001.exr", "left/a.abcd.exr", "left/a.0002.jpg", "up/a.0001.exr"]
+        )
+        self.assertEqual(len(sequences), 1)
+        self.assertEqual(sequences[0][0]["name"], "a")
+        self.assertEqual(sequences[0][1], {"SEQ": [1]})
+
+    def test_ambiguous_leaf(self):
+        """
+        Tests that paths are parsed one by one when abstract values can't be
+        extracted from the leaf level unambiguously.
+        """
+        names = ["left/a.v%d.%04d.exr" % (version, frame) for version in (1, 2) for frame in (1, 2)]
+        for definition in ["{eye}/{name}.v{version}{SEQ}.exr", "{eye}/{name}_{eye}.{SEQ}.exr"]:
+            template = TemplatePath(definition, self.keys, self.root)
+            self.assertEqual(TemplateSequenceScanner(template)._leaf_regex, None)
+
+        sequences = self._scan("{eye}/{name}.v{version}.{SEQ}.exr", names)
+        self.assertEqual(
+            sorted((fields["version"], values["SEQ"]) for fields, values in sequences),
+            [(1, [1, 2]), (2, [1, 2])]
+        )
+
+    def test_frame_ranges(self):
+        """
+        Tests computing contiguous frame ranges.
+        """
+        self.assertEqual(TemplateSequenceScanner.get_frame_ranges([]), [])
+        self.assertEqual(
+            TemplateSequenceScanner.get_frame_ranges([5, 1, 2, 3, 7, 8, 3, "%04d"]),
+            [(1, 3), (5, 5), (7, 8)]
+        )
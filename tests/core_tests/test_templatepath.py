@@ -17,6 +17,7 @@ import tank
 from tank import TankError
 
 from tank.template import TemplatePath
+from tank.template_path_parser import TemplatePathParser
 from tank_test.tank_test_base import ShotgunTestBase, setUpModule # noqa
 from tank.templatekey import (StringKey, IntegerKey, SequenceKey)
 
@@ -1096,6 +1097,66 @@ class TestGetKeysSepInValue(TestTemplatePath):
         self.assert_path_matches(definition, input_path, expected)        
 
 
+class TestPathRegex(TestTemplatePath):
+    """
+    Tests the regular expression fast path used when parsing paths.
+    """
+    def assert_same_as_full_parse(self, template, input_path, skip_keys=None):
+        """
+        Checks that parsing a path with and without the regular expressions
+        gives the same fields and errors.
+        """
+        for ordered_keys, static_tokens, path_regex in zip(
+            template._ordered_keys, template._static_tokens, template._path_regexes
+        ):
+            fast_parser = TemplatePathParser(ordered_keys, static_tokens, path_regex)
+            full_parser = TemplatePathParser(ordered_keys, static_tokens)
+            self.assertEqual(
+                full_parser.parse_path(input_path, skip_keys),
+                fast_parser.parse_path(input_path, skip_keys)
+            )
+            self.assertEqual(full_parser.last_error, fast_parser.last_error)
+
+    def test_compiled(self):
+        """
+        Keys followed by characters they can't contain can be resolved with a regular expression.
+        """
+        self.assertIsNotNone(self.template_path._path_regexes[0])
+        self.assertIsNotNone(self.sequence._path_regexes[0])
+        template = TemplatePath("{Step}/{name}.v{version}.{frame}.exr", self.keys, self.project_root)
+        self.assertIsNone(template._path_regexes[0])
+
+    def test_same_results(self):
+        """
+        Tests that the fast path returns the same results as the full parsing.
+        """
+        file_path = os.path.join(self.project_root, "shots", "seq_1", "shot_1", "Anm", "work")
+        paths = [
+            os.path.join(file_path, "shot_1.mmm.v003.002.ma"),
+            os.path.join(file_path, "SHOT_1.mmm.V003.002.MA"),
+            os.path.join(file_path, "shot_1.mmm.v003.00a.ma"),
+            os.path.join(file_path, "shot_1.m_m.v003.002.ma"),
+            os.path.join(file_path, "s1.mmm.v003.002.ma"),
+            os.path.join(file_path, "shot_1.mmm.v003.ma"),
+            os.path.join(file_path, "shot_1.mmm.v003.002.ma.ma"),
+            os.path.join(self.project_root, "shots", "seq_1", "shot_1", "Anm", "Anm", "work"),
+        ]
+        for path in paths:
+            self.assert_same_as_full_parse(self.template_path, path)
+            self.assert_same_as_full_parse(self.template_path, path, skip_keys=["Sequence"])
+
+        for path in ["/path/to/seq.0001.ext", "/path/to/seq.%04d.ext", "/path/to/seq.a001.ext"]:
+            self.assert_same_as_full_parse(self.sequence, path)
+
+    def test_key_first(self):
+        """
+        Tests that paths which could also be resolved starting with a key are handled.
+        """
+        template = TemplatePath("_{branch}_{version}", self.keys, "")
+        for path in ["_a_001", "a_b_001", "a_b_001_002", "__001"]:
+            self.assert_same_as_full_parse(template, path)
+
+
 class TestParent(TestTemplatePath):
     def test_parent_exists(self):
         expected_definition = os.path.join("shots",
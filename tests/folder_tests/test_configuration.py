@@ -9,9 +9,11 @@
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
 import os
+import sys
+import threading
 import unittest
 import shutil
-from mock import Mock
+from mock import Mock, patch
 import tank
 from tank_vendor import yaml
 from tank import TankError
@@ -74,3 +76,91 @@ class TestFolderConfiguration(TankTestBase):
                           self.schema_location)
 
 
+
+
+class TestFolderConfigurationCache(TankTestBase):
+    """
+    Tests that the folder configuration is cached until the schema changes.
+    """
+    def setUp(self):
+        super(TestFolderConfigurationCache, self).setUp()
+        self.setup_fixtures()
+
+        # work on a copy of the schema, since the tests modify it.
+        self.schema_location = os.path.join(self.tank_temp, self.short_test_name, "schema")
+        shutil.copytree(self.tk.pipeline_configuration.get_schema_config_location(), self.schema_location)
+        patcher = patch.object(
+            self.tk.pipeline_configuration,
+            "get_schema_config_location",
+            return_value=self.schema_location
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cached_configuration(self):
+        """
+        Ensures the folder configuration is reused until the schema is modified.
+        """
+        config = folder.configuration.get_folder_configuration(self.tk)
+        self.assertIs(folder.configuration.get_folder_configuration(self.tk), config)
+
+        # modify a file in the schema.
+        ignore_files = os.path.join(self.schema_location, "ignore_files")
+        with open(ignore_files, "a") as fh:
+            fh.write("\n# modified\n")
+        other_config = folder.configuration.get_folder_configuration(self.tk)
+        self.assertIsNot(other_config, config)
+
+        # add a folder to the schema.
+        os.makedirs(os.path.join(self.schema_location, "project", "new_static_folder"))
+        self.assertIsNot(folder.configuration.get_folder_configuration(self.tk), other_config)
+
+    def test_exclusive_use(self):
+        """
+        Ensures folder creations don't use the shared folder objects at the same time.
+        """
+        config = folder.configuration.get_folder_configuration(self.tk)
+        project_obj = config.get_folder_objs_for_entity_type("Project")[0]
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(
+                folder.process_filesystem_structure(self.tk, "Project", self.project["id"], True, None)
+            )
+        )
+        with config.use():
+            with patch.object(project_obj, "clear_cached_data") as clear_cached_data:
+                thread.start()
+                thread.join(0.5)
+                # the other folder creation waits for the configuration.
+                self.assertTrue(thread.is_alive())
+                self.assertFalse(clear_cached_data.called)
+        thread.join()
+        self.assertEqual(len(results), 1)
+
+    @unittest.skipIf(sys.platform == "win32", "Symbolic links are not supported on Windows.")
+    def test_broken_symlink(self):
+        """
+        Ensures a broken symbolic link in the schema doesn't prevent loading it.
+        """
+        os.symlink(
+            os.path.join(self.tank_temp, "missing_target"),
+            os.path.join(self.schema_location, "project", "broken_link")
+        )
+        self.assertIsNotNone(folder.configuration.get_folder_configuration(self.tk))
+
+    def test_stat_ttl(self):
+        """
+        Ensures the schema isn't checked again within the yaml cache's stat ttl.
+        """
+        config = folder.configuration.get_folder_configuration(self.tk)
+
+        stat_ttl = tank.util.yaml_cache.g_yaml_cache.stat_ttl
+        tank.util.yaml_cache.g_yaml_cache.stat_ttl = 60
+        try:
+            with patch(
+                "tank.folder.configuration._get_schema_signature",
+                side_effect=Exception("schema scanned")
+            ):
+                self.assertIs(folder.configuration.get_folder_configuration(self.tk), config)
+        finally:
+            tank.util.yaml_cache.g_yaml_cache.stat_ttl = stat_ttl
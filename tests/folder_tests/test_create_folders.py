@@ -12,7 +12,7 @@ import copy
 import os
 import unittest
 import shutil
-from mock import Mock
+from mock import Mock, patch
 import tank
 from tank_vendor import yaml
 from tank import TankError
@@ -551,6 +551,46 @@ class TestCreateFilesystemStructure(TankTestBase):
                                             engine=None)
         self.assertTrue(os.path.exists(expected))
 
+
+    def test_create_multiple_shots(self):
+        """
+        Tests that the Shotgun data for several shots is prefetched and gives
+        the same folders as querying the data for each shot.
+        """
+        seq_2 = {"type": "Sequence",
+                 "id": 5,
+                 "code": "seq_code_2",
+                 "project": self.project}
+        shots = [self.shot]
+        for (shot_id, seq) in [(6, self.seq), (7, seq_2)]:
+            shots.append({"type": "Shot",
+                          "id": shot_id,
+                          "code": "shot_code_%d" % shot_id,
+                          "sg_sequence": seq,
+                          "project": self.project})
+        self.add_to_sg_mock_db([seq_2] + shots[1:])
+        shot_ids = [shot["id"] for shot in shots]
+
+        with patch("tank.folder.operations.prefetch_shotgun_data"):
+            with patch.object(self.mockgun, "find", wraps=self.mockgun.find) as find_mock:
+                expected_folders = folder.process_filesystem_structure(
+                    self.tk, "Shot", shot_ids, preview=True, engine=None
+                )
+        num_queries = find_mock.call_count
+
+        with patch.object(self.mockgun, "find", wraps=self.mockgun.find) as find_mock:
+            folders = folder.process_filesystem_structure(
+                self.tk, "Shot", shot_ids, preview=True, engine=None
+            )
+
+        self.assertEqual(sorted(folders), sorted(expected_folders))
+        self.assertLess(find_mock.call_count, num_queries)
+        for (seq, shot_code) in [(self.seq, "shot_code"), (self.seq, "shot_code_6"), (seq_2, "shot_code_7")]:
+            self.assertIn(
+                os.path.join(self.project_root, "sequences", seq["code"], shot_code),
+                folders
+            )
+
               
     def test_wrong_type_entity_ids(self):
         """Test passing in type other than list, int or tuple as value for entity_ids parameter.
@@ -11,7 +11,7 @@
 import os
 import unittest
 import shutil
-from mock import Mock
+from mock import Mock, patch
 import tank
 from tank_vendor import yaml
 from tank import TankError
@@ -170,4 +170,99 @@ class TestDeferredFolderCreation(TankTestBase):
         self.assertTrue(os.path.exists(self.deferred_asset))
 
 
+class TestDeferredFoldersLedger(TankTestBase):
+    """Test skipping deferred folder creation which has already been done for an engine."""
+    def setUp(self):
+        super(TestDeferredFoldersLedger, self).setUp()
+        self.setup_fixtures(parameters = {"core": "core.override/deferred_core"})
+
+        self.shot = {"type": "Shot",
+                     "id": 1,
+                     "code": "shot_code",
+                     "project": self.project}
+        self.add_to_sg_mock_db([self.shot])
+
+        self.deferred_specified = os.path.join(self.project_root, "deferred_specified", "shot_code")
+
+        patcher = patch.dict(os.environ, {"TK_DEFERRED_FOLDERS_LEDGER": "1"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = {"type": "HumanUser", "id": 1, "login": "user_1"}
+        self.other_user = {"type": "HumanUser", "id": 2, "login": "user_2"}
+        patcher = patch("tank.util.login.get_current_user", return_value=self.user)
+        self.get_current_user = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _create_folders(self, engine):
+        return folder.process_filesystem_structure(self.tk,
+                                                   self.shot["type"],
+                                                   self.shot["id"],
+                                                   preview=False,
+                                                   engine=engine)
+
+    def test_skip_completed_engine(self):
+        self.assertNotEqual(self._create_folders("specific_1"), [])
+        self.assertTrue(os.path.exists(self.deferred_specified))
+
+        # the folders are not processed again for the same engine
+        shutil.rmtree(self.deferred_specified)
+        self.assertEqual(self._create_folders("specific_1"), [])
+        self.assertFalse(os.path.exists(self.deferred_specified))
+
+        # but are for another engine
+        self.assertNotEqual(self._create_folders("specific_2"), [])
+        self.assertTrue(os.path.exists(self.deferred_specified))
 
+    def test_other_user(self):
+        self._create_folders("specific_1")
+        shutil.rmtree(self.deferred_specified)
+
+        # deferred folders include user sandboxes, so they are processed for each user
+        self.get_current_user.return_value = self.other_user
+        self.assertNotEqual(self._create_folders("specific_1"), [])
+        self.assertTrue(os.path.exists(self.deferred_specified))
+
+        shutil.rmtree(self.deferred_specified)
+        self.assertEqual(self._create_folders("specific_1"), [])
+        self.get_current_user.return_value = self.user
+        self.assertEqual(self._create_folders("specific_1"), [])
+        self.assertFalse(os.path.exists(self.deferred_specified))
+
+    def test_non_deferred_and_preview(self):
+        self._create_folders("specific_1")
+        shutil.rmtree(self.deferred_specified)
+
+        # only deferred passes are skipped
+        folder.process_filesystem_structure(self.tk, self.shot["type"], self.shot["id"], preview=True, engine="specific_1")
+        self.assertFalse(os.path.exists(self.deferred_specified))
+        self._create_folders(None)
+        self.assertFalse(os.path.exists(self.deferred_specified))
+
+        with patch.dict(os.environ, {"TK_DEFERRED_FOLDERS_LEDGER": "0"}):
+            self._create_folders("specific_1")
+        self.assertTrue(os.path.exists(self.deferred_specified))
+
+    def test_schema_change(self):
+        self._create_folders("specific_1")
+        shutil.rmtree(self.deferred_specified)
+
+        with patch("tank.folder.operations.get_schema_checksum", return_value="modified"):
+            self.assertNotEqual(self._create_folders("specific_1"), [])
+        self.assertTrue(os.path.exists(self.deferred_specified))
+
+    def test_unregister_folders(self):
+        self._create_folders("specific_1")
+        shutil.rmtree(self.deferred_specified)
+
+        # unregistering folders invalidates the ledger
+        path_cache = tank.path_cache.PathCache(self.tk)
+        try:
+            cursor = path_cache._connection.cursor()
+            path_cache._remove_filesystem_location_entities(cursor, [1])
+            path_cache._connection.commit()
+        finally:
+            path_cache.close()
+
+        self._create_folders("specific_1")
+        self.assertTrue(os.path.exists(self.deferred_specified))
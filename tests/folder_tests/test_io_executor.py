@@ -0,0 +1,223 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import sys
+import traceback
+
+from mock import patch
+
+from tank import folder
+from tank_test.tank_test_base import ShotgunTestBase
+from tank_test.tank_test_base import setUpModule # noqa
+
+
+class TestProcessFolderCreationItems(ShotgunTestBase):
+    """
+    Tests for creating the folder creation items concurrently.
+    """
+
+    def setUp(self):
+        super(TestProcessFolderCreationItems, self).setUp()
+        self.root = os.path.join(self.tank_temp, self.short_test_name)
+        os.makedirs(os.path.join(self.root, "existing"))
+
+        self.source_file = os.path.join(self.root, "source.txt")
+        with open(self.source_file, "w") as fh:
+            fh.write("source")
+
+    def _path(self, *args):
+        return os.path.join(self.root, *args)
+
+    def _get_items(self):
+        """
+        Returns items covering all the actions, including paths which already exist
+        and paths created by earlier items.
+        """
+        items = [
+            {"action": "folder", "path": self._path("existing")},
+            {"action": "entity_folder", "path": self._path("a", "b", "c")},
+            # created as a parent of the previous item
+            {"action": "folder", "path": self._path("a", "b")},
+            {"action": "folder", "path": self._path("a", "b", "d")},
+            {"action": "folder", "path": self._path("a", "b", "d")},
+            {"action": "remote_entity_folder", "path": self._path("remote")},
+            {"action": "copy", "source_path": self.source_file, "target_path": self._path("a", "copy.txt")},
+            {"action": "create_file", "path": self._path("e", "new.txt"), "content": "new"},
+        ]
+        if sys.platform != "win32":
+            items.append({"action": "symlink", "path": self._path("a", "link"), "target": "b"})
+        return items
+
+    def test_create_items(self):
+        """
+        Ensures items are created and that the same locations as the hook are returned.
+        """
+        expected_locations = [
+            self._path("a", "b", "c"),
+            self._path("a", "b", "d"),
+            self._path("a", "copy.txt"),
+            self._path("e", "new.txt"),
+        ]
+        if sys.platform != "win32":
+            expected_locations.append(self._path("a", "link"))
+
+        locations = folder.process_folder_creation_items(self._get_items(), False, 4)
+        self.assertEqual(locations, expected_locations)
+
+        self.assertTrue(os.path.isdir(self._path("a", "b", "c")))
+        self.assertTrue(os.path.isdir(self._path("a", "b", "d")))
+        self.assertFalse(os.path.exists(self._path("remote")))
+        with open(self._path("a", "copy.txt")) as fh:
+            self.assertEqual(fh.read(), "source")
+        with open(self._path("e", "new.txt")) as fh:
+            self.assertEqual(fh.read(), "new")
+        if sys.platform != "win32":
+            self.assertEqual(os.readlink(self._path("a", "link")), "b")
+
+        # everything exists now.
+        self.assertEqual(folder.process_folder_creation_items(self._get_items(), False, 4), [])
+
+    def test_preview(self):
+        """
+        Ensures nothing is created in preview mode.
+        """
+        expected_locations = [
+            self._path("a", "b", "c"),
+            self._path("a", "b"),
+            self._path("a", "b", "d"),
+            self._path("a", "b", "d"),
+            self._path("a", "copy.txt"),
+            self._path("e", "new.txt"),
+        ]
+        if sys.platform != "win32":
+            expected_locations.append(self._path("a", "link"))
+
+        locations = folder.process_folder_creation_items(self._get_items(), True, 4)
+        self.assertEqual(locations, expected_locations)
+        self.assertFalse(os.path.exists(self._path("a")))
+        self.assertFalse(os.path.exists(self._path("e")))
+
+    def test_no_overwrite(self):
+        """
+        Ensures existing files are never overwritten.
+        """
+        target = self._path("existing", "file.txt")
+        with open(target, "w") as fh:
+            fh.write("existing")
+        folder.io_executor._copy_file(self.source_file, target)
+        folder.io_executor._create_file(target, "new")
+        with open(target) as fh:
+            self.assertEqual(fh.read(), "existing")
+
+    def test_errors(self):
+        """
+        Ensures errors raised while creating items are reported.
+        """
+        items = [
+            {"action": "copy", "source_path": self._path("missing.txt"), "target_path": self._path("copy.txt")},
+            {"action": "create_file", "path": self._path("file.txt"), "content": "content"}
+        ]
+        self.assertRaises(IOError, folder.process_folder_creation_items, items, False, 4)
+
+        # the error is raised with the traceback of the thread which raised it.
+        try:
+            folder.process_folder_creation_items(items, False, 4)
+        except IOError:
+            frames = traceback.extract_tb(sys.exc_info()[2])
+        self.assertIn("_copy_file", [frame[2] for frame in frames])
+
+    def test_missing_items(self):
+        """
+        Ensures only the missing items are planned.
+        """
+        def get_missing_items():
+            snapshot = folder.io_executor.FileSystemSnapshot(
+                folder.io_executor._FolderCreationPlan.get_checked_paths(items), 4
+            )
+            return folder.io_executor._FolderCreationPlan(items, False, snapshot).missing_items
+
+        items = self._get_items()
+        expected_items = [items[1], items[3], items[6], items[7]]
+        if sys.platform != "win32":
+            expected_items.append(items[8])
+        self.assertEqual(get_missing_items(), expected_items)
+
+        folder.process_folder_creation_items(items, False, 4)
+        self.assertEqual(get_missing_items(), [])
+
+
+class TestFileSystemSnapshot(ShotgunTestBase):
+    """
+    Tests for checking paths from the listings of their folders.
+    """
+
+    def setUp(self):
+        super(TestFileSystemSnapshot, self).setUp()
+        self.root = os.path.join(self.tank_temp, self.short_test_name)
+        os.makedirs(os.path.join(self.root, "a", "b"))
+        with open(os.path.join(self.root, "a", "file.txt"), "w") as fh:
+            fh.write("file")
+
+    def _path(self, *args):
+        return os.path.join(self.root, *args)
+
+    def test_exists(self):
+        """
+        Ensures paths are reported as on disk.
+        """
+        paths = [
+            self._path("a"),
+            self._path("a", "b"),
+            self._path("a", "file.txt"),
+            self._path("a", "file.txt", "child"),
+            self._path("a", "b", "c", "d", "e"),
+            self._path("x", "y", "z"),
+        ]
+        snapshot = folder.io_executor.FileSystemSnapshot(paths, 4)
+        for path in paths:
+            self.assertEqual(snapshot.exists(path), os.path.exists(path), path)
+            self.assertEqual(snapshot.lexists(path), os.path.lexists(path), path)
+        self.assertEqual(snapshot.num_fallbacks, 0)
+
+    def test_missing_folders_not_listed(self):
+        """
+        Ensures folders known to be missing are not listed.
+        """
+        paths = [
+            self._path("a", "b", "c", "d", "e"),
+            self._path("a", "b", "c", "d", "f"),
+            self._path("a", "b", "c", "g"),
+        ]
+        snapshot = folder.io_executor.FileSystemSnapshot(paths, 4)
+        # only the highest folder, a/b/c, which doesn't exist.
+        self.assertEqual(snapshot.num_listings, 1)
+        for path in paths:
+            self.assertFalse(snapshot.exists(path))
+
+    def test_case_mismatch(self):
+        """
+        Ensures names which only differ by case are checked on the file system.
+        """
+        paths = [
+            self._path("A"),
+            self._path("A", "b"),
+            self._path("A", "B", "c"),
+        ]
+        snapshot = folder.io_executor.FileSystemSnapshot(paths, 4)
+        for path in paths:
+            self.assertEqual(snapshot.exists(path), os.path.exists(path), path)
+        # the folder A itself is listed, using its own path.
+        self.assertEqual(snapshot.num_fallbacks, 1)
+
+        # a case insensitive file system finds the existing folder.
+        with patch("os.path.exists", return_value=True) as exists:
+            self.assertTrue(snapshot.exists(self._path("A")))
+        exists.assert_called_once_with(self._path("A"))
@@ -568,6 +568,31 @@ class TestHookCache(TestApplication):
             self.engine.destroy()
             self.assertEqual(clear_mock.call_count, 1)
 
+    def test_cached_lookups(self):
+        """
+        Check that created hooks and hook file checks don't touch the disk
+        again until the cache is cleared.
+        """
+        tank.hook.clear_hooks_cache()
+        hook_path = os.path.join(self.tank_temp, "cached_hook.py")
+        with open(hook_path, "w") as fh:
+            fh.write("import sgtk\nclass CachedHook(sgtk.Hook):\n    pass\n")
+
+        instance = tank.hook.create_hook_instance([hook_path], self.tk)
+        with mock.patch("os.path.exists", side_effect=Exception("os.path.exists called")):
+            other_instance = tank.hook.create_hook_instance([hook_path], self.tk)
+            self.assertTrue(tank.hook.hook_file_exists(hook_path))
+        self.assertIs(type(other_instance), type(instance))
+        self.assertIsNot(other_instance, instance)
+        self.assertEqual(tank.hook.get_hook_baseclass(), type(instance))
+
+        missing_path = os.path.join(self.tank_temp, "cached_missing_hook.py")
+        self.assertFalse(tank.hook.hook_file_exists(missing_path))
+        shutil.copy(hook_path, missing_path)
+        self.assertFalse(tank.hook.hook_file_exists(missing_path))
+        tank.hook.clear_hooks_cache()
+        self.assertTrue(tank.hook.hook_file_exists(missing_path))
+
 
 class TestProperties(TestApplication):
 
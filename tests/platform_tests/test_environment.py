@@ -12,6 +12,7 @@ import os
 import sys
 
 from tank.errors import TankError
+from tank.platform import environment_includes
 from tank_test.tank_test_base import setUpModule # noqa
 from tank_test.tank_test_base import TankTestBase
 from tank_vendor import yaml
@@ -473,3 +474,67 @@ class TestPyYamlParser(TankTestBase):
         # with whatever the current version of python is expecting
         expected_env = [l.replace("FLOAT_VALUE", repr(1.1)) for l in expected_env]
         self.assertEqual(updated_env, expected_env)
+
+
+class TestIncludeGraph(TankTestBase):
+    """
+    Tests that included files are only resolved again when they change.
+    """
+
+    def setUp(self):
+        super(TestIncludeGraph, self).setUp()
+        self._root = os.path.join(self.tank_temp, "include_graph")
+        os.makedirs(self._root)
+        self._write("env.yml", {"includes": ["a.yml"], "engines": "@engines"})
+        self._write("a.yml", {"includes": ["b.yml"], "engines": {"tk-test": "@engine"}})
+        self._write("b.yml", {"engine": {"version": 1}})
+
+    def _write(self, file_name, data):
+        """
+        Writes a yml file and makes sure its modification time changes.
+        """
+        path = os.path.join(self._root, file_name)
+        mtime = os.stat(path).st_mtime + 10 if os.path.exists(path) else None
+        with open(path, "w") as fh:
+            fh.write(yaml.dump(data))
+        if mtime:
+            os.utime(path, (mtime, mtime))
+
+    def _process(self):
+        """
+        Processes the includes of the environment file.
+
+        :returns: Tuple with the processed data and the number of included
+                  files which were resolved.
+        """
+        env_file = os.path.join(self._root, "env.yml")
+        data = environment_includes.g_yaml_cache.get(env_file, frozen=True)
+        stats = {"files": 0, "resolved": 0}
+        data, _ = environment_includes._process_includes_r(env_file, data, None, stats)
+        self.assertEqual(stats["files"], 2)
+        return data, stats["resolved"]
+
+    def test_incremental_resolve(self):
+        """
+        Tests that only the changed files and the files including them are
+        resolved again.
+        """
+        environment_includes.clear_include_graph()
+        data, resolved = self._process()
+        self.assertEqual(data["engines"], {"tk-test": {"version": 1}})
+        self.assertEqual(resolved, 2)
+
+        data["engines"]["tk-test"]["version"] = 3
+        data, resolved = self._process()
+        self.assertEqual(data["engines"], {"tk-test": {"version": 1}})
+        self.assertEqual(resolved, 0)
+
+        self._write("b.yml", {"engine": {"version": 2}})
+        data, resolved = self._process()
+        self.assertEqual(data["engines"], {"tk-test": {"version": 2}})
+        self.assertEqual(resolved, 2)
+
+        self._write("a.yml", {"includes": ["b.yml"], "engines": {"tk-other": "@engine"}})
+        data, resolved = self._process()
+        self.assertEqual(data["engines"], {"tk-other": {"version": 2}})
+        self.assertEqual(resolved, 1)
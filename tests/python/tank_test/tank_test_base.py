@@ -586,6 +586,10 @@ class TankTestBase(unittest.TestCase):
 
             # clear global shotgun accessor
             tank.util.shotgun.connection._g_sg_cached_connections = threading.local()
+
+            # hook files are looked up by path, and the paths are reused by
+            # the next test.
+            tank.hook.clear_hooks_cache()
         finally:
             if self._old_shotgun_home is not None:
                 os.environ[self.SHOTGUN_HOME] = self._old_shotgun_home
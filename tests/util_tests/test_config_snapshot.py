@@ -0,0 +1,196 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from __future__ import with_statement
+
+import os
+import logging
+
+from mock import patch
+
+import tank
+from tank import TankError
+from tank import constants
+from tank.util.yaml_cache import YamlCache
+from tank.util.config_snapshot import ConfigSnapshot
+from tank_vendor import yaml
+from tank_test.tank_test_base import TankTestBase, setUpModule # noqa
+
+
+class TestConfigSnapshot(TankTestBase):
+    """
+    Tests for writing and reading configuration snapshots.
+    """
+
+    def setUp(self):
+        super(TestConfigSnapshot, self).setUp()
+        self.root = os.path.join(self.tank_temp, "snapshot_%s" % self.id())
+        os.makedirs(os.path.join(self.root, "env"))
+        self.files = {
+            os.path.join(self.root, "env", "project.yml"): {"engines": {"tk-maya": {"apps": {}}}},
+            os.path.join(self.root, "templates.yml"): {"keys": {"Shot": {"type": "str"}}},
+            os.path.join(self.root, "empty.yml"): None,
+        }
+        for path, data in self.files.items():
+            with open(path, "w") as fh:
+                if data is not None:
+                    fh.write(yaml.dump(data))
+        self.snapshot_path = os.path.join(self.root, constants.CONFIG_SNAPSHOT_FILE)
+
+    def _write_snapshot(self):
+        """
+        Parses the test files and writes them to a snapshot.
+        """
+        yaml_cache = YamlCache()
+        for path in self.files:
+            yaml_cache.get(path, deepcopy_data=False)
+        return ConfigSnapshot.write(self.snapshot_path, self.root, yaml_cache.get_cached_items())
+
+    def test_round_trip(self):
+        """
+        Tests that the data decoded from a snapshot is the data of the files.
+        """
+        self.assertEqual(self._write_snapshot(), len(self.files))
+        snapshot = ConfigSnapshot(self.snapshot_path, self.root)
+        try:
+            self.assertEqual(len(snapshot), len(self.files))
+            for path, data in self.files.items():
+                self.assertEqual(snapshot.get_data(path, os.stat(path)), (True, data))
+            self.assertEqual(snapshot.get_stats(), {"entries": len(self.files), "decoded": len(self.files)})
+
+            # unknown files and modified files are not found
+            other_path = os.path.join(self.root, "other.yml")
+            self.assertEqual(snapshot.get_data(other_path, os.stat(self.snapshot_path)), (False, None))
+            path = os.path.join(self.root, "templates.yml")
+            mtime = os.stat(path).st_mtime + 10
+            os.utime(path, (mtime, mtime))
+            self.assertEqual(snapshot.get_data(path, os.stat(path)), (False, None))
+        finally:
+            snapshot.close()
+
+    def test_yaml_cache(self):
+        """
+        Tests that the yaml cache loads registered snapshots instead of parsing files.
+        """
+        self._write_snapshot()
+        yaml_cache = YamlCache()
+        yaml_cache.add_snapshot(ConfigSnapshot(self.snapshot_path, self.root))
+        with patch.object(YamlCache, "_populate_cache_item_data") as populate:
+            for path, data in self.files.items():
+                self.assertEqual(yaml_cache.get(path), data)
+        self.assertFalse(populate.called)
+
+        # files found unchanged when the snapshot was registered are not checked again
+        with patch("os.stat") as stat:
+            for path, data in self.files.items():
+                self.assertEqual(yaml_cache.get(path), data)
+        self.assertFalse(stat.called)
+
+        # modified files are parsed once invalidated, or once the snapshot is registered again
+        path = os.path.join(self.root, "env", "project.yml")
+        with open(path, "w") as fh:
+            fh.write(yaml.dump({"engines": {}}))
+        mtime = os.stat(path).st_mtime + 10
+        os.utime(path, (mtime, mtime))
+        yaml_cache.invalidate(path)
+        self.assertEqual(yaml_cache.get(path), {"engines": {}})
+
+        path = os.path.join(self.root, "templates.yml")
+        with open(path, "w") as fh:
+            fh.write(yaml.dump({"keys": {}}))
+        mtime = os.stat(path).st_mtime + 10
+        os.utime(path, (mtime, mtime))
+        self.assertEqual(yaml_cache.get(path), self.files[path])
+        yaml_cache.add_snapshot(ConfigSnapshot(self.snapshot_path, self.root))
+        self.assertEqual(yaml_cache.get(path), {"keys": {}})
+
+    def test_hook_paths(self):
+        """
+        Tests that the hooks of the core hooks folder are listed while the folder is unchanged.
+        """
+        hooks_folder = os.path.join(self.root, "core", "hooks")
+        os.makedirs(hooks_folder)
+        hook_path = os.path.join(hooks_folder, "pick_environment.py")
+        open(hook_path, "w").close()
+        mtime = os.stat(hooks_folder).st_mtime - 10
+        os.utime(hooks_folder, (mtime, mtime))
+
+        yaml_cache = YamlCache()
+        for path in self.files:
+            yaml_cache.get(path, deepcopy_data=False)
+        ConfigSnapshot.write(self.snapshot_path, self.root, yaml_cache.get_cached_items(), hooks_folder)
+        snapshot = ConfigSnapshot(self.snapshot_path, self.root)
+        try:
+            # not validated yet
+            self.assertEqual(snapshot.get_hook_paths(), None)
+            snapshot.validate()
+            self.assertEqual(snapshot.get_hook_paths(), frozenset([hook_path]))
+
+            # adding a hook changes the folder
+            open(os.path.join(hooks_folder, "before_register_publish.py"), "w").close()
+            snapshot.validate()
+            self.assertEqual(snapshot.get_hook_paths(), None)
+        finally:
+            snapshot.close()
+
+    def test_invalid_snapshots(self):
+        """
+        Tests that invalid snapshots and corrupted sections are detected.
+        """
+        self._write_snapshot()
+        with open(self.snapshot_path, "rb") as fh:
+            content = fh.read()
+
+        # corrupted manifest, bad magic, unsupported version and truncated file
+        header_size = ConfigSnapshot._HEADER.size
+        for invalid_content in [
+            content[:header_size] + "x" + content[header_size + 1:],
+            "x" + content[1:],
+            content[:8] + chr(ConfigSnapshot.FORMAT_VERSION + 1) + content[9:],
+            content[:header_size - 1],
+        ]:
+            with open(self.snapshot_path, "wb") as fh:
+                fh.write(invalid_content)
+            self.assertRaises(TankError, ConfigSnapshot, self.snapshot_path, self.root)
+
+        # corrupted section, the last byte of the file belongs to the last section
+        with open(self.snapshot_path, "wb") as fh:
+            fh.write(content[:-1] + chr((ord(content[-1]) + 1) % 256))
+        snapshot = ConfigSnapshot(self.snapshot_path, self.root)
+        try:
+            found = [snapshot.get_data(path, os.stat(path))[0] for path in self.files]
+            self.assertEqual(found.count(False), 1)
+        finally:
+            snapshot.close()
+
+
+class TestCacheYamlCommand(TankTestBase):
+    """
+    Tests for the cache_yaml tank command.
+    """
+
+    def setUp(self):
+        super(TestCacheYamlCommand, self).setUp()
+        self.setup_fixtures()
+
+    def test_snapshot_used(self):
+        """
+        Tests that the snapshot written by the command is used by new pipeline configurations.
+        """
+        command = self.tk.get_command("cache_yaml")
+        command.set_logger(logging.getLogger("/dev/null"))
+        command.execute({})
+
+        snapshot_path = os.path.join(self.pipeline_config_root, constants.CONFIG_SNAPSHOT_FILE)
+        self.assertTrue(os.path.exists(snapshot_path))
+
+        with patch("tank.util.yaml_cache.g_yaml_cache.add_snapshot") as add_snapshot:
+            tank.pipelineconfig_factory.from_path(self.pipeline_config_root)
+        self.assertEqual(add_snapshot.call_args[0][0].path, snapshot_path)
@@ -0,0 +1,100 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import copy
+import cPickle
+
+from tank.util.frozen_data import freeze, thaw, FrozenDict, FrozenList
+from tank_test.tank_test_base import ShotgunTestBase
+from tank_test.tank_test_base import setUpModule # noqa
+
+
+class TestFrozenData(ShotgunTestBase):
+    """
+    Tests for frozen dictionaries and lists.
+    """
+
+    def setUp(self):
+        super(TestFrozenData, self).setUp()
+        self.data = {"a": [1, {"b": 2}], "c": {"d": [3, 4]}, "e": "f"}
+        self.frozen = freeze(self.data)
+
+    def test_freeze(self):
+        """
+        Tests that frozen data is equal to its source and converted recursively.
+        """
+        self.assertEqual(self.frozen, self.data)
+        self.assertIsInstance(self.frozen, FrozenDict)
+        self.assertIsInstance(self.frozen["a"], FrozenList)
+        self.assertIsInstance(self.frozen["a"][1], FrozenDict)
+        self.assertIsInstance(self.frozen["c"]["d"], FrozenList)
+        # frozen containers are still dictionaries and lists
+        self.assertIsInstance(self.frozen, dict)
+        self.assertIsInstance(self.frozen["a"], list)
+        # frozen data is not frozen again
+        self.assertIs(freeze(self.frozen), self.frozen)
+
+        # shared containers remain shared
+        shared = [1, 2]
+        frozen = freeze({"x": shared, "y": shared})
+        self.assertIs(frozen["x"], frozen["y"])
+
+    def test_read_only(self):
+        """
+        Tests that frozen containers can't be modified.
+        """
+        for modify in [
+            lambda: self.frozen.__setitem__("g", 1),
+            lambda: self.frozen.__delitem__("e"),
+            lambda: self.frozen.update({"g": 1}),
+            lambda: self.frozen.setdefault("g", 1),
+            lambda: self.frozen.pop("e"),
+            lambda: self.frozen.popitem(),
+            lambda: self.frozen.clear(),
+            lambda: self.frozen["a"].append(5),
+            lambda: self.frozen["a"].extend([5]),
+            lambda: self.frozen["a"].insert(0, 5),
+            lambda: self.frozen["a"].pop(),
+            lambda: self.frozen["a"].remove(1),
+            lambda: self.frozen["a"].sort(),
+            lambda: self.frozen["a"].reverse(),
+            lambda: self.frozen["a"].__setitem__(0, 5),
+            lambda: self.frozen["a"].__delitem__(0),
+            lambda: self.frozen["c"]["d"].__iadd__([5]),
+        ]:
+            self.assertRaises(TypeError, modify)
+        self.assertEqual(self.frozen, self.data)
+
+    def test_thaw(self):
+        """
+        Tests that thawed and deep copied data can be modified.
+        """
+        for thawed in [thaw(self.frozen), self.frozen.thaw(), copy.deepcopy(self.frozen)]:
+            self.assertEqual(thawed, self.data)
+            self.assertIs(type(thawed), dict)
+            self.assertIs(type(thawed["a"]), list)
+            self.assertIs(type(thawed["a"][1]), dict)
+            thawed["a"][1]["b"] = 3
+            thawed["c"]["d"].append(5)
+        self.assertEqual(self.frozen, self.data)
+
+        # shallow copies are modifiable at the top level only
+        shallow = copy.copy(self.frozen)
+        shallow["g"] = 1
+        self.assertIs(shallow["a"], self.frozen["a"])
+
+    def test_pickle(self):
+        """
+        Tests that frozen data can be pickled.
+        """
+        for protocol in range(cPickle.HIGHEST_PROTOCOL + 1):
+            unpickled = cPickle.loads(cPickle.dumps(self.frozen, protocol))
+            self.assertEqual(unpickled, self.data)
+            self.assertIsInstance(unpickled["c"]["d"], FrozenList)
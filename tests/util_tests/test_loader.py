@@ -0,0 +1,111 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import threading
+
+from mock import patch
+
+from tank.util import loader
+from tank_test.tank_test_base import ShotgunTestBase
+from tank_test.tank_test_base import setUpModule # noqa
+
+
+class TestLoadPlugin(ShotgunTestBase):
+    """
+    Tests for loading plugins and caching their bytecode.
+    """
+
+    def _write_plugin(self, name, value):
+        """
+        Writes a plugin file defining a single class with a value.
+        """
+        plugin_file = os.path.join(self.tank_temp, "%s.py" % name)
+        with open(plugin_file, "w") as fh:
+            fh.write("class Plugin(object):\n    value = %r\n" % value)
+        return plugin_file
+
+    def test_bytecode_cache(self):
+        """
+        Tests that plugins are compiled once and then loaded from the cache.
+        """
+        plugin_file = self._write_plugin("cached_plugin", 1)
+
+        stats = loader.get_bytecode_cache_stats()
+        plugin_class = loader.load_plugin(plugin_file, object)
+        self.assertEqual(plugin_class.value, 1)
+        self.assertEqual(loader.get_bytecode_cache_stats()["compiled"], stats["compiled"] + 1)
+
+        with patch("__builtin__.compile", side_effect=Exception("compile called")):
+            other_plugin_class = loader.load_plugin(plugin_file, object)
+        self.assertEqual(other_plugin_class.value, 1)
+        # each load still creates a new module
+        self.assertNotEqual(other_plugin_class.__module__, plugin_class.__module__)
+        self.assertEqual(loader.get_bytecode_cache_stats()["cached"], stats["cached"] + 1)
+
+    def test_modified_plugin(self):
+        """
+        Tests that the bytecode of a modified plugin is not used.
+        """
+        plugin_file = self._write_plugin("modified_plugin", 1)
+        self.assertEqual(loader.load_plugin(plugin_file, object).value, 1)
+
+        mtime = os.stat(plugin_file).st_mtime
+        self._write_plugin("modified_plugin", 2)
+        os.utime(plugin_file, (mtime + 10, mtime + 10))
+        self.assertEqual(loader.load_plugin(plugin_file, object).value, 2)
+
+    def test_concurrent_compilation(self):
+        """
+        Tests that threads compiling the same plugin write separate temporary files.
+        """
+        plugin_file = self._write_plugin("concurrent_plugin", 1)
+        cache_path = loader._get_bytecode_cache_path(plugin_file, os.stat(plugin_file))
+
+        temp_paths = []
+        rename = os.rename
+
+        def record_rename(src, dst):
+            temp_paths.append(src)
+            rename(src, dst)
+
+        with patch("os.rename", side_effect=record_rename):
+            threads = [
+                threading.Thread(target=loader.load_plugin, args=(plugin_file, object))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(set(temp_paths)), len(temp_paths))
+        self.assertFalse([name for name in os.listdir(os.path.dirname(cache_path)) if name.endswith(".tmp")])
+        self.assertEqual(loader.load_plugin(plugin_file, object).value, 1)
+
+    def test_invalid_cache(self):
+        """
+        Tests that invalid cached bytecode is ignored.
+        """
+        plugin_file = self._write_plugin("invalid_cache_plugin", 1)
+        cache_path = loader._get_bytecode_cache_path(plugin_file, os.stat(plugin_file))
+        loader.load_plugin(plugin_file, object)
+        with open(cache_path, "wb") as fh:
+            fh.write("not bytecode")
+        self.assertEqual(loader.load_plugin(plugin_file, object).value, 1)
+
+    def test_syntax_error(self):
+        """
+        Tests that plugins which can't be compiled raise a TankLoadPluginError.
+        """
+        plugin_file = os.path.join(self.tank_temp, "syntax_error_plugin.py")
+        with open(plugin_file, "w") as fh:
+            fh.write("class Plugin(object)\n")
+        self.assertRaises(loader.TankLoadPluginError, loader.load_plugin, plugin_file, object)
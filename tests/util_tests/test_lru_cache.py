@@ -0,0 +1,74 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import unittest2
+
+from tank.util.lru_cache import LRUCache
+from tank_test.tank_test_base import setUpModule # noqa
+
+
+class TestLRUCache(unittest2.TestCase):
+    """
+    Tests for the LRUCache class.
+    """
+
+    def test_get_set(self):
+        """
+        Tests that items can be retrieved and that hits and misses are counted.
+        """
+        cache = LRUCache(10)
+        self.assertIs(cache.get("foo"), LRUCache.MISSING)
+        cache.set("foo", None)
+        self.assertIsNone(cache.get("foo"))
+        cache.set("foo", "bar")
+        self.assertEqual(cache.get("foo"), "bar")
+        self.assertEqual(
+            cache.get_stats(),
+            {"hits": 2, "misses": 1, "size": 1, "max_size": 10}
+        )
+
+    def test_eviction(self):
+        """
+        Tests that the least recently used item is evicted when the cache is full.
+        """
+        cache = LRUCache(3)
+        for key in ["a", "b", "c"]:
+            cache.set(key, key)
+        # a is now the most recently used.
+        cache.get("a")
+        cache.set("d", "d")
+        self.assertEqual(len(cache), 3)
+        self.assertIs(cache.get("b"), LRUCache.MISSING)
+        for key in ["a", "c", "d"]:
+            self.assertEqual(cache.get(key), key)
+
+    def test_disabled(self):
+        """
+        Tests that nothing is cached when the size is 0.
+        """
+        cache = LRUCache(0)
+        cache.set("foo", "bar")
+        self.assertIs(cache.get("foo"), LRUCache.MISSING)
+        self.assertEqual(len(cache), 0)
+
+    def test_clear(self):
+        """
+        Tests that clearing the cache removes items and resets statistics.
+        """
+        cache = LRUCache(3)
+        cache.set("foo", "bar")
+        cache.get("foo")
+        cache.clear()
+        self.assertEqual(
+            cache.get_stats(),
+            {"hits": 0, "misses": 0, "size": 0, "max_size": 3}
+        )
+        cache.set("foo", "baz")
+        self.assertEqual(cache.get("foo"), "baz")
@@ -0,0 +1,160 @@
+# Copyright (c) 2017 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import sqlite3
+import threading
+
+from mock import Mock
+
+from tank.util.sqlite_pool import SqliteConnectionPool
+from tank_test.tank_test_base import TankTestBase, setUpModule # noqa
+
+
+class TestSqliteConnectionPool(TankTestBase):
+    """
+    Tests for the SqliteConnectionPool class.
+    """
+
+    def setUp(self):
+        super(TestSqliteConnectionPool, self).setUp()
+        self.pool = SqliteConnectionPool()
+        self.db_path = os.path.join(self.tank_temp, "%s.db" % self.id())
+        self._create_db(self.db_path)
+
+    def tearDown(self):
+        self.pool.clear()
+        super(TestSqliteConnectionPool, self).tearDown()
+
+    def _create_db(self, path):
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE test (value integer)")
+        connection.commit()
+        connection.close()
+
+    def test_reuse(self):
+        """
+        Tests that released connections are reused and only prepared once.
+        """
+        prepare = Mock()
+        connection = self.pool.acquire(self.db_path, prepare)
+        self.pool.release(self.db_path, connection)
+        self.assertIs(self.pool.acquire(self.db_path, prepare), connection)
+        self.assertEqual(prepare.call_count, 1)
+
+        # connections in use are not shared
+        other_connection = self.pool.acquire(self.db_path, prepare)
+        self.assertIsNot(other_connection, connection)
+        self.assertEqual(prepare.call_count, 1)
+
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["opened"], 2)
+        self.assertEqual(stats["reused"], 1)
+        self.assertEqual(stats["prepared"], 1)
+
+    def test_configure(self):
+        """
+        Tests that every new connection is configured, even when the file is
+        already prepared.
+        """
+        prepare = Mock()
+        configure = Mock()
+        connection = self.pool.acquire(self.db_path, prepare, configure)
+        other_connection = self.pool.acquire(self.db_path, prepare, configure)
+        self.assertEqual(configure.call_count, 2)
+        self.assertEqual(prepare.call_count, 1)
+
+        # reused connections are already configured
+        self.pool.release(self.db_path, connection)
+        self.assertIs(self.pool.acquire(self.db_path, prepare, configure), connection)
+        self.assertEqual(configure.call_count, 2)
+        other_connection.close()
+
+    def test_file_modified(self):
+        """
+        Tests that connections are not reused once the file is modified by
+        another connection, but that the file isn't prepared again.
+        """
+        prepare = Mock()
+        connection = self.pool.acquire(self.db_path, prepare)
+        self.pool.release(self.db_path, connection)
+
+        writer = sqlite3.connect(self.db_path)
+        writer.execute("INSERT INTO test VALUES (1)")
+        writer.commit()
+        writer.close()
+        # make sure the modification time changes, even with a coarse resolution
+        mtime = os.stat(self.db_path).st_mtime + 10
+        os.utime(self.db_path, (mtime, mtime))
+
+        new_connection = self.pool.acquire(self.db_path, prepare)
+        self.assertIsNot(new_connection, connection)
+        self.assertEqual(prepare.call_count, 1)
+        self.assertEqual(self.pool.get_stats()["discarded"], 1)
+
+        # changes made with a pooled connection don't prevent its reuse.
+        new_connection.execute("INSERT INTO test VALUES (2)")
+        new_connection.commit()
+        self.pool.release(self.db_path, new_connection)
+        self.assertIs(self.pool.acquire(self.db_path, prepare), new_connection)
+
+    def test_file_replaced(self):
+        """
+        Tests that a file replaced by another one is prepared again.
+        """
+        prepare = Mock()
+        connection = self.pool.acquire(self.db_path, prepare)
+        self.pool.release(self.db_path, connection)
+
+        # keep the old file so its inode can't be reused
+        os.rename(self.db_path, self.db_path + ".old")
+        self._create_db(self.db_path)
+
+        self.assertIsNot(self.pool.acquire(self.db_path, prepare), connection)
+        self.assertEqual(prepare.call_count, 2)
+
+        # empty files are always prepared
+        open(self.db_path, "w").close()
+        self.pool.acquire(self.db_path, prepare)
+        self.pool.acquire(self.db_path, prepare)
+        self.assertEqual(prepare.call_count, 4)
+
+    def test_rollback_on_release(self):
+        """
+        Tests that pending changes are discarded when a connection is released.
+        """
+        connection = self.pool.acquire(self.db_path)
+        connection.execute("INSERT INTO test VALUES (1)")
+        self.pool.release(self.db_path, connection)
+        connection = self.pool.acquire(self.db_path)
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM test").fetchone()[0], 0)
+
+    def test_threads(self):
+        """
+        Tests that connections are not shared between threads.
+        """
+        connection = self.pool.acquire(self.db_path)
+        self.pool.release(self.db_path, connection)
+
+        results = []
+
+        def acquire():
+            thread_connection = self.pool.acquire(self.db_path)
+            # the connection must be usable in this thread
+            thread_connection.execute("SELECT COUNT(*) FROM test").fetchone()
+            results.append(thread_connection)
+            thread_connection.close()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(results), 1)
+        self.assertIsNot(results[0], connection)
+        self.assertIs(self.pool.acquire(self.db_path), connection)
@@ -10,9 +10,13 @@
 
 import os
 import copy
+import time
+import threading
+
+from mock import patch
 
 import sgtk
-from sgtk.util.yaml_cache import YamlCache
+from sgtk.util.yaml_cache import YamlCache, _load_yaml
 from sgtk import TankError
 from tank_vendor import yaml
 from tank_test.tank_test_base import ShotgunTestBase
@@ -132,3 +136,179 @@ class TestYamlCache(ShotgunTestBase):
 
 
 
+
+    def test_get_frozen(self):
+        """
+        Tests that frozen data is shared by all callers, can't be modified and
+        is rebuilt when the file changes.
+        """
+        yaml_path = os.path.join(self.tank_temp, "%s.yml" % self.id())
+        test_data = {"engines": {"tk-maya": {"apps": ["one", "two"]}}}
+        with open(yaml_path, "w") as yaml_file:
+            yaml_file.write(yaml.dump(test_data))
+
+        yaml_cache = YamlCache()
+        frozen_data = yaml_cache.get(yaml_path, frozen=True)
+        self.assertEqual(frozen_data, test_data)
+        self.assertIs(yaml_cache.get(yaml_path, frozen=True), frozen_data)
+        self.assertRaises(TypeError, frozen_data.update, {})
+        self.assertRaises(TypeError, frozen_data["engines"]["tk-maya"]["apps"].append, "three")
+
+        # regular copies are still modifiable
+        read_data = yaml_cache.get(yaml_path)
+        read_data["engines"]["tk-maya"]["apps"].append("three")
+        self.assertEqual(yaml_cache.get(yaml_path, frozen=True), test_data)
+
+        test_data["engines"]["tk-nuke"] = {}
+        with open(yaml_path, "w") as yaml_file:
+            yaml_file.write(yaml.dump(test_data))
+        # make sure the modification time changes, even with a coarse resolution
+        mtime = os.stat(yaml_path).st_mtime + 10
+        os.utime(yaml_path, (mtime, mtime))
+        self.assertEqual(yaml_cache.get(yaml_path, frozen=True), test_data)
+
+    def test_stat_ttl(self):
+        """
+        Tests that files are not checked on disk again before the stat ttl
+        expires, unless they are invalidated.
+        """
+        yaml_path = os.path.join(self.tank_temp, "%s.yml" % self.id())
+        with open(yaml_path, "w") as yaml_file:
+            yaml_file.write(yaml.dump({"version": 1}))
+
+        yaml_cache = YamlCache(stat_ttl=60)
+        self.assertEqual(yaml_cache.get(yaml_path), {"version": 1})
+
+        with open(yaml_path, "w") as yaml_file:
+            yaml_file.write(yaml.dump({"version": 22}))
+        mtime = os.stat(yaml_path).st_mtime + 10
+        os.utime(yaml_path, (mtime, mtime))
+
+        # the file is trusted without being stat'd
+        with patch("os.stat", side_effect=OSError("os.stat called")):
+            self.assertEqual(yaml_cache.get(yaml_path), {"version": 1})
+
+        # once the ttl has expired, the file is checked again
+        now = time.time()
+        with patch("time.time", return_value=now + 61):
+            self.assertEqual(yaml_cache.get(yaml_path), {"version": 22})
+
+        # invalidating a file makes the next request check it
+        with open(yaml_path, "w") as yaml_file:
+            yaml_file.write(yaml.dump({"version": 333}))
+        os.utime(yaml_path, (mtime + 10, mtime + 10))
+        self.assertEqual(yaml_cache.get(yaml_path), {"version": 22})
+        yaml_cache.invalidate(yaml_path)
+        self.assertEqual(yaml_cache.get(yaml_path), {"version": 333})
+
+        # without a ttl, files are checked on every request
+        yaml_cache.stat_ttl = 0
+        with patch("os.stat", side_effect=OSError("os.stat called")):
+            self.assertRaises(TankError, yaml_cache.get, yaml_path)
+
+    def test_concurrent_loads(self):
+        """
+        Tests that a thread loading a file doesn't prevent other threads from
+        loading other files.
+        """
+        yaml_cache = YamlCache()
+
+        # pick two files which are loaded under different locks.
+        slow_path = os.path.join(self.tank_temp, "slow.yml")
+        fast_path = None
+        for index in range(YamlCache._PATH_LOCK_COUNT + 1):
+            path = os.path.join(self.tank_temp, "fast_%d.yml" % index)
+            if hash(path) % YamlCache._PATH_LOCK_COUNT != hash(slow_path) % YamlCache._PATH_LOCK_COUNT:
+                fast_path = path
+                break
+        for path in (slow_path, fast_path):
+            with open(path, "w") as yaml_file:
+                yaml_file.write(yaml.dump({"path": path}))
+
+        loading = threading.Event()
+        release = threading.Event()
+        populate = YamlCache._populate_cache_item_data
+
+        def slow_populate(cache, item):
+            if item.path == slow_path:
+                loading.set()
+                release.wait(10)
+            populate(cache, item)
+
+        with patch.object(YamlCache, "_populate_cache_item_data", slow_populate):
+            thread = threading.Thread(target=yaml_cache.get, args=(slow_path,))
+            thread.start()
+            try:
+                self.assertTrue(loading.wait(10))
+                self.assertEqual(yaml_cache.get(fast_path), {"path": fast_path})
+            finally:
+                release.set()
+                thread.join()
+
+        self.assertEqual(yaml_cache.get(slow_path), {"path": slow_path})
+
+    def test_preload(self):
+        """
+        Tests that preloaded files are cached and that errors are reported.
+        """
+        yaml_paths = []
+        for index in range(20):
+            yaml_path = os.path.join(self.tank_temp, "preload_%d.yml" % index)
+            with open(yaml_path, "w") as yaml_file:
+                yaml_file.write(yaml.dump({"index": index}))
+            yaml_paths.append(yaml_path)
+
+        yaml_cache = YamlCache()
+        yaml_cache.preload(yaml_paths + yaml_paths)
+        self.assertEqual(len(yaml_cache.get_cached_items()), 20)
+
+        # preloaded files are not loaded again
+        with patch.object(YamlCache, "_populate_cache_item_data") as populate:
+            for index, yaml_path in enumerate(yaml_paths):
+                self.assertEqual(yaml_cache.get(yaml_path), {"index": index})
+            self.assertFalse(populate.called)
+
+        missing_path = os.path.join(self.tank_temp, "preload_missing.yml")
+        self.assertRaises(TankError, yaml_cache.preload, yaml_paths + [missing_path])
+
+    def test_preload_threads(self):
+        """
+        Tests that preloading only starts threads for files which need to be checked.
+        """
+        yaml_paths = []
+        for index in range(5):
+            yaml_path = os.path.join(self.tank_temp, "preload_threads_%d.yml" % index)
+            with open(yaml_path, "w") as yaml_file:
+                yaml_file.write(yaml.dump({"index": index}))
+            yaml_paths.append(yaml_path)
+
+        yaml_cache = YamlCache(stat_ttl=60)
+        with patch("threading.Thread", wraps=threading.Thread) as thread:
+            yaml_cache.preload(yaml_paths[:2])
+            self.assertFalse(thread.called)
+            yaml_cache.preload(yaml_paths)
+            self.assertTrue(thread.called)
+        self.assertEqual(len(yaml_cache.get_cached_items()), 5)
+
+        # all the files were checked recently
+        with patch("threading.Thread") as thread:
+            with patch.object(YamlCache, "_add") as add:
+                yaml_cache.preload(yaml_paths)
+        self.assertFalse(thread.called)
+        self.assertFalse(add.called)
+
+    def test_load_yaml(self):
+        """
+        Tests that the accelerated loader returns the same data as yaml.load.
+        """
+        yaml_string = yaml.dump({
+            "engines": {"tk-maya": {"apps": ["one", "two"], "debug": True}},
+            "count": 3,
+            "ratio": 0.5,
+            "empty": None,
+            "date": "2017-01-01",
+        })
+        self.assertEqual(_load_yaml(yaml_string), yaml.load(yaml_string))
+        self.assertIsNone(_load_yaml(""))
+        # python specific tags are still supported
+        self.assertEqual(_load_yaml("!!python/tuple [1, 2]"), (1, 2))